@@ -0,0 +1,92 @@
+"""Frequency-ranked prefix completion over a fixed set of strings."""
+import heapq
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# The last code point; strings starting with it have no successor to bound them
+_MAX_CHAR = "\U0010ffff"
+
+
+def prefix_end(prefix: str) -> Optional[str]:
+    """The first string after every string starting with prefix, or None
+    when they run to the end of the code space.
+
+    prefix + U+10FFFF is not enough: it sorts before prefix + U+10FFFF + "a".
+    Surrogates are skipped, since they cannot be stored as UTF-8.
+    """
+    head = prefix.rstrip(_MAX_CHAR)
+    if not head:
+        return None
+    code = ord(head[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return head[:-1] + chr(code)
+
+
+class PrefixIndex:
+    """Values sorted by case-folded key, with a sparse table of range maxima
+    over their frequencies.
+
+    A prefix selects a contiguous range of keys by bisection. The k most
+    frequent values in the range are drawn from a heap of sub-ranges, each
+    split at its most frequent entry (found in O(1) from the sparse table), so
+    a query costs O(log n + k log k) however many values share the prefix.
+    Ties in frequency go to the value that sorts first.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, int]]):
+        ordered = sorted(entries, key=lambda entry: (entry[0].casefold(), entry[0]))
+        self.values = [value for value, _ in ordered]
+        self.keys = [value.casefold() for value in self.values]
+        self.frequencies = np.array([f for _, f in ordered], dtype=np.int64)
+        self._table = self._build_table(self.frequencies)
+
+    @staticmethod
+    def _build_table(frequencies: np.ndarray) -> List[np.ndarray]:
+        """table[j][i]: index of the most frequent entry in [i, i + 2**j)."""
+        table = [np.arange(len(frequencies), dtype=np.int32)]
+        span = 1
+        while 2 * span <= len(frequencies):
+            previous = table[-1]
+            left, right = previous[:-span], previous[span:]
+            table.append(
+                np.where(frequencies[left] >= frequencies[right], left, right).astype(np.int32)
+            )
+            span *= 2
+        return table
+
+    def _most_frequent(self, lo: int, hi: int) -> int:
+        """Index of the most frequent entry in [lo, hi), the first on ties."""
+        level = (hi - lo).bit_length() - 1
+        a = int(self._table[level][lo])
+        b = int(self._table[level][hi - (1 << level)])
+        fa, fb = self.frequencies[a], self.frequencies[b]
+        return b if fb > fa or (fb == fa and b < a) else a
+
+    def complete(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """Up to limit (value, frequency) pairs starting with prefix, ignoring
+        case, most frequent first."""
+        key = prefix.casefold()
+        lo = bisect_left(self.keys, key)
+        end = prefix_end(key)
+        hi = len(self.keys) if end is None else bisect_left(self.keys, end, lo)
+        heap = []
+
+        def push(lo: int, hi: int):
+            if lo < hi:
+                i = self._most_frequent(lo, hi)
+                heapq.heappush(heap, (-int(self.frequencies[i]), i, lo, hi))
+
+        push(lo, hi)
+        completions = []
+        while heap and len(completions) < limit:
+            frequency, i, lo, hi = heapq.heappop(heap)
+            completions.append((self.values[i], -frequency))
+            push(lo, i)
+            push(i + 1, hi)
+        return completions
+
+    def __len__(self) -> int:
+        return len(self.values)
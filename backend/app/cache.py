@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Named caches of this process, reported by GET /api/dataset/caches
+caches: Dict[str, "LRUCache"] = {}
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache.
+
+    Entries are bounded by count and, when max_bytes is set, by the summed
+    size reported by sizeof. Hit, miss and eviction counters are kept for
+    reporting; a cache given a name is listed in `caches`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        name: Optional[str] = None,
+    ):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        if name is not None:
+            caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self.sizeof(self._data.pop(key))
+            self._data[key] = value
+            self.bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None
+                and self.bytes > self.max_bytes
+                and len(self._data) > 1
+            ):
+                _, evicted = self._data.popitem(last=False)
+                self.bytes -= self.sizeof(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,171 @@
+"""ED occupancy over time, computed with a sweep line over stay intervals."""
+import re
+from datetime import datetime
+from itertools import chain
+from typing import NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.orm import Session
+
+from app.cohort import CohortFilters
+from app.models import EdStay, Triage
+from app.schemas import CensusSeries
+
+BUCKET_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def parse_bucket(bucket: str) -> int:
+    """Bucket width in seconds from text like '15m', '1h' or '1d'.
+
+    Raises ValueError for anything else.
+    """
+    match = re.fullmatch(r"([1-9][0-9]*)([mhd])", bucket)
+    if not match:
+        raise ValueError(f"invalid bucket {bucket!r}")
+    return int(match.group(1)) * BUCKET_UNITS[match.group(2)]
+
+
+def epoch_seconds(value: datetime) -> int:
+    """Seconds since the epoch of a naive datetime, as SQLite's strftime('%s')."""
+    return int((value - _EPOCH).total_seconds())
+
+
+class OccupancyTimeline(NamedTuple):
+    """A cohort's arrivals and departures swept into cumulative counts.
+
+    One entry per distinct event time, ascending; every array holds the state
+    after all events at that time.
+    """
+
+    times: np.ndarray  # epoch seconds
+    present: np.ndarray  # patients in the ED
+    arrived: np.ndarray  # arrivals so far
+    departed: np.ndarray  # departures so far
+    stays: int
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.times, self.present, self.arrived, self.departed)
+        return sum(a.nbytes for a in arrays)
+
+
+def build_timeline(db: Session, filters: CohortFilters) -> OccupancyTimeline:
+    """Load a cohort's stay intervals once and sweep them into a timeline.
+
+    Each stay is an arrival event (+1) at intime and a departure event (-1)
+    at outtime. Events are sorted once and cumulated; events sharing a time
+    collapse into one entry, so a patient leaving as another arrives is not
+    counted twice. date_from and date_to are ignored here: they select the
+    window read from the timeline, not the stays in it.
+    """
+    def seconds(column):
+        return cast(func.strftime("%s", column), Integer)
+
+    query = db.query(seconds(EdStay.intime), seconds(EdStay.outtime)).select_from(EdStay)
+    if filters.chief_complaint:
+        query = query.outerjoin(Triage, EdStay.stay_id == Triage.stay_id)
+    rows = filters.apply(query).all()
+    # fromiter over flattened rows; np.array(rows) is far slower on Row objects
+    return sweep_timeline(
+        np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows))
+    )
+
+
+def sweep_timeline(times: np.ndarray) -> OccupancyTimeline:
+    """Sweep (intime, outtime) epoch seconds, flattened pairwise, into a timeline."""
+    stays = len(times) // 2
+    deltas = np.tile(np.array([1, -1], dtype=np.int32), stays)
+    order = np.argsort(times, kind="stable")
+    times, deltas = times[order], deltas[order]
+
+    last_at_time = np.ones(len(times), dtype=bool)
+    last_at_time[:-1] = times[1:] != times[:-1]
+    return OccupancyTimeline(
+        times=times[last_at_time],
+        present=np.cumsum(deltas)[last_at_time],
+        arrived=np.cumsum(deltas > 0, dtype=np.int32)[last_at_time],
+        departed=np.cumsum(deltas < 0, dtype=np.int32)[last_at_time],
+        stays=stays,
+    )
+
+
+def bucket_edges(
+    timeline: OccupancyTimeline,
+    bucket_seconds: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    max_buckets: Optional[int] = None,
+) -> np.ndarray:
+    """Bucket boundaries covering [date_from, date_to), in epoch seconds.
+
+    Without date_from the window starts at the first arrival, rounded down to
+    a whole bucket; without date_to it ends at the last departure.
+
+    Raises ValueError if the window needs more than max_buckets buckets,
+    before allocating them.
+    """
+    if date_from is not None:
+        start = epoch_seconds(date_from)
+    elif len(timeline.times):
+        start = int(timeline.times[0]) // bucket_seconds * bucket_seconds
+    else:
+        return np.empty(0, dtype=np.int64)
+    if date_to is not None:
+        stop = epoch_seconds(date_to)
+    elif len(timeline.times):
+        stop = int(timeline.times[-1])
+    else:
+        stop = start
+    n_buckets = max(1, -(-(stop - start) // bucket_seconds))
+    if max_buckets is not None and n_buckets > max_buckets:
+        raise ValueError(f"At most {max_buckets} buckets per request; widen the bucket")
+    return start + bucket_seconds * np.arange(n_buckets + 1, dtype=np.int64)
+
+
+def occupancy(
+    timeline: OccupancyTimeline, edges: np.ndarray, bucket_seconds: int
+) -> CensusSeries:
+    """Census per bucket between consecutive edges.
+
+    present is the count in the ED at the bucket start, peak the most present
+    at once during the bucket, and arrivals and departures the events inside
+    it. Every column is a few binary searches over the timeline, so the cost
+    grows with the number of buckets, not stays times buckets.
+    """
+    if len(edges) < 2:
+        return CensusSeries(bucket_seconds=bucket_seconds, stays=timeline.stays)
+
+    def before(values: np.ndarray) -> np.ndarray:
+        # values[i - 1], or 0 before the first event
+        return np.concatenate(([0], values))
+
+    # Timeline entries at or before each edge, and strictly before it
+    upto = np.searchsorted(timeline.times, edges, side="right")
+    below = np.searchsorted(timeline.times, edges, side="left")
+
+    present = before(timeline.present)[upto[:-1]]
+    arrived = before(timeline.arrived)[below]
+    departed = before(timeline.departed)[below]
+
+    peak = present.copy()
+    lo, hi = below[:-1], below[1:]
+    busy = hi > lo
+    if busy.any():
+        # Empty buckets have lo == hi, so the busy buckets' ranges are contiguous
+        peak[busy] = np.maximum(
+            peak[busy],
+            np.maximum.reduceat(timeline.present[: hi[busy][-1]], lo[busy]),
+        )
+
+    return CensusSeries(
+        bucket_seconds=bucket_seconds,
+        stays=timeline.stays,
+        bucket_start=edges[:-1].astype("datetime64[s]").tolist(),
+        present=present.tolist(),
+        peak=peak.tolist(),
+        arrivals=np.diff(arrived).tolist(),
+        departures=np.diff(departed).tolist(),
+    )
@@ -0,0 +1,213 @@
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.features import FEATURE_COLUMNS, has_stay_features, parse_feature_range
+from app.lookups import (
+    diagnosis_stays,
+    has_medication_index,
+    medication_stays,
+    normalize_icd_code,
+    normalize_medication_name,
+)
+from app.models import EdStay, StayFeature, Triage
+from app.search import fts_query, fts_rowids, has_triage_fts, word_prefix_conditions
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO date, ignoring unparseable values like the list always has."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class CohortFilters:
+    """Encounter list filters, normalized so equal cohorts compare equal."""
+
+    gender: Optional[str] = None
+    race: Tuple[str, ...] = ()
+    disposition: Tuple[str, ...] = ()
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    chief_complaint: Optional[str] = None
+    # 'fts' (token/prefix match on the FTS5 index) or 'substring' (ILIKE);
+    # resolve() turns 'fts' into 'word_prefix', the same match by regular
+    # expression, on DuckDB
+    chief_complaint_mode: str = "substring"
+    icd_code: Tuple[str, ...] = ()
+    icd_prefix: Tuple[str, ...] = ()
+    medication: Optional[str] = None
+    # 'medrecon' or 'pyxis' to match medications from one table only
+    medication_source: Optional[str] = None
+    # Whether medications are looked up in medication_stays; off scans the
+    # source tables. Both give the same stays, so it is not in the signature.
+    medication_indexed: bool = True
+    # (feature, min, max) ranges on stay_features columns, either bound optional
+    feature_ranges: Tuple[Tuple[str, Optional[float], Optional[float]], ...] = ()
+
+    def resolve(self, db: Session) -> "CohortFilters":
+        """These filters with FTS search downgraded to substring, and the
+        medication lookup to a scan, if the database lacks their indexes.
+        On DuckDB, FTS search becomes the equivalent word prefix match.
+
+        Raises a 503 HTTPException for feature ranges when the stay_features
+        table has not been built.
+        """
+        if self.feature_ranges and not has_stay_features(db):
+            raise HTTPException(
+                status_code=503,
+                detail="Stay features are not built; run load_data.py",
+            )
+        resolved = self
+        if self.chief_complaint_mode == "fts":
+            if db.get_bind().dialect.name == "duckdb":
+                resolved = replace(resolved, chief_complaint_mode="word_prefix")
+            elif not has_triage_fts(db):
+                resolved = replace(resolved, chief_complaint_mode="substring")
+        if self.medication and self.medication_indexed and not has_medication_index(db):
+            resolved = replace(resolved, medication_indexed=False)
+        return resolved
+
+    @property
+    def chief_complaint_fts_query(self) -> Optional[str]:
+        """FTS5 query for the chief complaint search, if it uses the index."""
+        if self.chief_complaint and self.chief_complaint_mode == "fts":
+            return fts_query(self.chief_complaint)
+        return None
+
+    def conditions(self) -> list:
+        """SQL conditions over EdStay (and Triage, when filtering on it)."""
+        conditions = []
+        if self.gender:
+            conditions.append(EdStay.gender == self.gender)
+        if self.race:
+            conditions.append(EdStay.race.in_(self.race))
+        if self.disposition:
+            conditions.append(EdStay.disposition.in_(self.disposition))
+        if self.date_from:
+            conditions.append(EdStay.intime >= self.date_from)
+        if self.date_to:
+            conditions.append(EdStay.intime <= self.date_to)
+        if self.chief_complaint:
+            match = self.chief_complaint_fts_query
+            words = (
+                word_prefix_conditions(Triage.chiefcomplaint, self.chief_complaint)
+                if self.chief_complaint_mode == "word_prefix"
+                else []
+            )
+            if match:
+                conditions.append(Triage.id.in_(fts_rowids(match)))
+            elif words:
+                conditions.extend(words)
+            else:
+                conditions.append(
+                    Triage.chiefcomplaint.ilike(f"%{self.chief_complaint}%")
+                )
+        # Semi-joins on stay_id, so stays with several matching rows appear once
+        if self.icd_code:
+            conditions.append(EdStay.stay_id.in_(diagnosis_stays(codes=self.icd_code)))
+        if self.icd_prefix:
+            conditions.append(EdStay.stay_id.in_(diagnosis_stays(prefixes=self.icd_prefix)))
+        if self.medication:
+            conditions.append(
+                EdStay.stay_id.in_(
+                    medication_stays(
+                        self.medication, self.medication_source, self.medication_indexed
+                    )
+                )
+            )
+        if self.feature_ranges:
+            bounds = []
+            for name, low, high in self.feature_ranges:
+                column = FEATURE_COLUMNS[name]
+                if low is not None:
+                    bounds.append(column >= low)
+                if high is not None:
+                    bounds.append(column <= high)
+            conditions.append(
+                EdStay.stay_id.in_(select(StayFeature.stay_id).where(and_(*bounds)))
+            )
+        return conditions
+
+    def apply(self, query):
+        """Filter a query that selects from EdStay outer-joined to Triage."""
+        conditions = self.conditions()
+        if conditions:
+            query = query.filter(and_(*conditions))
+        return query
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.conditions()
+
+    def signature(self) -> tuple:
+        """Hashable key identifying the cohort, for caches."""
+        return (
+            self.gender,
+            self.race,
+            self.disposition,
+            self.date_from,
+            self.date_to,
+            self.chief_complaint,
+            self.chief_complaint_mode,
+            self.icd_code,
+            self.icd_prefix,
+            self.medication,
+            self.medication_source,
+            self.feature_ranges,
+        )
+
+
+# async so FastAPI parses parameters without a threadpool hop
+async def cohort_filters(
+    gender: Optional[str] = None,
+    race: Optional[List[str]] = Query(None),
+    disposition: Optional[List[str]] = Query(None),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    chief_complaint: Optional[str] = None,
+    chief_complaint_mode: str = Query("fts", regex="^(fts|substring)$"),
+    icd_code: Optional[List[str]] = Query(None),
+    icd_prefix: Optional[List[str]] = Query(None),
+    medication: Optional[str] = None,
+    medication_source: Optional[str] = Query(None, regex="^(medrecon|pyxis)$"),
+    feature_range: Optional[List[str]] = Query(None, alias="range"),
+) -> CohortFilters:
+    """Dependency parsing the encounter list filter query parameters.
+
+    Chief complaint search uses the FTS5 index unless substring matching is
+    requested; call resolve() before querying to fall back when the database
+    was built without the index. ICD codes and prefixes are matched without
+    dots and case-insensitively; medication matches the start of a drug name.
+    Each range is feature:min:max over a stay_features column, e.g.
+    duration_hours::4 or max_heartrate:120: (400 if malformed).
+    """
+    icd_code = {normalize_icd_code(code) for code in icd_code or ()} - {""}
+    icd_prefix = {normalize_icd_code(prefix) for prefix in icd_prefix or ()} - {""}
+    medication = (medication or "").strip()
+    try:
+        feature_ranges = {parse_feature_range(text) for text in feature_range or ()}
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=f"Invalid range: {error}")
+    return CohortFilters(
+        gender=gender or None,
+        race=tuple(sorted(set(race))) if race else (),
+        disposition=tuple(sorted(set(disposition))) if disposition else (),
+        date_from=_parse_date(date_from),
+        date_to=_parse_date(date_to),
+        chief_complaint=chief_complaint or None,
+        chief_complaint_mode=chief_complaint_mode,
+        icd_code=tuple(sorted(icd_code)),
+        icd_prefix=tuple(sorted(icd_prefix)),
+        medication=normalize_medication_name(medication) or None,
+        medication_source=medication_source,
+        feature_ranges=tuple(sorted(feature_ranges, key=repr)),
+    )
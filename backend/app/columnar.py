@@ -0,0 +1,82 @@
+"""Parquet snapshots of the database, read by the DuckDB query engine.
+
+load_data.py --parquet writes one <table>.parquet per table. With
+QUERY_ENGINE=duckdb the list, count, summary and export routes query these
+files through DuckDB, while detail lookups stay on SQLite.
+"""
+import os
+from typing import Dict, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import DateTime, Float, Integer, Table, select
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models import LoadManifest
+
+# Rows per Parquet row group written
+SNAPSHOT_BATCH_ROWS = 100000
+
+
+def arrow_type(column) -> pa.DataType:
+    """Arrow type for a SQLAlchemy column."""
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def write_table_parquet(
+    engine: Engine, table: Table, path: str, batch_size: int = SNAPSHOT_BATCH_ROWS
+) -> int:
+    """Write a table to a Parquet file, batch_size rows at a time; return rows written.
+
+    The file is written beside path and renamed into place, so readers never
+    see a partial file.
+    """
+    schema = pa.schema([(c.name, arrow_type(c)) for c in table.columns])
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with engine.connect() as conn, pq.ParquetWriter(tmp_path, schema) as writer:
+        result = conn.execution_options(yield_per=batch_size).execute(select(table))
+        for rows in result.partitions():
+            columns = list(zip(*rows))
+            writer.write_batch(
+                pa.record_batch(
+                    [pa.array(values, type=f.type) for values, f in zip(columns, schema)],
+                    schema=schema,
+                )
+            )
+            count += len(rows)
+    os.replace(tmp_path, path)
+    return count
+
+
+def write_parquet_snapshot(
+    engine: Engine, directory: str, batch_size: int = SNAPSHOT_BATCH_ROWS
+) -> Dict[str, int]:
+    """Snapshot every model table into directory; return rows written per table.
+
+    The load manifest is written last, so its generation only advances once
+    the data files beside it are in place.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tables = [t for t in Base.metadata.sorted_tables if t is not LoadManifest.__table__]
+    counts = {}
+    for table in tables + [LoadManifest.__table__]:
+        path = os.path.join(directory, f"{table.name}.parquet")
+        counts[table.name] = write_table_parquet(engine, table, path, batch_size)
+    return counts
+
+
+def snapshot_generation(directory: str) -> Optional[int]:
+    """Data generation of the snapshot in directory, or None if there is none."""
+    path = os.path.join(directory, f"{LoadManifest.__tablename__}.parquet")
+    if not os.path.exists(path):
+        return None
+    generations = pq.read_table(path, columns=["generation"]).column("generation")
+    return max(generations.to_pylist(), default=0)
@@ -0,0 +1,79 @@
+"""Runtime settings, read from environment variables."""
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+# 'sync' (default): def routes on the threadpool; 'async': async def routes on aiosqlite
+DATABASE_MODE = os.environ.get("DATABASE_MODE", "sync")
+
+# SQLite profile for the API's read-only connections: 'off' (default, SQLite
+# defaults), 'wal' (WAL journal, mmap, larger page cache, query_only) or
+# 'immutable' (the same on a read-only immutable=1 URI; restart after reloading)
+SQLITE_SERVING = os.environ.get("SQLITE_SERVING", "off")
+
+# Memory-mapped I/O and page cache per serving connection, in MB
+SQLITE_MMAP_MB = _env_int("SQLITE_MMAP_MB", 256)
+SQLITE_CACHE_MB = _env_int("SQLITE_CACHE_MB", 16)
+
+# API worker processes started by entrypoint.sh; above 1 it runs gunicorn with
+# gunicorn.conf.py (preloaded app, SQLITE_SERVING=immutable unless set)
+WEB_CONCURRENCY = _env_int("WEB_CONCURRENCY", 1)
+
+# Threads running sync routes, per worker process (Starlette's default is 40)
+THREADPOOL_SIZE = _env_int("THREADPOOL_SIZE", 40)
+
+# Connections kept open per worker process in a serving profile, one per
+# threadpool thread
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", THREADPOOL_SIZE)
+
+# Engine for list, count, summary and export queries: 'sqlite' (default) or
+# 'duckdb', which reads the Parquet snapshot written by load_data.py --parquet
+QUERY_ENGINE = os.environ.get("QUERY_ENGINE", "sqlite")
+
+# Maximum number of cached exact cohort counts
+COUNT_CACHE_SIZE = _env_int("COUNT_CACHE_SIZE", 1024)
+
+# Maximum stay_ids accepted by POST /api/encounters/batch
+BATCH_MAX_STAYS = _env_int("BATCH_MAX_STAYS", 500)
+
+# Stays per chunk streamed by GET /api/encounters/export
+EXPORT_CHUNK_ROWS = _env_int("EXPORT_CHUNK_ROWS", 1000)
+
+# Maximum subject_ids accepted by POST /api/patients/batch
+PATIENT_BATCH_MAX = _env_int("PATIENT_BATCH_MAX", 100)
+
+# A stay arriving within this many hours of the patient's previous discharge
+# counts as a return visit
+RETURN_VISIT_HOURS = _env_int("RETURN_VISIT_HOURS", 72)
+
+# Encoded encounter details cached in memory, by entry count and size in MB
+DETAIL_CACHE_SIZE = _env_int("DETAIL_CACHE_SIZE", 4096)
+DETAIL_CACHE_MB = _env_int("DETAIL_CACHE_MB", 64)
+
+# Most recent stays whose details are cached at startup (0: none)
+DETAIL_CACHE_WARM = _env_int("DETAIL_CACHE_WARM", 0)
+
+# Maximum buckets returned by GET /api/census
+CENSUS_MAX_BUCKETS = _env_int("CENSUS_MAX_BUCKETS", 10000)
+
+# Memory budget for cached census timelines, in MB
+CENSUS_CACHE_MB = _env_int("CENSUS_CACHE_MB", 256)
+
+# Add X-DB-Queries and X-DB-Time (ms) headers reporting each request's SQL
+METRICS_DB_HEADERS = _env_flag("METRICS_DB_HEADERS")
+
+# Allow profiling requests that send X-Profile: 1 or profile=1
+PROFILING_ENABLED = _env_flag("PROFILING_ENABLED")
+
+# Directory to also save profile reports and .prof files to (unset: don't save)
+PROFILE_DIR = os.environ.get("PROFILE_DIR") or None
+
+# Functions listed in a profile report, by cumulative time
+PROFILE_TOP_FUNCTIONS = _env_int("PROFILE_TOP_FUNCTIONS", 40)
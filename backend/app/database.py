@@ -1,18 +1,143 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from glob import glob
 import os
 
+from app.config import (
+    DATABASE_MODE,
+    DB_POOL_SIZE,
+    QUERY_ENGINE,
+    SQLITE_CACHE_MB,
+    SQLITE_MMAP_MB,
+    SQLITE_SERVING,
+)
+from app.profiling import profiled
+
 # Database file path - use environment variable or default
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATABASE_PATH = os.environ.get('DATABASE_PATH', os.path.join(BASE_DIR, 'mimic_ed.db'))
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Directory of the Parquet snapshot, one <table>.parquet per table
+PARQUET_PATH = os.environ.get('PARQUET_PATH', os.path.join(BASE_DIR, 'parquet'))
+
+
+def sqlite_url(driver: str = "sqlite", serving: str = "off") -> str:
+    """URL of the database at DATABASE_PATH; read-only and immutable when serving
+    is 'immutable', so SQLite skips locking and change detection."""
+    if serving == "immutable":
+        return f"{driver}:///file:{DATABASE_PATH}?mode=ro&immutable=1&uri=true"
+    return f"{driver}:///{DATABASE_PATH}"
+
+
+def apply_serving_pragmas(sync_engine, serving: str):
+    """Tune every new connection of a read-only API engine.
+
+    'wal' switches the file to WAL, so readers keep serving while load_data.py
+    reloads. Both profiles memory-map the file, enlarge the page cache, keep
+    temporary b-trees in memory and refuse writes.
+    """
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if serving == "wal":
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_MB * 1024 * 1024}")
+        cursor.execute(f"PRAGMA cache_size={-SQLITE_CACHE_MB * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def create_sqlite_engine(serving: str = "off"):
+    """Engine on DATABASE_PATH.
+
+    With serving 'off' it has SQLite and SQLAlchemy defaults and can write, as
+    load_data.py needs. Otherwise it is the read-only serving profile, keeping
+    one connection per threadpool thread (DB_POOL_SIZE) open. Overflow is
+    unbounded: a finished request holds its connection until a threadpool
+    thread closes its session, so a capped pool can deadlock under load.
+    """
+    if serving == "off":
+        return create_engine(sqlite_url(), connect_args={"check_same_thread": False})
+    serving_engine = create_engine(
+        sqlite_url(serving=serving),
+        connect_args={"check_same_thread": False},
+        pool_size=DB_POOL_SIZE,
+        max_overflow=-1,
+    )
+    apply_serving_pragmas(serving_engine, serving)
+    return serving_engine
+
+
+engine = create_sqlite_engine(SQLITE_SERVING)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Async engine for DATABASE_MODE=async, served by aiosqlite
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    if SQLITE_SERVING == "off":
+        async_engine = create_async_engine(sqlite_url("sqlite+aiosqlite"))
+    else:
+        async_engine = create_async_engine(
+            sqlite_url("sqlite+aiosqlite", SQLITE_SERVING),
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=-1,
+        )
+        apply_serving_pragmas(async_engine.sync_engine, SQLITE_SERVING)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+def create_parquet_engine(directory: str):
+    """In-memory DuckDB engine with a view over each <table>.parquet in directory.
+
+    The views carry the table names, so the ORM models query the snapshot
+    unchanged. Each pooled connection is its own in-memory database, so open
+    result sets on one session are not disturbed by queries on another.
+    """
+    parquet_engine = create_engine("duckdb:///:memory:", poolclass=QueuePool)
+
+    @event.listens_for(parquet_engine, "connect")
+    def create_views(dbapi_connection, connection_record):
+        for path in sorted(glob(os.path.join(directory, "*.parquet"))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            dbapi_connection.execute(
+                f"CREATE VIEW \"{name}\" AS SELECT * FROM read_parquet('{path}')"
+            )
+
+    return parquet_engine
+
+
+# Engine for list, count, summary and export queries (QUERY_ENGINE)
+analytic_engine = engine
+AnalyticSessionLocal = SessionLocal
+if QUERY_ENGINE == "duckdb":
+    analytic_engine = create_parquet_engine(PARQUET_PATH)
+    AnalyticSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=analytic_engine)
+
+
+class ThreadpoolSession:
+    """A sync session offering AsyncSession.run_sync, run on Starlette's threadpool.
+
+    Lets the async routes serve QUERY_ENGINE=duckdb, which has no async driver.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(profiled(fn), self.session, *args, **kwargs)
+
 
 def get_db():
     """Dependency to get database session."""
@@ -21,3 +146,46 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_analytic_db():
+    """Dependency to get a session on the QUERY_ENGINE database."""
+    db = AnalyticSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_analytic_db():
+    """Dependency to get an async session on the QUERY_ENGINE database.
+
+    DuckDB sessions are sync; they are wrapped to run on the threadpool.
+    """
+    if QUERY_ENGINE == "duckdb":
+        db = AnalyticSessionLocal()
+        try:
+            yield ThreadpoolSession(db)
+        finally:
+            db.close()
+    else:
+        async with AsyncSessionLocal() as db:
+            yield db
+
+
+def dispose_engines_after_fork():
+    """Forget pooled connections inherited from the parent process.
+
+    Called in each worker forked from a preloaded app (gunicorn.conf.py), so
+    no SQLite or DuckDB connection is ever shared between processes. The
+    parent's connections are left open for the parent (close=False).
+    """
+    for pooled in (engine, analytic_engine, async_engine and async_engine.sync_engine):
+        if pooled is not None:
+            pooled.dispose(close=False)
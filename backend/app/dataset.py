@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models import LoadManifest
+
+
+def get_data_generation(db: Session) -> int:
+    """Current data generation, bumped by load_data.py whenever it reloads.
+
+    Returns 0 for databases built before the load manifest existed.
+    """
+    try:
+        generation = db.query(func.max(LoadManifest.generation)).scalar()
+    except OperationalError:
+        db.rollback()
+        return 0
+    return generation or 0
+
+
+def get_manifest(db: Session) -> List[LoadManifest]:
+    """All load manifest entries, in table name order."""
+    try:
+        return db.query(LoadManifest).order_by(LoadManifest.table_name).all()
+    except OperationalError:
+        db.rollback()
+        return []
+
+
+def get_table_row_count(db: Session, table_name: str) -> Optional[int]:
+    """Row count recorded by the loader for a completely loaded table."""
+    try:
+        entry = db.get(LoadManifest, table_name)
+    except OperationalError:
+        db.rollback()
+        return None
+    if entry is None or entry.status != "complete":
+        return None
+    return entry.row_count
@@ -0,0 +1,42 @@
+"""Shape-preserving downsampling of vital sign series."""
+from typing import List, Sequence
+
+import numpy as np
+
+
+def minmax_indices(series: Sequence[np.ndarray], max_points: int) -> np.ndarray:
+    """Row indices to keep so a multi-series chart keeps its shape.
+
+    The rows between the first and last are split into equal buckets and, in
+    each bucket, the rows holding the minimum and maximum of every series are
+    kept, so spikes survive however far the series is thinned. The first and
+    last rows are always kept. NaNs (missing readings) never win a bucket
+    unless the whole bucket is missing.
+
+    All arrays in series must have the same length. Returns sorted, unique
+    indices, at most max_points of them. When max_points is too small to
+    give every series a bucket, rows are instead picked at even spacing.
+    """
+    n = len(series[0]) if series else 0
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+
+    n_buckets = (max_points - 2) // (2 * len(series))
+    if n_buckets < 1:
+        return np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+    inner = np.arange(1, n - 1)
+    bucket = (inner - 1) * n_buckets // (n - 2)
+    starts = np.searchsorted(bucket, np.arange(n_buckets))
+
+    keep: List[np.ndarray] = [np.array([0, n - 1])]
+    for values in series:
+        values = values[1:-1]
+        missing = np.isnan(values)
+        for key in (
+            np.where(missing, np.inf, values),
+            np.where(missing, np.inf, -values),
+        ):
+            # Within each bucket, sort ascending by key; the head is the extreme
+            order = np.lexsort((key, bucket))
+            keep.append(inner[order[starts]])
+    return np.unique(np.concatenate(keep))
@@ -0,0 +1,165 @@
+"""Streaming export of an encounter cohort as CSV or NDJSON."""
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.cohort import CohortFilters
+from app.config import EXPORT_CHUNK_ROWS
+from app.database import SessionLocal
+from app.models import EdStay, Triage
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+STAY_COLUMNS = (
+    "stay_id",
+    "subject_id",
+    "hadm_id",
+    "intime",
+    "outtime",
+    "gender",
+    "race",
+    "arrival_transport",
+    "disposition",
+)
+TRIAGE_COLUMNS = (
+    "temperature",
+    "heartrate",
+    "resprate",
+    "o2sat",
+    "sbp",
+    "dbp",
+    "pain",
+    "acuity",
+    "chiefcomplaint",
+)
+
+# Columns of every export, matching the encounter list items
+LIST_COLUMNS = STAY_COLUMNS + ("chiefcomplaint", "acuity", "duration_hours")
+
+# Extra CSV columns with include_children; child lists are JSON-encoded cells
+CHILD_CSV_COLUMNS = tuple(f"triage_{c}" for c in TRIAGE_COLUMNS) + (
+    "diagnoses",
+    "medications",
+)
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_query(db: Session, filters: CohortFilters):
+    """Cohort rows as stay columns plus triage_-prefixed triage columns, by stay_id."""
+    query = (
+        db.query(
+            *(getattr(EdStay, c) for c in STAY_COLUMNS),
+            Triage.id.label("triage_id"),
+            *(getattr(Triage, c).label(f"triage_{c}") for c in TRIAGE_COLUMNS),
+        )
+        .select_from(EdStay)
+        .outerjoin(Triage, EdStay.stay_id == Triage.stay_id)
+    )
+    return filters.apply(query).order_by(EdStay.stay_id)
+
+
+def load_children(db: Session, stay_ids: List[int]) -> Dict[int, dict]:
+    """Diagnoses and medications of many stays, with the detail view's queries."""
+    # Imported here: the encounters router imports this module
+    from app.routers.encounters import load_detail_lists
+
+    diagnoses = load_detail_lists(db, "diagnoses", stay_ids)
+    medications = load_detail_lists(db, "medications", stay_ids)
+    return {
+        stay_id: {
+            "diagnoses": diagnoses.get(stay_id, []),
+            "medications": medications.get(stay_id, []),
+        }
+        for stay_id in diagnoses.keys() | medications.keys()
+    }
+
+
+def export_record(row, children: Optional[Dict[int, dict]] = None) -> dict:
+    """One stay as a flat list-item dict, with nested children if given."""
+    record = {c: getattr(row, c) for c in STAY_COLUMNS}
+    record["chiefcomplaint"] = row.triage_chiefcomplaint
+    record["acuity"] = row.triage_acuity
+    record["duration_hours"] = round((row.outtime - row.intime).total_seconds() / 3600, 2)
+    if children is not None:
+        record["triage"] = (
+            {c: getattr(row, f"triage_{c}") for c in TRIAGE_COLUMNS}
+            if row.triage_id is not None
+            else None
+        )
+        stay = children.get(row.stay_id, {})
+        record["diagnoses"] = stay.get("diagnoses", [])
+        record["medications"] = stay.get("medications", [])
+    return record
+
+
+def csv_values(record: dict) -> list:
+    """A record as CSV cells, in LIST_COLUMNS then CHILD_CSV_COLUMNS order."""
+    values = [_iso(record[c]) for c in LIST_COLUMNS]
+    if "triage" in record:
+        triage = record["triage"] or {}
+        values += [triage.get(c) for c in TRIAGE_COLUMNS]
+        values += [
+            json.dumps(record["diagnoses"], default=_json_value),
+            json.dumps(record["medications"], default=_json_value),
+        ]
+    return values
+
+
+def export_cohort(
+    filters: CohortFilters,
+    export_format: str = "csv",
+    include_children: bool = False,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> Iterator[str]:
+    """Yield a cohort export as text, one chunk of chunk_rows stays at a time.
+
+    Rows are pulled from a server-side cursor (yield_per) and children are
+    loaded with IN-list queries per chunk, so memory depends on chunk_rows,
+    not on the cohort size. The generator opens its own sessions because a
+    streaming response outlives the request's; children are read on a
+    second one, since DuckDB drops a connection's open cursor when it runs
+    another query.
+    """
+    with session_factory() as db, session_factory() as child_db:
+        filters = filters.resolve(db)
+        rows = iter(export_query(db, filters).yield_per(chunk_rows))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if export_format == "csv":
+            writer.writerow(LIST_COLUMNS + (CHILD_CSV_COLUMNS if include_children else ()))
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            children = (
+                load_children(child_db, sorted({row.stay_id for row in chunk}))
+                if include_children
+                else None
+            )
+            records = (export_record(row, children) for row in chunk)
+            if export_format == "csv":
+                writer.writerows(csv_values(record) for record in records)
+            else:
+                for record in records:
+                    buffer.write(json.dumps(record, default=_json_value))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
@@ -0,0 +1,147 @@
+"""Per-stay features materialized by load_data.py, for sorting and range
+filters on the encounter list.
+
+FEATURE_COLUMNS maps the names the API accepts to stay_features columns.
+Length of stay, acuity and the row counts are indexed; the vital sign columns
+are read from the one-row-per-stay table without an index.
+"""
+import math
+from typing import Optional, Tuple
+
+from sqlalchemy import Integer, cast, func, insert, select, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.dataset import get_table_row_count
+from app.models import Diagnosis, EdStay, MedRecon, Pyxis, StayFeature, Triage, VitalSign
+
+# Vital signs with first, min and max features
+VITAL_FEATURES = ("temperature", "heartrate", "resprate", "o2sat", "sbp", "dbp")
+
+FEATURE_COLUMNS = {
+    "duration_hours": StayFeature.los_hours,
+    "acuity": StayFeature.acuity,
+    "vitals_count": StayFeature.vitals_count,
+    "diagnosis_count": StayFeature.diagnosis_count,
+    "medication_count": StayFeature.medication_count,
+}
+for _prefix in ("first", "min", "max"):
+    for _vital in VITAL_FEATURES:
+        FEATURE_COLUMNS[f"{_prefix}_{_vital}"] = getattr(StayFeature, f"{_prefix}_{_vital}")
+
+# Features that are NULL for some stays (no triage or no vital signs)
+NULLABLE_FEATURES = frozenset(
+    name for name, column in FEATURE_COLUMNS.items() if column.nullable
+)
+
+INDEXED_FEATURES = frozenset(name for name, column in FEATURE_COLUMNS.items() if column.index)
+
+
+def build_stay_features(conn: Connection) -> int:
+    """Materialize per-stay length of stay, acuity, row counts and vital sign
+    features; return rows written.
+
+    The table is dropped and recreated, so columns and indexes added to the
+    model reach databases built before them.
+    """
+    table = StayFeature.__table__
+    table.drop(conn, checkfirst=True)
+    table.create(conn)
+
+    seconds = cast(func.strftime("%s", EdStay.outtime), Integer) - cast(
+        func.strftime("%s", EdStay.intime), Integer
+    )
+    first_acuity = (
+        select(Triage.acuity)
+        .where(Triage.stay_id == EdStay.stay_id)
+        .order_by(Triage.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    vitals = [getattr(VitalSign, name) for name in VITAL_FEATURES]
+    vital_ranges = (
+        select(
+            VitalSign.stay_id,
+            func.count().label("rows"),
+            *(func.min(column).label(f"min_{column.key}") for column in vitals),
+            *(func.max(column).label(f"max_{column.key}") for column in vitals),
+        )
+        .group_by(VitalSign.stay_id)
+        .subquery()
+    )
+    ranked_vitals = select(
+        VitalSign.stay_id,
+        *vitals,
+        func.row_number()
+        .over(partition_by=VitalSign.stay_id, order_by=(VitalSign.charttime, VitalSign.id))
+        .label("position"),
+    ).subquery()
+    diagnoses = (
+        select(Diagnosis.stay_id, func.count().label("rows"))
+        .group_by(Diagnosis.stay_id)
+        .subquery()
+    )
+    medication_rows = union_all(select(MedRecon.stay_id), select(Pyxis.stay_id)).subquery()
+    medications = (
+        select(medication_rows.c.stay_id, func.count().label("rows"))
+        .group_by(medication_rows.c.stay_id)
+        .subquery()
+    )
+
+    columns = {
+        "stay_id": EdStay.stay_id,
+        "los_hours": seconds / 3600.0,
+        "acuity": first_acuity,
+        "vitals_count": func.coalesce(vital_ranges.c.rows, 0),
+        "diagnosis_count": func.coalesce(diagnoses.c.rows, 0),
+        "medication_count": func.coalesce(medications.c.rows, 0),
+    }
+    for name in VITAL_FEATURES:
+        columns[f"first_{name}"] = ranked_vitals.c[name]
+        columns[f"min_{name}"] = vital_ranges.c[f"min_{name}"]
+        columns[f"max_{name}"] = vital_ranges.c[f"max_{name}"]
+    features = (
+        select(*columns.values())
+        .outerjoin(vital_ranges, vital_ranges.c.stay_id == EdStay.stay_id)
+        .outerjoin(
+            ranked_vitals,
+            (ranked_vitals.c.stay_id == EdStay.stay_id) & (ranked_vitals.c.position == 1),
+        )
+        .outerjoin(diagnoses, diagnoses.c.stay_id == EdStay.stay_id)
+        .outerjoin(medications, medications.c.stay_id == EdStay.stay_id)
+    )
+    conn.execute(insert(table).from_select(list(columns), features))
+    return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def has_stay_features(db: Session) -> bool:
+    """Whether load_data.py has built the stay_features table with every
+    feature column (a table from an older build lacks some until reloaded)."""
+    if get_table_row_count(db, StayFeature.__tablename__) is None:
+        return False
+    try:
+        db.execute(select(*FEATURE_COLUMNS.values()).limit(0))
+    except DBAPIError:
+        db.rollback()
+        return False
+    return True
+
+
+def parse_feature_range(text: str) -> Tuple[str, Optional[float], Optional[float]]:
+    """Parse 'feature:min:max' (either bound may be empty) into a range.
+
+    Raises ValueError for an unknown feature, a bound that is not a finite
+    number, or a range with no bounds.
+    """
+    name, sep, bounds = text.partition(":")
+    low, sep2, high = bounds.partition(":")
+    if name not in FEATURE_COLUMNS or not sep or not sep2:
+        raise ValueError(f"expected feature:min:max with a feature of {sorted(FEATURE_COLUMNS)}")
+    low = float(low) if low.strip() else None
+    high = float(high) if high.strip() else None
+    if low is None and high is None:
+        raise ValueError("a range needs a min or a max")
+    if not all(math.isfinite(bound) for bound in (low, high) if bound is not None):
+        raise ValueError("range bounds must be finite numbers")
+    return name, low, high
@@ -0,0 +1,130 @@
+"""Stay lookups by diagnosis code and medication name.
+
+Each lookup selects the matching stay_ids from an index, for use as an
+`EdStay.stay_id IN (...)` semi-join: a stay matches once however many of its
+rows do, so the filters never multiply list rows. Diagnoses are looked up on
+the (icd_code, stay_id) index; medications on the medication_stays table,
+an inverted index from lower-cased drug name to stays built at load time.
+"""
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, delete, func, insert, or_, select, union
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.autocomplete import prefix_end
+from app.dataset import get_table_row_count
+from app.models import Diagnosis, MedicationStay, MedRecon, Pyxis
+
+# medication_stays source -> table it is built from
+MEDICATION_SOURCES = {"medrecon": MedRecon, "pyxis": Pyxis}
+
+
+def normalize_icd_code(code: str) -> str:
+    """ICD codes as stored: upper case, without the dot."""
+    return code.strip().replace(".", "").upper()
+
+
+def prefix_range(column, prefix: str):
+    """column starts with prefix, as a range an index can seek."""
+    end = prefix_end(prefix)
+    if end is None:
+        return column >= prefix
+    return and_(column >= prefix, column < end)
+
+
+def diagnosis_stays(codes: Iterable[str] = (), prefixes: Iterable[str] = ()):
+    """Select the stays with a diagnosis among codes or under any of prefixes."""
+    conditions = []
+    codes = list(codes)
+    if codes:
+        conditions.append(Diagnosis.icd_code.in_(codes))
+    conditions += [prefix_range(Diagnosis.icd_code, prefix) for prefix in prefixes]
+    return select(Diagnosis.stay_id).where(or_(*conditions))
+
+
+def normalize_medication_name(name: str) -> str:
+    """A medication name as medication_stays stores and looks it up: trimmed,
+    lower case.
+
+    Normalized in Python on both sides, since SQL lower() differs between
+    engines: SQLite's folds ASCII letters only.
+    """
+    return name.strip().lower()
+
+
+def medication_name(model):
+    """A medication table's name trimmed and lower-cased in SQL, for scans."""
+    return func.lower(func.trim(model.name))
+
+
+def has_medication_name(model):
+    """Rows medication_stays keeps: with a name that is not blank."""
+    return and_(model.name.is_not(None), func.trim(model.name) != "")
+
+
+def medication_stays(name: str, source: Optional[str] = None, indexed: bool = True):
+    """Select the stays given a medication whose name starts with name,
+    ignoring case, optionally from one source table only.
+
+    Without the index (indexed=False) the source tables are scanned instead,
+    lower-casing the name and the search alike in SQL.
+    """
+    if indexed:
+        query = select(MedicationStay.stay_id).where(
+            prefix_range(MedicationStay.name, normalize_medication_name(name))
+        )
+        if source:
+            query = query.where(MedicationStay.source == source)
+        return query
+    name = name.strip()
+    pattern = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return union(
+        *(
+            select(model.stay_id).where(
+                has_medication_name(model),
+                medication_name(model).like(func.lower(pattern), escape="\\"),
+            )
+            for table_source, model in MEDICATION_SOURCES.items()
+            if source in (None, table_source)
+        )
+    )
+
+
+def has_medication_index(db: Session) -> bool:
+    """Whether load_data.py has built the medication_stays table."""
+    return get_table_row_count(db, MedicationStay.__tablename__) is not None
+
+
+def build_medication_stays(conn: Connection, batch_size: int = 10000) -> int:
+    """Materialize the distinct (name, source, stay) triples of both medication
+    tables, with names normalized in Python; return rows written.
+
+    Source rows are read in stay order, so only one stay's names are held to
+    drop the duplicates normalizing makes.
+    """
+    table = MedicationStay.__table__
+    conn.execute(delete(table))
+    count = 0
+    batch = []
+    for source, model in MEDICATION_SOURCES.items():
+        rows = conn.execute(
+            select(model.stay_id, model.name)
+            .where(model.name.is_not(None))
+            .distinct()
+            .order_by(model.stay_id)
+        )
+        for stay_id, stay_rows in groupby(rows, key=itemgetter(0)):
+            names = {normalize_medication_name(name) for _, name in stay_rows}
+            names.discard("")
+            batch += [{"name": name, "source": source, "stay_id": stay_id} for name in names]
+            if len(batch) >= batch_size:
+                conn.execute(insert(table), batch)
+                count += len(batch)
+                batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+        count += len(batch)
+    return count
@@ -1,12 +1,47 @@
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from app.config import (
+    DATABASE_MODE,
+    METRICS_DB_HEADERS,
+    DETAIL_CACHE_WARM,
+    PROFILING_ENABLED,
+    THREADPOOL_SIZE,
+)
+from app.metrics import MetricsMiddleware, render_metrics
+from app.profiling import profile_request
+from app.routers import dataset
+from app.routers.encounters import warm_detail_cache
+
+if DATABASE_MODE == "async":
+    from app.routers import (
+        census_async as census,
+        encounters_async as encounters,
+        filters_async as filters,
+        patients_async as patients,
+    )
+else:
+    from app.routers import census, encounters, filters, patients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync routes run on this threadpool; DB_POOL_SIZE defaults to its size
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    if DETAIL_CACHE_WARM:
+        await anyio.to_thread.run_sync(warm_detail_cache, DETAIL_CACHE_WARM)
+    yield
 
-from app.routers import encounters, filters
 
 app = FastAPI(
     title="MIMIC IV ED Dashboard API",
     version="1.0.0",
     description="API for exploring MIMIC IV ED Demo dataset",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -18,9 +53,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Time each request and count its SQL statements, per route template
+app.add_middleware(MetricsMiddleware, db_headers=METRICS_DB_HEADERS)
+
+
+if PROFILING_ENABLED:
+    # Requests sending X-Profile: 1 or profile=1 get a profile report instead
+    app.middleware("http")(profile_request)
+
+
 # Include routers
 app.include_router(encounters.router, prefix="/api/encounters", tags=["encounters"])
 app.include_router(filters.router, prefix="/api/filters", tags=["filters"])
+app.include_router(patients.router, prefix="/api/patients", tags=["patients"])
+app.include_router(census.router, prefix="/api/census", tags=["census"])
+app.include_router(dataset.router, prefix="/api/dataset", tags=["dataset"])
 
 
 @app.get("/")
@@ -31,3 +79,9 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Request latency and SQL metrics in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
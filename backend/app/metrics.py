@@ -0,0 +1,210 @@
+"""Per-route request latency and SQL metrics, rendered in Prometheus text format.
+
+Request handling is timed by MetricsMiddleware until the response body has
+been sent, so streamed responses include the SQL they run while streaming.
+SQL statements are timed by cursor events on every SQLAlchemy engine and
+attributed to the request that ran them through a context variable, which
+follows the request onto the threadpool and into AsyncSession.run_sync.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Histogram bucket upper bounds, in seconds (Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label for requests that matched no route, so 404s cannot add labels
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """SQL statements run while handling one request."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observations, kept per label set."""
+
+    def __init__(
+        self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: Dict[tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # per-bucket counts (last is +Inf), sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self, label_names: Tuple[str, ...]) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            )
+        for labels, counts, total in series:
+            base = _labels(label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f'{self.name}_bucket{{{base},le="{le}"}} {cumulative}'
+            yield f"{self.name}_sum{{{base}}} {total}"
+            yield f"{self.name}_count{{{base}}} {cumulative}"
+
+
+class Counter:
+    """Monotonic counter, kept per label set."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self, label_names: Tuple[str, ...]) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, value in series:
+            yield f"{self.name}{{{_labels(label_names, labels)}}} {value}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+REQUEST_LABELS = ("method", "route", "status")
+ROUTE_LABELS = ("method", "route")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time to produce and send a response, by route."
+)
+request_db_duration = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request, by route."
+)
+request_db_queries = Counter(
+    "http_request_db_queries_total", "SQL statements executed, by route."
+)
+
+
+def record_request(
+    method: str, route: str, status: int, seconds: float, stats: RequestStats
+):
+    """Add one finished request to the route metrics."""
+    request_duration.observe((method, route, status), seconds)
+    request_db_duration.observe((method, route), stats.db_seconds)
+    request_db_queries.inc((method, route), stats.queries)
+
+
+class MetricsMiddleware:
+    """Time each HTTP request and count its SQL statements, per route template.
+
+    A request is recorded once its response has been sent in full. With
+    db_headers, X-DB-Queries and X-DB-Time (ms) go out with the response
+    start, so for a streamed response they only count the SQL run before
+    its body; /metrics has the full figures.
+    """
+
+    def __init__(self, app: ASGIApp, db_headers: bool = False):
+        self.app = app
+        self.db_headers = db_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_stats(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.db_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.queries)
+                    headers["X-DB-Time"] = f"{stats.db_seconds * 1000:.3f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_request.reset(token)
+            route = scope.get("route")
+            record_request(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                time.perf_counter() - start,
+                stats,
+            )
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines = []
+    lines.extend(request_duration.render(REQUEST_LABELS))
+    lines.extend(request_db_duration.render(ROUTE_LABELS))
+    lines.extend(request_db_queries.render(ROUTE_LABELS))
+    return "\n".join(lines) + "\n"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.execution_context is not None:
+        starts = context.connection.info.get("query_start_time")
+        if starts:
+            starts.pop()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -10,7 +10,7 @@ class EdStay(Base):
     subject_id = Column(Integer, nullable=False, index=True)
     hadm_id = Column(Integer, nullable=True)
     intime = Column(DateTime, nullable=False, index=True)
-    outtime = Column(DateTime, nullable=False)
+    outtime = Column(DateTime, nullable=False, index=True)
     gender = Column(String(1), nullable=False, index=True)
     race = Column(String(100), nullable=True, index=True)
     arrival_transport = Column(String(50), nullable=True)
@@ -64,6 +64,8 @@ class VitalSign(Base):
 
 class Diagnosis(Base):
     __tablename__ = "diagnoses"
+    # Covers code and code-prefix lookups of stays without reading the table
+    __table_args__ = (Index("ix_diagnoses_icd_code_stay_id", "icd_code", "stay_id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     subject_id = Column(Integer, nullable=False)
@@ -106,3 +108,99 @@ class Pyxis(Base):
     gsn = Column(String(20), nullable=True)
 
     edstay = relationship("EdStay", back_populates="pyxis")
+
+
+class FilterOptionValue(Base):
+    """Distinct filter values with their frequencies, built by load_data.py."""
+
+    __tablename__ = "filter_options"
+
+    category = Column(String(50), primary_key=True)
+    value = Column(Text, primary_key=True)
+    frequency = Column(Integer, nullable=False)
+
+
+class MedicationStay(Base):
+    """Stays per lower-cased medication name and source table, built by
+    load_data.py."""
+
+    __tablename__ = "medication_stays"
+
+    name = Column(String(200), primary_key=True)
+    source = Column(String(10), primary_key=True)  # 'medrecon' or 'pyxis'
+    stay_id = Column(Integer, ForeignKey("edstays.stay_id"), primary_key=True)
+
+
+class LoadManifest(Base):
+    """Load state of each source file, written by load_data.py."""
+
+    __tablename__ = "load_manifest"
+
+    table_name = Column(String(50), primary_key=True)
+    source_file = Column(String(200), nullable=False)
+    source_sha256 = Column(String(64), nullable=True)
+    row_count = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False)  # 'loading' or 'complete'
+    generation = Column(Integer, nullable=False)
+    loaded_at = Column(DateTime, nullable=True)
+
+
+class StayFeature(Base):
+    """Per-stay values derived from the source tables, built by load_data.py."""
+
+    __tablename__ = "stay_features"
+
+    stay_id = Column(Integer, ForeignKey("edstays.stay_id"), primary_key=True)
+    los_hours = Column(Float, nullable=False, index=True)
+    acuity = Column(Integer, nullable=True, index=True)  # from the stay's first triage row
+    vitals_count = Column(Integer, nullable=False, index=True)
+    diagnosis_count = Column(Integer, nullable=False, index=True)
+    medication_count = Column(Integer, nullable=False, index=True)  # medrecon + pyxis rows
+    # Vital signs of the stay's first vitalsigns row, and their extremes
+    first_temperature = Column(Float, nullable=True)
+    first_heartrate = Column(Float, nullable=True)
+    first_resprate = Column(Float, nullable=True)
+    first_o2sat = Column(Float, nullable=True)
+    first_sbp = Column(Float, nullable=True)
+    first_dbp = Column(Float, nullable=True)
+    min_temperature = Column(Float, nullable=True)
+    min_heartrate = Column(Float, nullable=True)
+    min_resprate = Column(Float, nullable=True)
+    min_o2sat = Column(Float, nullable=True)
+    min_sbp = Column(Float, nullable=True)
+    min_dbp = Column(Float, nullable=True)
+    max_temperature = Column(Float, nullable=True)
+    max_heartrate = Column(Float, nullable=True)
+    max_resprate = Column(Float, nullable=True)
+    max_o2sat = Column(Float, nullable=True)
+    max_sbp = Column(Float, nullable=True)
+    max_dbp = Column(Float, nullable=True)
+
+
+class EncounterRollup(Base):
+    """Stay counts and total length of stay per gender, race, disposition and
+    acuity, built by load_data.py."""
+
+    __tablename__ = "encounter_rollup"
+
+    id = Column(Integer, primary_key=True)
+    gender = Column(String(1), nullable=False)
+    race = Column(String(100), nullable=True)
+    disposition = Column(String(50), nullable=False)
+    acuity = Column(Integer, nullable=True)
+    stays = Column(Integer, nullable=False)
+    los_hours_sum = Column(Float, nullable=False)
+
+
+class LengthOfStayRollup(Base):
+    """Stay counts per gender, race, disposition and length-of-stay bin, built
+    by load_data.py."""
+
+    __tablename__ = "los_rollup"
+
+    id = Column(Integer, primary_key=True)
+    gender = Column(String(1), nullable=False)
+    race = Column(String(100), nullable=True)
+    disposition = Column(String(50), nullable=False)
+    los_bin = Column(Integer, nullable=False)
+    stays = Column(Integer, nullable=False)
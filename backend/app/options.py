@@ -0,0 +1,96 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, literal, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models import EdStay, FilterOptionValue, Triage
+from app.schemas import FilterOptions
+
+# filter_options category -> column whose distinct values it holds
+OPTION_COLUMNS = {
+    "gender": EdStay.gender,
+    "race": EdStay.race,
+    "disposition": EdStay.disposition,
+    "chief_complaint": Triage.chiefcomplaint,
+}
+
+# Categories holding the earliest and latest arrival time
+INTIME_MIN = "intime_min"
+INTIME_MAX = "intime_max"
+
+
+def build_filter_options(conn: Connection) -> int:
+    """Materialize distinct filter values and the date range; return rows written."""
+    table = FilterOptionValue.__table__
+    conn.execute(delete(table))
+    for category, column in OPTION_COLUMNS.items():
+        distinct_values = (
+            select(literal(category), column, func.count())
+            .where(and_(column.is_not(None), column != ""))
+            .group_by(column)
+        )
+        conn.execute(
+            insert(table).from_select(["category", "value", "frequency"], distinct_values)
+        )
+    intime_min, intime_max, stays = conn.execute(
+        select(func.min(EdStay.intime), func.max(EdStay.intime), func.count())
+    ).one()
+    if stays:
+        conn.execute(
+            insert(table),
+            [
+                {"category": INTIME_MIN, "value": intime_min.isoformat(), "frequency": stays},
+                {"category": INTIME_MAX, "value": intime_max.isoformat(), "frequency": stays},
+            ],
+        )
+    return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def read_filter_options(db: Session) -> Optional[FilterOptions]:
+    """Filter options from the materialized table, or None if it is not built."""
+    try:
+        rows = (
+            db.query(FilterOptionValue.category, FilterOptionValue.value)
+            # Chief complaints are served by prefix from the complaint index instead
+            .filter(FilterOptionValue.category != "chief_complaint")
+            .order_by(FilterOptionValue.category, FilterOptionValue.value)
+            .all()
+        )
+    except OperationalError:
+        db.rollback()
+        return None
+    if not rows:
+        return None
+
+    values = {category: [] for category in ("gender", "race", "disposition")}
+    date_range = {"min": None, "max": None}
+    for category, value in rows:
+        if category == INTIME_MIN:
+            date_range["min"] = value
+        elif category == INTIME_MAX:
+            date_range["max"] = value
+        elif category in values:
+            values[category].append(value)
+    return FilterOptions(
+        genders=values["gender"],
+        races=values["race"],
+        dispositions=values["disposition"],
+        date_range=date_range,
+    )
+
+
+def read_option_frequencies(db: Session, category: str) -> Optional[List[Tuple[str, int]]]:
+    """(value, frequency) pairs of one category from the materialized table, or
+    None if it is not built."""
+    try:
+        rows = (
+            db.query(FilterOptionValue.value, FilterOptionValue.frequency)
+            .filter(FilterOptionValue.category == category)
+            .all()
+        )
+    except OperationalError:
+        db.rollback()
+        return None
+    return [tuple(row) for row in rows] or None
@@ -0,0 +1,231 @@
+"""Opt-in request profiling, enabled by PROFILING_ENABLED.
+
+A request carrying an X-Profile: 1 header or a profile=1 query parameter is
+run under cProfile, and its response is replaced by a JSON report: the
+hottest functions by cumulative time, and every SQL statement with its time
+and query plan. With PROFILE_DIR set, the report and a .prof file (for
+pstats or snakeviz) are also saved there.
+
+cProfile only sees the thread it is enabled on, so the middleware profiles
+the event loop thread and ProfilingRoute profiles sync endpoints on the
+threadpool thread that runs them, as are the DuckDB run_sync calls of async
+routes; all of them are merged into one report.
+
+With DATABASE_MODE=async, aiosqlite sessions run the route's sync function
+in a greenlet on the event loop thread. It is suspended at every SQL
+statement, and cProfile's call stack does not survive the switches, so its
+functions appear with their own time between statements but understated
+cumulative times. The report says so in its notes; SQL timings are exact.
+"""
+import asyncio
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import DATABASE_MODE, PROFILE_DIR, PROFILE_TOP_FUNCTIONS
+
+# Query plan prefix per dialect
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "duckdb": "EXPLAIN "}
+
+ASYNC_MODE_NOTE = (
+    "DATABASE_MODE=async: on an aiosqlite session, the route's sync code runs in an "
+    "AsyncSession.run_sync greenlet suspended at every SQL statement. cProfile loses its call "
+    "stack at each switch, so these functions show their own time between statements "
+    "but understated cumulative times. SQL timings are exact."
+)
+
+
+class ProfileSession:
+    """Profiles and SQL statements collected for one profiled request."""
+
+    def __init__(self):
+        self.profiles: List[cProfile.Profile] = []
+        self.statements: List[dict] = []
+
+    def run(self, fn, *args, **kwargs):
+        """Call fn under a profiler kept with this session."""
+        profiler = cProfile.Profile()
+        self.profiles.append(profiler)
+        profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+
+    def stats(self) -> Optional[pstats.Stats]:
+        profiles = [p for p in self.profiles if p.getstats()]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        return stats
+
+
+current_profile: ContextVar[Optional[ProfileSession]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class ProfilingRoute(APIRoute):
+    """APIRoute whose sync endpoints are profiled on their threadpool thread
+    when the request is being profiled."""
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if call is not None and not asyncio.iscoroutinefunction(call):
+
+            @functools.wraps(call)
+            def profiled_call(*args, **kwargs):
+                return profiled(call)(*args, **kwargs)
+
+            self.dependant.call = profiled_call
+        return super().get_route_handler()
+
+
+def profiled(fn):
+    """fn, run under the request's profiler if the request is being profiled;
+    for sync work an async route sends to the threadpool."""
+    session = current_profile.get()
+    if session is None:
+        return fn
+
+    @functools.wraps(fn)
+    def profiled_fn(*args, **kwargs):
+        return session.run(fn, *args, **kwargs)
+
+    return profiled_fn
+
+
+def profile_requested(request: Request) -> bool:
+    return (
+        request.headers.get("x-profile") == "1"
+        or request.query_params.get("profile") == "1"
+    )
+
+
+def explain(dialect: str, statement: str, parameters) -> Optional[List[str]]:
+    """Query plan of a SELECT statement as text lines, or None if unavailable."""
+    from app.database import analytic_engine, engine
+
+    prefix = EXPLAIN_PREFIXES.get(dialect)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    target = analytic_engine if dialect == "duckdb" else engine
+    try:
+        with target.connect() as conn:
+            rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+    except Exception as exc:  # a failed EXPLAIN must not fail the report
+        return [f"EXPLAIN failed: {exc}"]
+    return [" | ".join(str(value) for value in row) for row in rows]
+
+
+def build_report(
+    request: Request, status: int, seconds: float, session: ProfileSession
+) -> dict:
+    """The JSON profile report for a finished request."""
+    functions = ""
+    stats = session.stats()
+    if stats is not None:
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        functions = stats.stream.getvalue()
+    return {
+        "method": request.method,
+        "path": request.url.path,
+        "query": str(request.url.query),
+        "status": status,
+        "total_ms": round(seconds * 1000, 3),
+        "sql_ms": round(sum(s["ms"] for s in session.statements), 3),
+        "sql": [
+            dict(s, plan=explain(s["dialect"], s["statement"], s["parameters"]))
+            for s in session.statements
+        ],
+        "functions": functions,
+        "notes": [ASYNC_MODE_NOTE] if DATABASE_MODE == "async" else [],
+    }
+
+
+def save_report(report: dict, session: ProfileSession) -> str:
+    """Write the report and merged profile to PROFILE_DIR; return the file stem."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    route = report["path"].strip("/").replace("/", "_") or "root"
+    stem = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{route}"
+    with open(os.path.join(PROFILE_DIR, f"{stem}.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    stats = session.stats()
+    if stats is not None:
+        stats.dump_stats(os.path.join(PROFILE_DIR, f"{stem}.prof"))
+    return stem
+
+
+async def profile_request(request: Request, call_next):
+    """Middleware body: run a request under the profiler if it asks to be."""
+    if not profile_requested(request):
+        return await call_next(request)
+
+    session = ProfileSession()
+    token = current_profile.set(session)
+    loop_profiler = cProfile.Profile()
+    session.profiles.append(loop_profiler)
+    start = time.perf_counter()
+    loop_profiler.enable()
+    try:
+        response = await call_next(request)
+        # Drain streamed bodies so their work is part of the profile
+        async for _ in response.body_iterator:
+            pass
+    finally:
+        loop_profiler.disable()
+        current_profile.reset(token)
+    seconds = time.perf_counter() - start
+
+    report = jsonable_encoder(build_report(request, response.status_code, seconds, session))
+    headers = {}
+    if PROFILE_DIR:
+        headers["X-Profile-Report"] = save_report(report, session)
+    return JSONResponse(report, headers=headers)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("profile_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    session = current_profile.get()
+    starts = conn.info.get("profile_start_time")
+    if session is None or not starts:
+        return
+    session.statements.append(
+        {
+            "dialect": conn.dialect.name,
+            "statement": statement,
+            "parameters": None if executemany else parameters,
+            "ms": round((time.perf_counter() - starts.pop()) * 1000, 3),
+        }
+    )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.execution_context is not None:
+        starts = context.connection.info.get("profile_start_time")
+        if starts and current_profile.get() is not None:
+            starts.pop()
@@ -0,0 +1,70 @@
+from dataclasses import replace
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.cache import LRUCache
+from app.census import (
+    OccupancyTimeline,
+    bucket_edges,
+    build_timeline,
+    occupancy,
+    parse_bucket,
+)
+from app.cohort import CohortFilters, cohort_filters
+from app.config import CENSUS_CACHE_MB, CENSUS_MAX_BUCKETS
+from app.database import get_db
+from app.dataset import get_data_generation
+from app.profiling import ProfilingRoute
+from app.schemas import CensusSeries
+
+router = APIRouter(route_class=ProfilingRoute)
+
+# Occupancy timelines keyed by (data generation, filter signature without dates)
+timeline_cache = LRUCache(
+    maxsize=64,
+    max_bytes=CENSUS_CACHE_MB * 1024 * 1024,
+    sizeof=lambda timeline: timeline.nbytes,
+    name="census_timelines",
+)
+
+
+def cohort_timeline(db: Session, filters: CohortFilters) -> OccupancyTimeline:
+    """A cohort's occupancy timeline, cached per data generation."""
+    key = (get_data_generation(db), filters.signature())
+    timeline = timeline_cache.get(key)
+    if timeline is None:
+        timeline = build_timeline(db, filters)
+        timeline_cache.set(key, timeline)
+    return timeline
+
+
+def census(db: Session, filters: CohortFilters, bucket: str) -> CensusSeries:
+    """Occupancy, arrivals and departures per bucket for a cohort.
+
+    date_from and date_to bound the window rather than filter arrivals, so
+    patients who arrived before date_from still count while they are present.
+    The other list filters select the stays.
+    """
+    bucket_seconds = parse_bucket(bucket)
+    window = filters.date_from, filters.date_to
+    if window[0] and window[1] and window[1] <= window[0]:
+        raise HTTPException(status_code=400, detail="date_to must be after date_from")
+    stays = replace(filters, date_from=None, date_to=None).resolve(db)
+
+    timeline = cohort_timeline(db, stays)
+    try:
+        edges = bucket_edges(timeline, bucket_seconds, *window, max_buckets=CENSUS_MAX_BUCKETS)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return occupancy(timeline, edges, bucket_seconds)
+
+
+@router.get("", response_model=CensusSeries)
+def get_census(
+    filters: CohortFilters = Depends(cohort_filters),
+    bucket: str = Query("1h", regex="^[1-9][0-9]*[mhd]$"),
+    db: Session = Depends(get_db),
+):
+    """Get ED occupancy per time bucket between date_from and date_to."""
+    return census(db, filters, bucket)
@@ -0,0 +1,21 @@
+"""async def versions of the census routes, used when DATABASE_MODE=async."""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cohort import CohortFilters, cohort_filters
+from app.database import get_async_db
+from app.profiling import ProfilingRoute
+from app.routers.census import census
+from app.schemas import CensusSeries
+
+router = APIRouter(route_class=ProfilingRoute)
+
+
+@router.get("", response_model=CensusSeries)
+async def get_census(
+    filters: CohortFilters = Depends(cohort_filters),
+    bucket: str = Query("1h", regex="^[1-9][0-9]*[mhd]$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get ED occupancy per time bucket between date_from and date_to."""
+    return await db.run_sync(census, filters, bucket)
@@ -0,0 +1,32 @@
+from typing import Dict
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.cache import caches
+from app.database import get_db
+from app.dataset import get_data_generation, get_manifest
+from app.profiling import ProfilingRoute
+from app.schemas import CacheStats, DatasetStatus, ManifestEntry
+
+router = APIRouter(route_class=ProfilingRoute)
+
+
+@router.get("", response_model=DatasetStatus)
+def get_dataset_status(db: Session = Depends(get_db)):
+    """Get the data generation and per-table load state."""
+    entries = get_manifest(db)
+    return DatasetStatus(
+        generation=get_data_generation(db),
+        complete=bool(entries) and all(e.status == "complete" for e in entries),
+        tables=[ManifestEntry.model_validate(e) for e in entries],
+    )
+
+
+@router.get("/caches", response_model=Dict[str, CacheStats])
+def get_cache_stats():
+    """Get the size and hit, miss and eviction counts of each in-process cache.
+
+    Caches are per worker process; the counts cover the process that answers.
+    """
+    return {name: cache.stats() for name, cache in sorted(caches.items())}
@@ -1,224 +1,708 @@
+import base64
+import binascii
+import json
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from typing import Optional, List
+from sqlalchemy import func, and_, or_, bindparam, literal, null, select, union_all
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 
-from app.database import get_db
-from app.models import EdStay, Triage, VitalSign, Diagnosis, MedRecon, Pyxis
+from app.cache import LRUCache
+from app.cohort import CohortFilters, cohort_filters
+from app.config import BATCH_MAX_STAYS, COUNT_CACHE_SIZE, DETAIL_CACHE_MB, DETAIL_CACHE_SIZE
+from app.database import AnalyticSessionLocal, SessionLocal, get_analytic_db, get_db
+from app.dataset import get_data_generation, get_table_row_count
+from app.downsample import minmax_indices
+from app.export import EXPORT_MEDIA_TYPES, export_cohort
+from app.features import (
+    FEATURE_COLUMNS,
+    INDEXED_FEATURES,
+    NULLABLE_FEATURES,
+    has_stay_features,
+)
+from app.models import EdStay, StayFeature, Triage, VitalSign, Diagnosis, MedRecon, Pyxis
+from app.profiling import ProfilingRoute
+from app.search import fts_ranking
+from app.serialization import JSONBytesResponse, dumps
+from app.summary import cohort_summary
 from app.schemas import (
-    EncounterListItem,
+    EncounterBatchRequest,
+    EncounterBatchResponse,
+    EncounterCount,
     EncounterListResponse,
     EncounterDetail,
-    TriageSchema,
-    VitalSignSchema,
-    DiagnosisSchema,
-    MedicationSchema,
+    EncounterSummary,
+    VitalsSeries,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
+# Rows sampled by estimate_count before extrapolating
+ESTIMATE_SAMPLE_ROWS = 10000
 
-@router.get("", response_model=EncounterListResponse)
-def get_encounters(
-    gender: Optional[str] = None,
-    race: Optional[List[str]] = Query(None),
-    disposition: Optional[List[str]] = Query(None),
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
-    chief_complaint: Optional[str] = None,
+# Numeric vital sign columns, the series downsampling preserves
+VITALS_NUMERIC_COLUMNS = ("temperature", "heartrate", "resprate", "o2sat", "sbp", "dbp")
+VITALS_COLUMNS = ("charttime",) + VITALS_NUMERIC_COLUMNS + ("rhythm", "pain")
+
+# Stay columns of a list item or detail, in response model field order
+STAY_COLUMNS = (
+    EdStay.stay_id,
+    EdStay.subject_id,
+    EdStay.hadm_id,
+    EdStay.intime,
+    EdStay.outtime,
+    EdStay.gender,
+    EdStay.race,
+    EdStay.arrival_transport,
+    EdStay.disposition,
+)
+LIST_COLUMNS = STAY_COLUMNS + (Triage.chiefcomplaint, Triage.acuity)
+
+# Child table columns of a detail, in schema field order
+TRIAGE_COLUMNS = (
+    "temperature",
+    "heartrate",
+    "resprate",
+    "o2sat",
+    "sbp",
+    "dbp",
+    "pain",
+    "acuity",
+    "chiefcomplaint",
+)
+DIAGNOSIS_COLUMNS = ("seq_num", "icd_code", "icd_version", "icd_title")
+MEDICATION_COLUMNS = ("charttime", "name", "source", "gsn", "description")
+
+# Detail list queries -> their columns, after the leading stay_id
+DETAIL_LIST_COLUMNS = {
+    "vitalsigns": VITALS_COLUMNS,
+    "diagnoses": DIAGNOSIS_COLUMNS,
+    "medications": MEDICATION_COLUMNS,
+}
+
+# Exact cohort totals keyed by (data generation, filter signature)
+count_cache = LRUCache(maxsize=COUNT_CACHE_SIZE, name="cohort_counts")
+
+# Cohort summaries keyed the same way
+summary_cache = LRUCache(maxsize=COUNT_CACHE_SIZE, name="cohort_summaries")
+
+# Encoded encounter details keyed by (data generation, stay_id); entries of
+# earlier generations are never read again and age out
+detail_cache = LRUCache(
+    maxsize=DETAIL_CACHE_SIZE,
+    max_bytes=DETAIL_CACHE_MB * 1024 * 1024,
+    sizeof=len,
+    name="encounter_details",
+)
+
+
+def encode_cursor(sort_by: str, sort_order: str, value, stay_id: int) -> str:
+    """Encode the last row's (sort value, stay_id) as an opaque cursor."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, sort_order, value, stay_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _is_number(value) -> bool:
+    """Whether a decoded JSON value is a finite int or float (not a bool)."""
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+def _cursor_value(sort_by: str, value):
+    """A cursor's sort value checked against, and converted to, the sort
+    column's type; raises ValueError if it does not fit."""
+    if sort_by in ("intime", "outtime"):
+        if not isinstance(value, str):
+            raise ValueError("cursor value is not a timestamp")
+        return datetime.fromisoformat(value)
+    if sort_by == "disposition":
+        if not isinstance(value, str):
+            raise ValueError("cursor value is not a string")
+        return value
+    if value is None and sort_by in NULLABLE_FEATURES:
+        return None
+    if not _is_number(value) or (sort_by == "stay_id" and not isinstance(value, int)):
+        raise ValueError("cursor value is not a number")
+    return value
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str):
+    """Decode a cursor into (sort value, stay_id).
+
+    Raises ValueError if the cursor is malformed, holds values of the wrong
+    type for the sort, or was issued for a different sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, cursor_order, value, stay_id = json.loads(
+            base64.urlsafe_b64decode(padded)
+        )
+        if (cursor_sort_by, cursor_order) != (sort_by, sort_order):
+            raise ValueError("cursor does not match sort")
+        if not isinstance(stay_id, int) or isinstance(stay_id, bool):
+            raise ValueError("cursor stay_id is not an integer")
+        return _cursor_value(sort_by, value), stay_id
+    except (TypeError, ValueError, binascii.Error) as exc:
+        raise ValueError(f"invalid cursor: {exc}") from exc
+
+
+def keyset_condition(
+    sort_column, sort_order: str, value, stay_id: int, nullable: bool = False
+):
+    """Rows strictly after (value, stay_id) in the given sort order.
+
+    For a nullable column, NULLs sort first ascending and last descending,
+    as list_encounters orders them.
+    """
+    if value is None:
+        if sort_order == "desc":
+            return and_(sort_column.is_(None), EdStay.stay_id < stay_id)
+        return or_(
+            sort_column.is_not(None),
+            and_(sort_column.is_(None), EdStay.stay_id > stay_id),
+        )
+    if sort_order == "desc":
+        condition = or_(
+            sort_column < value,
+            and_(sort_column == value, EdStay.stay_id < stay_id),
+        )
+        return or_(condition, sort_column.is_(None)) if nullable else condition
+    return or_(
+        sort_column > value,
+        and_(sort_column == value, EdStay.stay_id > stay_id),
+    )
+
+
+def encounter_query(db: Session):
+    """Base list query: every stay with its triage row, if any."""
+    return db.query(EdStay, Triage).outerjoin(Triage, EdStay.stay_id == Triage.stay_id)
+
+
+def list_query(db: Session):
+    """Base list query selecting only the LIST_COLUMNS of each stay and triage row."""
+    return db.query(*LIST_COLUMNS).outerjoin(Triage, EdStay.stay_id == Triage.stay_id)
+
+
+def duration_hours(intime: datetime, outtime: datetime) -> float:
+    return round((outtime - intime).total_seconds() / 3600, 2)
+
+
+def exact_count(db: Session, filters: CohortFilters, generation: int) -> int:
+    """Exact number of encounters in a cohort, cached per data generation."""
+    key = (generation, filters.signature())
+    total = count_cache.get(key)
+    if total is None:
+        total = filters.apply(encounter_query(db)).count()
+        count_cache.set(key, total)
+    return total
+
+
+def estimate_count(db: Session, filters: CohortFilters, generation: int) -> Tuple[int, bool]:
+    """Estimate the size of a cohort without a full count.
+
+    Returns (total, is_exact). A cached exact count is used when available,
+    and an unfiltered cohort is the loader's exact stay count. Otherwise the
+    filtered rows are walked in stay_id order until
+    ESTIMATE_SAMPLE_ROWS matches are found; the fraction of stays scanned to
+    get there is extrapolated to the whole table. Cohorts smaller than the
+    sample are counted exactly.
+    """
+    cached = count_cache.get((generation, filters.signature()))
+    if cached is not None:
+        return cached, True
+
+    table_rows = get_table_row_count(db, EdStay.__tablename__)
+    if filters.is_empty and table_rows is not None:
+        return table_rows, True
+
+    query = filters.apply(encounter_query(db))
+    boundary = (
+        query.with_entities(EdStay.stay_id)
+        .order_by(EdStay.stay_id)
+        .offset(ESTIMATE_SAMPLE_ROWS - 1)
+        .limit(1)
+        .scalar()
+    )
+    if boundary is None:
+        return exact_count(db, filters, generation), True
+
+    if table_rows is None:
+        table_rows = db.query(func.count(EdStay.stay_id)).scalar()
+    scanned = (
+        db.query(func.count(EdStay.stay_id)).filter(EdStay.stay_id <= boundary).scalar()
+    )
+    return round(ESTIMATE_SAMPLE_ROWS * table_rows / scanned), False
+
+
+@dataclass(frozen=True)
+class ListParams:
+    """Paging, sorting and counting options for the encounter list."""
+
+    page: int = 1
+    per_page: int = 20
+    sort_by: str = "intime"
+    sort_order: str = "desc"
+    pagination: str = "offset"
+    cursor: Optional[str] = None
+    total_mode: str = "exact"
+
+
+# sort_by values: stay columns, relevance, and the stay_features columns
+SORT_PATTERN = "^({})$".format(
+    "|".join(("intime", "outtime", "stay_id", "disposition", "relevance", *FEATURE_COLUMNS))
+)
+
+
+# async so FastAPI parses parameters without a threadpool hop
+async def list_params(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    sort_by: str = Query("intime", regex="^(intime|outtime|stay_id|disposition)$"),
+    sort_by: str = Query("intime", regex=SORT_PATTERN),
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
-    db: Session = Depends(get_db),
-):
-    """Get list of encounters with filtering and pagination."""
-    # Base query with triage join
-    query = db.query(EdStay, Triage).outerjoin(Triage, EdStay.stay_id == Triage.stay_id)
-
-    # Apply filters
-    conditions = []
-    if gender:
-        conditions.append(EdStay.gender == gender)
-    if race:
-        conditions.append(EdStay.race.in_(race))
-    if disposition:
-        conditions.append(EdStay.disposition.in_(disposition))
-    if date_from:
-        try:
-            dt_from = datetime.fromisoformat(date_from)
-            conditions.append(EdStay.intime >= dt_from)
-        except ValueError:
-            pass
-    if date_to:
-        try:
-            dt_to = datetime.fromisoformat(date_to)
-            conditions.append(EdStay.intime <= dt_to)
-        except ValueError:
-            pass
-    if chief_complaint:
-        conditions.append(Triage.chiefcomplaint.ilike(f"%{chief_complaint}%"))
+    pagination: str = Query("offset", regex="^(offset|cursor)$"),
+    cursor: Optional[str] = None,
+    total_mode: str = Query("exact", regex="^(exact|estimate|none)$"),
+) -> ListParams:
+    """Dependency parsing the encounter list paging and sorting parameters."""
+    return ListParams(page, per_page, sort_by, sort_order, pagination, cursor, total_mode)
+
+
+def count_encounters(db: Session, filters: CohortFilters) -> EncounterCount:
+    """Exact size of a cohort."""
+    filters = filters.resolve(db)
+    return EncounterCount(total=exact_count(db, filters, get_data_generation(db)))
+
+
+def encounter_summary(db: Session, filters: CohortFilters) -> EncounterSummary:
+    """Disposition, acuity and length-of-stay summary of a cohort, cached per
+    data generation; 503 if the summary tables have not been built."""
+    filters = filters.resolve(db)
+    key = (get_data_generation(db), filters.signature())
+    summary = summary_cache.get(key)
+    if summary is None:
+        summary = cohort_summary(db, filters)
+        if summary is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Summary tables are not built; run load_data.py",
+            )
+        summary_cache.set(key, summary)
+    return summary
+
 
-    if conditions:
-        query = query.filter(and_(*conditions))
+def export_response(
+    db: Session, filters: CohortFilters, export_format: str, include_children: bool
+) -> StreamingResponse:
+    """Stream a cohort as a CSV or NDJSON download (see export_cohort).
+
+    Feature ranges are checked up front on the request's session, so the 503
+    for unbuilt stay features is returned before the download starts rather
+    than cutting it off.
+    """
+    if filters.feature_ranges:
+        filters.resolve(db)
+    return StreamingResponse(
+        export_cohort(
+            filters, export_format, include_children, session_factory=AnalyticSessionLocal
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="encounters.{export_format}"'
+        },
+    )
+
+
+def list_encounters(db: Session, filters: CohortFilters, params: ListParams) -> bytes:
+    """Get list of encounters with filtering and pagination, as an encoded
+    EncounterListResponse.
+
+    With pagination=cursor, pages are fetched by keyset instead of OFFSET:
+    pass the previous response's next_cursor to get the following page.
+
+    total_mode=estimate returns an approximate total when no exact count is
+    cached, and total_mode=none skips counting; GET /count then supplies the
+    exact figure.
+
+    sort_by=relevance orders a full-text chief complaint search best match
+    first (sort_order is ignored); without such a search it falls back to the
+    default newest-first order. Sorting by a stay feature (duration_hours,
+    acuity, counts, vital signs) joins stay_features and sorts in SQL, with
+    stays lacking the feature first ascending and last descending; 503 if
+    the table has not been built.
+    """
+    page, per_page = params.page, params.per_page
+    sort_by, sort_order = params.sort_by, params.sort_order
+    pagination, cursor, total_mode = params.pagination, params.cursor, params.total_mode
+    filters = filters.resolve(db)
+
+    if sort_by == "relevance" and pagination == "cursor":
+        raise HTTPException(
+            status_code=400,
+            detail="sort_by=relevance does not support cursor pagination",
+        )
+
+    # Base query with triage join, filtered
+    query = filters.apply(list_query(db))
 
     # Get total count
-    total = query.count()
+    generation = get_data_generation(db)
+    total_is_estimate = False
+    if total_mode == "exact":
+        total = exact_count(db, filters, generation)
+    elif total_mode == "estimate":
+        total, is_exact = estimate_count(db, filters, generation)
+        total_is_estimate = not is_exact
+    else:
+        total = None
 
-    # Apply sorting
+    # Apply sorting, with stay_id as a tie-breaker so keyset order is total
     sort_column = getattr(EdStay, sort_by, EdStay.intime)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
+    tie_breaker = EdStay.stay_id
+    nullable = sort_by in NULLABLE_FEATURES
+    feature = FEATURE_COLUMNS.get(sort_by)
+    if feature is not None:
+        if not has_stay_features(db):
+            raise HTTPException(
+                status_code=503,
+                detail="Stay features are not built; run load_data.py",
+            )
+        # Every stay has a feature row, so an inner join keeps them all and
+        # lets SQLite walk an indexed feature's index. Its entries end in
+        # stay_features.stay_id, so breaking ties on that needs no sort;
+        # unindexed features are sorted from a table scan either way
+        sort_column = feature
+        if sort_by in INDEXED_FEATURES:
+            tie_breaker = StayFeature.stay_id
+        query = query.join(StayFeature, StayFeature.stay_id == EdStay.stay_id).add_columns(
+            feature.label("sort_value")
+        )
+    fts_match = filters.chief_complaint_fts_query
+    if sort_by == "relevance" and fts_match:
+        ranking = fts_ranking(fts_match)
+        query = query.join(ranking, ranking.c.triage_id == Triage.id).order_by(
+            ranking.c.rank.asc(), EdStay.stay_id.asc()
+        )
+    elif sort_by == "relevance" or sort_order == "desc":
+        order = sort_column.desc().nulls_last() if nullable else sort_column.desc()
+        query = query.order_by(order, tie_breaker.desc())
     else:
-        query = query.order_by(sort_column.asc())
+        order = sort_column.asc().nulls_first() if nullable else sort_column.asc()
+        query = query.order_by(order, tie_breaker.asc())
 
-    # Apply pagination
-    offset = (page - 1) * per_page
-    results = query.offset(offset).limit(per_page).all()
+    next_cursor = None
+    if pagination == "cursor":
+        if cursor:
+            try:
+                last_value, last_stay_id = decode_cursor(cursor, sort_by, sort_order)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.filter(
+                keyset_condition(sort_column, sort_order, last_value, last_stay_id, nullable)
+            )
+        # Fetch one extra row to learn whether another page follows
+        results = query.limit(per_page + 1).all()
+        if len(results) > per_page:
+            results = results[:per_page]
+            last = results[-1]
+            last_value = last.sort_value if feature is not None else getattr(last, sort_by)
+            next_cursor = encode_cursor(sort_by, sort_order, last_value, last.stay_id)
+    else:
+        # Apply pagination
+        offset = (page - 1) * per_page
+        results = query.offset(offset).limit(per_page).all()
 
     # Build response items
     items = []
-    for edstay, triage in results:
-        duration_hours = (edstay.outtime - edstay.intime).total_seconds() / 3600
-        items.append(
-            EncounterListItem(
-                stay_id=edstay.stay_id,
-                subject_id=edstay.subject_id,
-                hadm_id=edstay.hadm_id,
-                intime=edstay.intime,
-                outtime=edstay.outtime,
-                gender=edstay.gender,
-                race=edstay.race,
-                arrival_transport=edstay.arrival_transport,
-                disposition=edstay.disposition,
-                chiefcomplaint=triage.chiefcomplaint if triage else None,
-                acuity=triage.acuity if triage else None,
-                duration_hours=round(duration_hours, 2),
-            )
-        )
+    for row in results:
+        item = row._asdict()
+        item.pop("sort_value", None)
+        item["duration_hours"] = duration_hours(row.intime, row.outtime)
+        items.append(item)
 
-    total_pages = (total + per_page - 1) // per_page
+    total_pages = (total + per_page - 1) // per_page if total is not None else None
 
-    return EncounterListResponse(
-        items=items,
-        total=total,
-        page=page,
-        per_page=per_page,
-        total_pages=total_pages,
+    return dumps(
+        {
+            "items": items,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": total_pages,
+            "total_is_estimate": total_is_estimate,
+            "next_cursor": next_cursor,
+        }
     )
 
 
-@router.get("/{stay_id}", response_model=EncounterDetail)
-def get_encounter_detail(stay_id: int, db: Session = Depends(get_db)):
-    """Get detailed information for a single encounter."""
-    # Get edstay
-    edstay = db.query(EdStay).filter(EdStay.stay_id == stay_id).first()
-    if not edstay:
-        raise HTTPException(status_code=404, detail="Encounter not found")
+def _details_statements() -> dict:
+    """The detail queries, built once; each takes the stay_ids as :ids.
 
-    # Get triage
-    triage = db.query(Triage).filter(Triage.stay_id == stay_id).first()
-    triage_schema = None
-    if triage:
-        triage_schema = TriageSchema(
-            temperature=triage.temperature,
-            heartrate=triage.heartrate,
-            resprate=triage.resprate,
-            o2sat=triage.o2sat,
-            sbp=triage.sbp,
-            dbp=triage.dbp,
-            pain=triage.pain,
-            acuity=triage.acuity,
-            chiefcomplaint=triage.chiefcomplaint,
+    Rebuilding them per request cost more Python time than running them.
+    """
+    ids = bindparam("ids", expanding=True)
+    # Medications ordered per stay by charttime with missing times first;
+    # ties keep medrecon before pyxis, each in load order
+    medications = union_all(
+        select(
+            MedRecon.stay_id,
+            MedRecon.charttime,
+            MedRecon.name,
+            literal("medrecon").label("source"),
+            MedRecon.gsn,
+            MedRecon.etcdescription.label("description"),
+            literal(0).label("source_rank"),
+            MedRecon.id,
+        ).where(MedRecon.stay_id.in_(ids)),
+        select(
+            Pyxis.stay_id,
+            Pyxis.charttime,
+            Pyxis.name,
+            literal("pyxis"),
+            Pyxis.gsn,
+            null(),
+            literal(1),
+            Pyxis.id,
+        ).where(Pyxis.stay_id.in_(ids)),
+    ).subquery()
+    return {
+        "edstays": select(*STAY_COLUMNS).where(EdStay.stay_id.in_(ids)),
+        "triage": select(Triage.stay_id, *(getattr(Triage, c) for c in TRIAGE_COLUMNS))
+        .where(Triage.stay_id.in_(ids))
+        .order_by(Triage.stay_id, Triage.id),
+        "vitalsigns": select(
+            VitalSign.stay_id, *(getattr(VitalSign, c) for c in VITALS_COLUMNS)
+        )
+        .where(VitalSign.stay_id.in_(ids))
+        .order_by(VitalSign.stay_id, VitalSign.charttime, VitalSign.id),
+        "diagnoses": select(
+            Diagnosis.stay_id, *(getattr(Diagnosis, c) for c in DIAGNOSIS_COLUMNS)
         )
+        .where(Diagnosis.stay_id.in_(ids))
+        .order_by(Diagnosis.stay_id, Diagnosis.seq_num, Diagnosis.id),
+        "medications": select(
+            medications.c.stay_id, *(medications.c[c] for c in MEDICATION_COLUMNS)
+        ).order_by(
+            medications.c.stay_id,
+            medications.c.charttime.is_(None).desc(),
+            medications.c.charttime,
+            medications.c.source_rank,
+            medications.c.id,
+        ),
+    }
 
-    # Get vital signs (sorted by time)
-    vitalsigns = (
-        db.query(VitalSign)
-        .filter(VitalSign.stay_id == stay_id)
-        .order_by(VitalSign.charttime)
-        .all()
-    )
-    vitalsigns_schema = [
-        VitalSignSchema(
-            charttime=v.charttime,
-            temperature=v.temperature,
-            heartrate=v.heartrate,
-            resprate=v.resprate,
-            o2sat=v.o2sat,
-            sbp=v.sbp,
-            dbp=v.dbp,
-            rhythm=v.rhythm,
-            pain=v.pain,
+
+DETAILS_STATEMENTS = _details_statements()
+
+
+def load_detail_lists(db: Session, name: str, stay_ids: List[int]) -> Dict[int, List[dict]]:
+    """One of a detail's lists (see DETAIL_LIST_COLUMNS) for many stays, in
+    detail order, as per-stay lists of {column: value}."""
+    grouped = defaultdict(list)
+    for stay_id, *values in db.execute(DETAILS_STATEMENTS[name], {"ids": stay_ids}):
+        grouped[stay_id].append(dict(zip(DETAIL_LIST_COLUMNS[name], values)))
+    return grouped
+
+
+def load_encounter_details(db: Session, stay_ids: List[int]) -> Dict[int, dict]:
+    """EncounterDetail contents for many stays, as plain dicts ready to encode,
+    with five IN-list queries.
+
+    Only the response's columns are fetched, as tuples. The number of queries
+    does not depend on how many stays are requested. Stays that do not exist
+    are absent from the result.
+    """
+    ids = sorted(set(stay_ids))
+    if not ids:
+        return {}
+
+    edstays = db.execute(DETAILS_STATEMENTS["edstays"], {"ids": ids}).all()
+    triages = {}
+    for stay_id, *values in db.execute(DETAILS_STATEMENTS["triage"], {"ids": ids}):
+        triages.setdefault(stay_id, dict(zip(TRIAGE_COLUMNS, values)))
+    vitalsigns = load_detail_lists(db, "vitalsigns", ids)
+    diagnoses = load_detail_lists(db, "diagnoses", ids)
+    medications = load_detail_lists(db, "medications", ids)
+
+    details = {}
+    for row in edstays:
+        stay_id = row.stay_id
+        detail = row._asdict()
+        detail["duration_hours"] = duration_hours(row.intime, row.outtime)
+        detail["triage"] = triages.get(stay_id)
+        detail["vitalsigns"] = vitalsigns.get(stay_id, [])
+        detail["diagnoses"] = diagnoses.get(stay_id, [])
+        detail["medications"] = medications.get(stay_id, [])
+        details[stay_id] = detail
+    return details
+
+
+def encounter_details_batch(db: Session, stay_ids: List[int]) -> bytes:
+    """Details for many encounters, in request order, with unknown ids listed,
+    as an encoded EncounterBatchResponse."""
+    if len(stay_ids) > BATCH_MAX_STAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_MAX_STAYS} stay_ids per request",
         )
-        for v in vitalsigns
-    ]
-
-    # Get diagnoses (sorted by sequence)
-    diagnoses = (
-        db.query(Diagnosis)
-        .filter(Diagnosis.stay_id == stay_id)
-        .order_by(Diagnosis.seq_num)
-        .all()
+    details = load_encounter_details(db, stay_ids)
+    ordered = list(dict.fromkeys(stay_ids))
+    return dumps(
+        {
+            "items": [details[i] for i in ordered if i in details],
+            "missing": [i for i in ordered if i not in details],
+        }
     )
-    diagnoses_schema = [
-        DiagnosisSchema(
-            seq_num=d.seq_num,
-            icd_code=d.icd_code,
-            icd_version=d.icd_version,
-            icd_title=d.icd_title,
-        )
-        for d in diagnoses
-    ]
-
-    # Get medications (combined from medrecon and pyxis)
-    medications = []
-
-    # Add medrecon entries
-    medrecon_entries = db.query(MedRecon).filter(MedRecon.stay_id == stay_id).all()
-    for m in medrecon_entries:
-        medications.append(
-            MedicationSchema(
-                charttime=m.charttime,
-                name=m.name,
-                source="medrecon",
-                gsn=m.gsn,
-                description=m.etcdescription,
-            )
-        )
 
-    # Add pyxis entries
-    pyxis_entries = db.query(Pyxis).filter(Pyxis.stay_id == stay_id).all()
-    for p in pyxis_entries:
-        medications.append(
-            MedicationSchema(
-                charttime=p.charttime,
-                name=p.name,
-                source="pyxis",
-                gsn=p.gsn,
-                description=None,
-            )
-        )
 
-    # Sort medications by charttime
-    medications.sort(key=lambda x: x.charttime or datetime.min)
-
-    duration_hours = (edstay.outtime - edstay.intime).total_seconds() / 3600
-
-    return EncounterDetail(
-        stay_id=edstay.stay_id,
-        subject_id=edstay.subject_id,
-        hadm_id=edstay.hadm_id,
-        intime=edstay.intime,
-        outtime=edstay.outtime,
-        gender=edstay.gender,
-        race=edstay.race,
-        arrival_transport=edstay.arrival_transport,
-        disposition=edstay.disposition,
-        duration_hours=round(duration_hours, 2),
-        triage=triage_schema,
-        vitalsigns=vitalsigns_schema,
-        diagnoses=diagnoses_schema,
-        medications=medications,
+def encounter_detail(db: Session, stay_id: int) -> bytes:
+    """Details for one encounter as an encoded EncounterDetail, cached per
+    data generation; 404 if it does not exist."""
+    key = (get_data_generation(db), stay_id)
+    body = detail_cache.get(key)
+    if body is None:
+        detail = load_encounter_details(db, [stay_id]).get(stay_id)
+        if not detail:
+            raise HTTPException(status_code=404, detail="Encounter not found")
+        body = dumps(detail)
+        detail_cache.set(key, body)
+    return body
+
+
+def warm_detail_cache(limit: int) -> int:
+    """Cache the details of the `limit` most recent stays; return how many.
+
+    Loaded BATCH_MAX_STAYS at a time, oldest first, so the most recent stays
+    are the last to be evicted.
+    """
+    with SessionLocal() as db:
+        try:
+            generation = get_data_generation(db)
+            stay_ids = [
+                stay_id
+                for (stay_id,) in db.query(EdStay.stay_id)
+                .order_by(EdStay.intime.desc(), EdStay.stay_id.desc())
+                .limit(limit)
+            ]
+        except OperationalError:
+            return 0
+        stay_ids.reverse()
+        for start in range(0, len(stay_ids), BATCH_MAX_STAYS):
+            chunk = stay_ids[start : start + BATCH_MAX_STAYS]
+            details = load_encounter_details(db, chunk)
+            for stay_id in chunk:
+                detail_cache.set((generation, stay_id), dumps(details[stay_id]))
+    return len(stay_ids)
+
+
+def encounter_vitals(
+    db: Session, stay_id: int, max_points: Optional[int] = None
+) -> VitalsSeries:
+    """Vital signs for one encounter as column arrays; 404 if it does not exist.
+
+    With max_points, long series are reduced by min/max bucketing so every
+    numeric column keeps its peaks and troughs (see minmax_indices).
+    """
+    if db.query(EdStay.stay_id).filter(EdStay.stay_id == stay_id).scalar() is None:
+        raise HTTPException(status_code=404, detail="Encounter not found")
+
+    rows = (
+        db.query(*(getattr(VitalSign, c) for c in VITALS_COLUMNS))
+        .filter(VitalSign.stay_id == stay_id)
+        .order_by(VitalSign.charttime, VitalSign.id)
+        .all()
     )
+    columns = dict(zip(VITALS_COLUMNS, map(list, zip(*rows)))) if rows else {}
+
+    if columns and max_points and len(rows) > max_points:
+        keep = minmax_indices(
+            [np.array(columns[c], dtype=float) for c in VITALS_NUMERIC_COLUMNS],
+            max_points,
+        ).tolist()
+        columns = {c: [values[i] for i in keep] for c, values in columns.items()}
+
+    return VitalsSeries(stay_id=stay_id, total_points=len(rows), **columns)
+
+
+@router.get("/count", response_model=EncounterCount)
+def get_encounter_count(
+    filters: CohortFilters = Depends(cohort_filters),
+    db: Session = Depends(get_analytic_db),
+):
+    """Get the exact number of encounters matching the list filters."""
+    return count_encounters(db, filters)
+
+
+@router.get("/summary", response_model=EncounterSummary)
+def get_encounter_summary(
+    filters: CohortFilters = Depends(cohort_filters),
+    db: Session = Depends(get_analytic_db),
+):
+    """Get disposition counts, acuity histogram and length-of-stay percentiles
+    for the encounters matching the list filters."""
+    return encounter_summary(db, filters)
+
+
+@router.get("/export")
+def get_encounter_export(
+    filters: CohortFilters = Depends(cohort_filters),
+    export_format: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    include_children: bool = False,
+    db: Session = Depends(get_analytic_db),
+):
+    """Download every encounter matching the list filters as CSV or NDJSON.
+
+    With include_children, each stay also carries its triage, diagnoses and
+    medications.
+    """
+    return export_response(db, filters, export_format, include_children)
+
+
+@router.get("", response_model=EncounterListResponse)
+def get_encounters(
+    filters: CohortFilters = Depends(cohort_filters),
+    params: ListParams = Depends(list_params),
+    db: Session = Depends(get_analytic_db),
+):
+    """Get list of encounters with filtering and pagination."""
+    return JSONBytesResponse(list_encounters(db, filters, params))
+
+
+@router.post("/batch", response_model=EncounterBatchResponse)
+def get_encounter_details_batch(
+    request: EncounterBatchRequest, db: Session = Depends(get_db)
+):
+    """Get detailed information for many encounters in a fixed number of queries.
+
+    Items are returned in request order; unknown stay_ids are listed in
+    missing.
+    """
+    return JSONBytesResponse(encounter_details_batch(db, request.stay_ids))
+
+
+@router.get("/{stay_id}/vitals", response_model=VitalsSeries)
+def get_encounter_vitals(
+    stay_id: int,
+    max_points: Optional[int] = Query(None, ge=3),
+    db: Session = Depends(get_db),
+):
+    """Get an encounter's vital signs as column arrays, optionally downsampled."""
+    return encounter_vitals(db, stay_id, max_points)
+
+
+@router.get("/{stay_id}", response_model=EncounterDetail)
+def get_encounter_detail(stay_id: int, db: Session = Depends(get_db)):
+    """Get detailed information for a single encounter."""
+    return JSONBytesResponse(encounter_detail(db, stay_id))
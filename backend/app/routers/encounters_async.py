@@ -0,0 +1,103 @@
+"""async def versions of the encounter routes, used when DATABASE_MODE=async.
+
+Each route runs the same query code as its sync counterpart on an aiosqlite
+connection through AsyncSession.run_sync, so results are identical.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cohort import CohortFilters, cohort_filters
+from app.database import get_async_analytic_db, get_async_db
+from app.profiling import ProfilingRoute
+from app.routers.encounters import (
+    ListParams,
+    count_encounters,
+    encounter_detail,
+    encounter_details_batch,
+    encounter_summary,
+    encounter_vitals,
+    export_response,
+    list_encounters,
+    list_params,
+)
+from app.serialization import JSONBytesResponse
+from app.schemas import (
+    EncounterBatchRequest,
+    EncounterBatchResponse,
+    EncounterCount,
+    EncounterDetail,
+    EncounterListResponse,
+    EncounterSummary,
+    VitalsSeries,
+)
+
+router = APIRouter(route_class=ProfilingRoute)
+
+
+@router.get("/count", response_model=EncounterCount)
+async def get_encounter_count(
+    filters: CohortFilters = Depends(cohort_filters),
+    db: AsyncSession = Depends(get_async_analytic_db),
+):
+    """Get the exact number of encounters matching the list filters."""
+    return await db.run_sync(count_encounters, filters)
+
+
+@router.get("/summary", response_model=EncounterSummary)
+async def get_encounter_summary(
+    filters: CohortFilters = Depends(cohort_filters),
+    db: AsyncSession = Depends(get_async_analytic_db),
+):
+    """Get disposition counts, acuity histogram and length-of-stay percentiles
+    for the encounters matching the list filters."""
+    return await db.run_sync(encounter_summary, filters)
+
+
+@router.get("/export")
+async def get_encounter_export(
+    filters: CohortFilters = Depends(cohort_filters),
+    export_format: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    include_children: bool = False,
+    db: AsyncSession = Depends(get_async_analytic_db),
+):
+    """Download every encounter matching the list filters as CSV or NDJSON.
+
+    The export streams from its own sync session on Starlette's threadpool.
+    """
+    return await db.run_sync(export_response, filters, export_format, include_children)
+
+
+@router.get("", response_model=EncounterListResponse)
+async def get_encounters(
+    filters: CohortFilters = Depends(cohort_filters),
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_analytic_db),
+):
+    """Get list of encounters with filtering and pagination."""
+    return JSONBytesResponse(await db.run_sync(list_encounters, filters, params))
+
+
+@router.post("/batch", response_model=EncounterBatchResponse)
+async def get_encounter_details_batch(
+    request: EncounterBatchRequest, db: AsyncSession = Depends(get_async_db)
+):
+    """Get detailed information for many encounters in a fixed number of queries."""
+    return JSONBytesResponse(await db.run_sync(encounter_details_batch, request.stay_ids))
+
+
+@router.get("/{stay_id}/vitals", response_model=VitalsSeries)
+async def get_encounter_vitals(
+    stay_id: int,
+    max_points: Optional[int] = Query(None, ge=3),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get an encounter's vital signs as column arrays, optionally downsampled."""
+    return await db.run_sync(encounter_vitals, stay_id, max_points)
+
+
+@router.get("/{stay_id}", response_model=EncounterDetail)
+async def get_encounter_detail(stay_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get detailed information for a single encounter."""
+    return JSONBytesResponse(await db.run_sync(encounter_detail, stay_id))
@@ -1,17 +1,107 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
+from app.autocomplete import PrefixIndex
+from app.cache import LRUCache
 from app.database import get_db
+from app.dataset import get_data_generation
 from app.models import EdStay, Triage
-from app.schemas import FilterOptions
+from app.options import read_filter_options, read_option_frequencies
+from app.profiling import ProfilingRoute
+from app.schemas import ChiefComplaintSuggestions, FilterOptions
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
+
+# Filter options keyed by data generation
+options_cache = LRUCache(maxsize=4, name="filter_options")
+
+# Chief complaint prefix indexes keyed by data generation
+complaint_index_cache = LRUCache(maxsize=2, name="complaint_index")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header covers etag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def filter_options_response(db: Session, request: Request, response: Response):
+    """Filter options, or an empty 304 response if the client's copy is current.
+
+    Options are read from the table materialized at load time and cached in
+    process. The ETag changes with the data generation, so clients
+    revalidating with If-None-Match get a 304 until the data is reloaded.
+    """
+    generation = get_data_generation(db)
+    headers = {"ETag": f'W/"filter-options-{generation}"', "Cache-Control": "no-cache"}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    options = options_cache.get(generation)
+    if options is None:
+        options = read_filter_options(db) or compute_filter_options(db)
+        options_cache.set(generation, options)
+    response.headers.update(headers)
+    return options
 
 
 @router.get("/options", response_model=FilterOptions)
-def get_filter_options(db: Session = Depends(get_db)):
+def get_filter_options(
+    request: Request, response: Response, db: Session = Depends(get_db)
+):
     """Get available filter options for dropdowns."""
+    return filter_options_response(db, request, response)
+
+
+def complaint_index(db: Session) -> PrefixIndex:
+    """The chief complaint prefix index of the current data generation.
+
+    Built once per generation from the complaint frequencies materialized at
+    load time, or from the triage table if they are not built.
+    """
+    generation = get_data_generation(db)
+    index = complaint_index_cache.get(generation)
+    if index is None:
+        frequencies = read_option_frequencies(db, "chief_complaint")
+        if frequencies is None:
+            frequencies = (
+                db.query(Triage.chiefcomplaint, func.count())
+                .filter(Triage.chiefcomplaint.is_not(None), Triage.chiefcomplaint != "")
+                .group_by(Triage.chiefcomplaint)
+                .all()
+            )
+        index = PrefixIndex(frequencies)
+        complaint_index_cache.set(generation, index)
+    return index
+
+
+def chief_complaint_suggestions(
+    db: Session, prefix: str, limit: int
+) -> ChiefComplaintSuggestions:
+    """The most frequent chief complaints starting with prefix, ignoring case."""
+    completions = complaint_index(db).complete(prefix, limit)
+    return ChiefComplaintSuggestions(
+        prefix=prefix,
+        items=[{"value": value, "frequency": frequency} for value, frequency in completions],
+    )
+
+
+@router.get("/chief_complaints", response_model=ChiefComplaintSuggestions)
+def get_chief_complaints(
+    prefix: str = Query("", max_length=200),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Get the most frequent chief complaints starting with a prefix."""
+    return chief_complaint_suggestions(db, prefix, limit)
+
+
+def compute_filter_options(db: Session) -> FilterOptions:
+    """Compute filter options from the data tables directly."""
     # Get unique genders
     genders = [
         row[0]
@@ -36,16 +126,6 @@ def get_filter_options(db: Session = Depends(get_db)):
         if row[0]
     ]
 
-    # Get unique chief complaints
-    chief_complaints = [
-        row[0]
-        for row in db.query(Triage.chiefcomplaint)
-        .distinct()
-        .order_by(Triage.chiefcomplaint)
-        .all()
-        if row[0]
-    ]
-
     # Get date range
     date_range_result = db.query(
         func.min(EdStay.intime), func.max(EdStay.intime)
@@ -60,6 +140,5 @@ def get_filter_options(db: Session = Depends(get_db)):
         genders=genders,
         races=races,
         dispositions=dispositions,
-        chief_complaints=chief_complaints,
         date_range=date_range,
     )
@@ -0,0 +1,28 @@
+"""async def versions of the filter routes, used when DATABASE_MODE=async."""
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.profiling import ProfilingRoute
+from app.routers.filters import chief_complaint_suggestions, filter_options_response
+from app.schemas import ChiefComplaintSuggestions, FilterOptions
+
+router = APIRouter(route_class=ProfilingRoute)
+
+
+@router.get("/options", response_model=FilterOptions)
+async def get_filter_options(
+    request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    """Get available filter options for dropdowns."""
+    return await db.run_sync(filter_options_response, request, response)
+
+
+@router.get("/chief_complaints", response_model=ChiefComplaintSuggestions)
+async def get_chief_complaints(
+    prefix: str = Query("", max_length=200),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get the most frequent chief complaints starting with a prefix."""
+    return await db.run_sync(chief_complaint_suggestions, prefix, limit)
@@ -0,0 +1,197 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import DateTime, bindparam, func, select
+from sqlalchemy.orm import Session
+
+from app.config import PATIENT_BATCH_MAX, RETURN_VISIT_HOURS
+from app.database import get_db
+from app.models import Diagnosis, EdStay, Triage, VitalSign
+from app.profiling import ProfilingRoute
+from app.routers.encounters import (
+    DIAGNOSIS_COLUMNS,
+    TRIAGE_COLUMNS,
+    VITALS_NUMERIC_COLUMNS,
+    duration_hours,
+)
+from app.schemas import PatientBatchRequest, PatientBatchResponse, PatientHistory
+from app.serialization import JSONBytesResponse, dumps
+
+router = APIRouter(route_class=ProfilingRoute)
+
+# Stay columns of a patient's visit, in PatientStay field order
+VISIT_COLUMNS = ("stay_id", "hadm_id", "intime", "outtime", "arrival_transport", "disposition")
+
+
+def _patient_statements() -> dict:
+    """The patient queries, built once; each takes the subject_ids as :ids.
+
+    Four queries serve any number of patients: stays (with visit order and
+    the previous discharge from window functions), first triage rows,
+    diagnoses, and per-stay vital sign aggregates.
+    """
+    ids = bindparam("ids", expanding=True)
+    stays_of_patients = select(EdStay.stay_id).where(EdStay.subject_id.in_(ids))
+    visit_order = {
+        "partition_by": EdStay.subject_id,
+        "order_by": (EdStay.intime, EdStay.stay_id),
+    }
+    vitals_aggregates = []
+    for name in VITALS_NUMERIC_COLUMNS:
+        column = getattr(VitalSign, name)
+        vitals_aggregates += [func.min(column), func.max(column), func.avg(column)]
+    return {
+        "stays": select(
+            EdStay.subject_id,
+            EdStay.gender,
+            EdStay.race,
+            *(getattr(EdStay, c) for c in VISIT_COLUMNS),
+            func.row_number().over(**visit_order).label("visit_number"),
+            func.lag(EdStay.outtime, type_=DateTime)
+            .over(**visit_order)
+            .label("previous_outtime"),
+        )
+        .where(EdStay.subject_id.in_(ids))
+        .order_by(EdStay.subject_id, EdStay.intime, EdStay.stay_id),
+        "triage": select(Triage.stay_id, *(getattr(Triage, c) for c in TRIAGE_COLUMNS))
+        .where(Triage.stay_id.in_(stays_of_patients))
+        .order_by(Triage.stay_id, Triage.id),
+        "diagnoses": select(
+            Diagnosis.stay_id, *(getattr(Diagnosis, c) for c in DIAGNOSIS_COLUMNS)
+        )
+        .where(Diagnosis.stay_id.in_(stays_of_patients))
+        .order_by(Diagnosis.stay_id, Diagnosis.seq_num, Diagnosis.id),
+        "vitals": select(
+            VitalSign.stay_id,
+            func.count(),
+            func.min(VitalSign.charttime),
+            func.max(VitalSign.charttime),
+            *vitals_aggregates,
+        )
+        .where(VitalSign.stay_id.in_(stays_of_patients))
+        .group_by(VitalSign.stay_id),
+    }
+
+
+PATIENT_STATEMENTS = _patient_statements()
+
+
+def vitals_summary(row) -> dict:
+    """VitalsSummary of one stay from its aggregate row."""
+    _, count, first_charttime, last_charttime, *aggregates = row
+    summary = {
+        "count": count,
+        "first_charttime": first_charttime,
+        "last_charttime": last_charttime,
+    }
+    for i, name in enumerate(VITALS_NUMERIC_COLUMNS):
+        low, high, mean = aggregates[3 * i : 3 * i + 3]
+        summary[name] = (
+            None if mean is None else {"min": low, "max": high, "mean": round(mean, 2)}
+        )
+    return summary
+
+
+def load_patient_histories(db: Session, subject_ids: List[int]) -> Dict[int, dict]:
+    """PatientHistory contents for many patients, as plain dicts ready to encode.
+
+    Stays are in visit order. hours_since_previous_stay runs from the previous
+    discharge to this arrival; a stay arriving within RETURN_VISIT_HOURS of it
+    counts as a return visit. Patients without stays are absent.
+    """
+    ids = sorted(set(subject_ids))
+    if not ids:
+        return {}
+
+    def run(name):
+        return db.execute(PATIENT_STATEMENTS[name], {"ids": ids})
+
+    stays = run("stays").all()
+    triages = {}
+    for stay_id, *values in run("triage"):
+        triages.setdefault(stay_id, dict(zip(TRIAGE_COLUMNS, values)))
+    diagnoses = defaultdict(list)
+    for stay_id, *values in run("diagnoses"):
+        diagnoses[stay_id].append(dict(zip(DIAGNOSIS_COLUMNS, values)))
+    vitals = {row[0]: vitals_summary(row) for row in run("vitals")}
+
+    histories = {}
+    for row in stays:
+        history = histories.get(row.subject_id)
+        if history is None:
+            history = histories[row.subject_id] = {
+                "subject_id": row.subject_id,
+                "gender": row.gender,
+                "race": row.race,
+                "stay_count": 0,
+                "first_intime": row.intime,
+                "last_intime": row.intime,
+                "return_visits": 0,
+                "stays": [],
+            }
+        hours_since_previous = None
+        if row.previous_outtime is not None:
+            hours_since_previous = duration_hours(row.previous_outtime, row.intime)
+            if hours_since_previous <= RETURN_VISIT_HOURS:
+                history["return_visits"] += 1
+        stay = {c: getattr(row, c) for c in VISIT_COLUMNS}
+        stay["duration_hours"] = duration_hours(row.intime, row.outtime)
+        stay["visit_number"] = row.visit_number
+        stay["hours_since_previous_stay"] = hours_since_previous
+        stay["triage"] = triages.get(row.stay_id)
+        stay["diagnoses"] = diagnoses.get(row.stay_id, [])
+        stay["vitals"] = vitals.get(row.stay_id)
+        # Demographics as recorded at the most recent stay
+        history["gender"] = row.gender
+        history["race"] = row.race
+        history["stay_count"] += 1
+        history["last_intime"] = row.intime
+        history["stays"].append(stay)
+    return histories
+
+
+def patient_history(db: Session, subject_id: int) -> bytes:
+    """All of one patient's stays as an encoded PatientHistory; 404 if the
+    patient has none."""
+    history = load_patient_histories(db, [subject_id]).get(subject_id)
+    if not history:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return dumps(history)
+
+
+def patient_histories_batch(db: Session, subject_ids: List[int]) -> bytes:
+    """Histories for many patients, in request order, with unknown ids listed,
+    as an encoded PatientBatchResponse."""
+    if len(subject_ids) > PATIENT_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {PATIENT_BATCH_MAX} subject_ids per request",
+        )
+    histories = load_patient_histories(db, subject_ids)
+    ordered = list(dict.fromkeys(subject_ids))
+    return dumps(
+        {
+            "items": [histories[i] for i in ordered if i in histories],
+            "missing": [i for i in ordered if i not in histories],
+        }
+    )
+
+
+@router.post("/batch", response_model=PatientBatchResponse)
+def get_patient_histories_batch(
+    request: PatientBatchRequest, db: Session = Depends(get_db)
+):
+    """Get the histories of many patients in a fixed number of queries.
+
+    Items are returned in request order; unknown subject_ids are listed in
+    missing.
+    """
+    return JSONBytesResponse(patient_histories_batch(db, request.subject_ids))
+
+
+@router.get("/{subject_id}", response_model=PatientHistory)
+def get_patient_history(subject_id: int, db: Session = Depends(get_db)):
+    """Get all of a patient's stays with triage, diagnoses, a vital signs
+    summary and the interval since the previous stay."""
+    return JSONBytesResponse(patient_history(db, subject_id))
@@ -0,0 +1,26 @@
+"""async def versions of the patient routes, used when DATABASE_MODE=async."""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.profiling import ProfilingRoute
+from app.routers.patients import patient_histories_batch, patient_history
+from app.schemas import PatientBatchRequest, PatientBatchResponse, PatientHistory
+from app.serialization import JSONBytesResponse
+
+router = APIRouter(route_class=ProfilingRoute)
+
+
+@router.post("/batch", response_model=PatientBatchResponse)
+async def get_patient_histories_batch(
+    request: PatientBatchRequest, db: AsyncSession = Depends(get_async_db)
+):
+    """Get the histories of many patients in a fixed number of queries."""
+    return JSONBytesResponse(await db.run_sync(patient_histories_batch, request.subject_ids))
+
+
+@router.get("/{subject_id}", response_model=PatientHistory)
+async def get_patient_history(subject_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get all of a patient's stays with triage, diagnoses, a vital signs
+    summary and the interval since the previous stay."""
+    return JSONBytesResponse(await db.run_sync(patient_history, subject_id))
@@ -33,6 +33,22 @@ class VitalSignSchema(BaseModel):
         from_attributes = True
 
 
+class VitalsSeries(BaseModel):
+    """A stay's vital signs as parallel column arrays, ordered by charttime."""
+
+    stay_id: int
+    total_points: int
+    charttime: List[datetime] = []
+    temperature: List[Optional[float]] = []
+    heartrate: List[Optional[float]] = []
+    resprate: List[Optional[float]] = []
+    o2sat: List[Optional[float]] = []
+    sbp: List[Optional[float]] = []
+    dbp: List[Optional[float]] = []
+    rhythm: List[Optional[str]] = []
+    pain: List[Optional[str]] = []
+
+
 class DiagnosisSchema(BaseModel):
     seq_num: int
     icd_code: str
@@ -74,10 +90,16 @@ class EncounterListItem(BaseModel):
 
 class EncounterListResponse(BaseModel):
     items: List[EncounterListItem]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
+class EncounterCount(BaseModel):
+    total: int
 
 
 class EncounterDetail(BaseModel):
@@ -100,9 +122,149 @@ class EncounterDetail(BaseModel):
         from_attributes = True
 
 
+class EncounterBatchRequest(BaseModel):
+    stay_ids: List[int]
+
+
+class EncounterBatchResponse(BaseModel):
+    items: List[EncounterDetail]
+    missing: List[int] = []
+
+
+class VitalRange(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+
+
+class VitalsSummary(BaseModel):
+    """A stay's vital signs reduced to a count and per-sign min/max/mean."""
+
+    count: int
+    first_charttime: datetime
+    last_charttime: datetime
+    temperature: Optional[VitalRange] = None
+    heartrate: Optional[VitalRange] = None
+    resprate: Optional[VitalRange] = None
+    o2sat: Optional[VitalRange] = None
+    sbp: Optional[VitalRange] = None
+    dbp: Optional[VitalRange] = None
+
+
+class PatientStay(BaseModel):
+    stay_id: int
+    hadm_id: Optional[int] = None
+    intime: datetime
+    outtime: datetime
+    arrival_transport: Optional[str] = None
+    disposition: str
+    duration_hours: float
+    visit_number: int
+    hours_since_previous_stay: Optional[float] = None
+    triage: Optional[TriageSchema] = None
+    diagnoses: List[DiagnosisSchema] = []
+    vitals: Optional[VitalsSummary] = None
+
+
+class PatientHistory(BaseModel):
+    subject_id: int
+    gender: str
+    race: Optional[str] = None
+    stay_count: int
+    first_intime: datetime
+    last_intime: datetime
+    return_visits: int
+    stays: List[PatientStay]
+
+
+class PatientBatchRequest(BaseModel):
+    subject_ids: List[int]
+
+
+class PatientBatchResponse(BaseModel):
+    items: List[PatientHistory]
+    missing: List[int] = []
+
+
+class DispositionCount(BaseModel):
+    disposition: str
+    count: int
+
+
+class AcuityCount(BaseModel):
+    acuity: Optional[int] = None
+    count: int
+
+
+class LengthOfStaySummary(BaseModel):
+    """Length of stay in hours; percentiles are interpolated within bin_hours bins."""
+
+    mean: Optional[float] = None
+    p25: Optional[float] = None
+    p50: Optional[float] = None
+    p75: Optional[float] = None
+    p90: Optional[float] = None
+    p95: Optional[float] = None
+    bin_hours: float
+
+
+class EncounterSummary(BaseModel):
+    total: int
+    dispositions: List[DispositionCount]
+    acuity: List[AcuityCount]
+    length_of_stay: LengthOfStaySummary
+
+
+class CensusSeries(BaseModel):
+    """ED occupancy per time bucket, as parallel column arrays."""
+
+    bucket_seconds: int
+    stays: int  # stays in the cohort, in or out of the window
+    bucket_start: List[datetime] = []
+    present: List[int] = []  # in the ED at bucket_start
+    peak: List[int] = []  # most in the ED at once during the bucket
+    arrivals: List[int] = []
+    departures: List[int] = []
+
+
 class FilterOptions(BaseModel):
     genders: List[str]
     races: List[str]
     dispositions: List[str]
-    chief_complaints: List[str]
     date_range: dict
+
+
+class ChiefComplaintSuggestion(BaseModel):
+    value: str
+    frequency: int
+
+
+class ChiefComplaintSuggestions(BaseModel):
+    prefix: str
+    items: List[ChiefComplaintSuggestion]
+
+
+class ManifestEntry(BaseModel):
+    table_name: str
+    source_file: str
+    row_count: Optional[int] = None
+    status: str
+    generation: int
+    loaded_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DatasetStatus(BaseModel):
+    generation: int
+    complete: bool
+    tables: List[ManifestEntry]
+
+
+class CacheStats(BaseModel):
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
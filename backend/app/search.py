@@ -0,0 +1,109 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+from sqlalchemy import bindparam, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models import Triage
+
+# FTS5 index over triage.chiefcomplaint, built by load_data.py. It is an
+# external-content table, so its rowids are triage.id values.
+TRIAGE_FTS_TABLE = "triage_fts"
+
+triage_fts = table(TRIAGE_FTS_TABLE)
+_fts_rowid = literal_column(f"{TRIAGE_FTS_TABLE}.rowid")
+_fts_rank = literal_column(f"bm25({TRIAGE_FTS_TABLE})")
+_fts_match = text(f"{TRIAGE_FTS_TABLE} MATCH :fts_query")
+
+
+def create_triage_fts(conn: Connection) -> int:
+    """(Re)build the chief complaint FTS5 index; return the rows indexed."""
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {TRIAGE_FTS_TABLE}")
+    conn.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE {TRIAGE_FTS_TABLE} USING fts5("
+        f"chiefcomplaint, content='{Triage.__tablename__}', content_rowid='id', "
+        "tokenize='unicode61', prefix='2 3')"
+    )
+    conn.exec_driver_sql(
+        f"INSERT INTO {TRIAGE_FTS_TABLE}({TRIAGE_FTS_TABLE}) VALUES('rebuild')"
+    )
+    return conn.exec_driver_sql(f"SELECT count(*) FROM {Triage.__tablename__}").scalar()
+
+
+def has_triage_fts(db: Session) -> bool:
+    """Whether the database has a chief complaint FTS5 index."""
+    try:
+        return (
+            db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": TRIAGE_FTS_TABLE},
+            ).first()
+            is not None
+        )
+    except OperationalError:
+        db.rollback()
+        return False
+
+
+def search_words(search: str) -> List[str]:
+    """The lower-cased words of a chief complaint search."""
+    return re.findall(r"\w+", search.lower())
+
+
+def fts_query(search: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching every word as a prefix.
+
+    Returns None when the text has no searchable words.
+    """
+    words = search_words(search)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(
+        char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char)
+    )
+
+
+def word_prefix_conditions(column, search: str) -> list:
+    """Conditions matching every word of search as the start of a word in
+    column, as fts_query does, for engines without FTS5 (DuckDB).
+
+    Like FTS5's unicode61 tokenizer, words are runs of letters and digits and
+    case and accents are ignored. Empty when search has no words.
+    """
+    text = func.strip_accents(func.lower(column))
+    # Inlined: DuckDB matches a bound pattern far slower than a constant one
+    return [
+        func.regexp_matches(
+            text,
+            bindparam(
+                None, r"(^|[^\pL\pN])" + re.escape(_strip_accents(word)), literal_execute=True
+            ),
+        )
+        for word in search_words(search)
+    ]
+
+
+def fts_rowids(query: str):
+    """Select the triage ids whose chief complaint matches an FTS query."""
+    return (
+        select(_fts_rowid)
+        .select_from(triage_fts)
+        .where(_fts_match.bindparams(fts_query=query))
+    )
+
+
+def fts_ranking(query: str):
+    """Subquery of matching triage ids with their BM25 rank (lower is better)."""
+    return (
+        select(_fts_rowid.label("triage_id"), _fts_rank.label("rank"))
+        .select_from(triage_fts)
+        .where(_fts_match.bindparams(fts_query=query))
+        .subquery()
+    )
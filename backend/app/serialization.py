@@ -0,0 +1,25 @@
+"""Response bodies encoded straight to JSON bytes with orjson.
+
+The encounter list and detail routes build plain dicts from column tuples and
+encode them once, instead of building Pydantic models that FastAPI validates
+and serializes a second time through response_model. Keys follow the response
+model's field order and orjson writes naive datetimes and floats the way
+Pydantic's JSON mode does, so the bytes are the same. The routes keep their
+response_model for the OpenAPI schema.
+"""
+import orjson
+from fastapi.responses import Response
+
+
+def dumps(content) -> bytes:
+    """Encode a response body of plain dicts, lists and scalars."""
+    return orjson.dumps(content)
+
+
+class JSONBytesResponse(Response):
+    """A response whose body is already encoded JSON.
+
+    Returning a Response from a route skips response_model validation.
+    """
+
+    media_type = "application/json"
@@ -0,0 +1,188 @@
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Integer, and_, cast, delete, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.cohort import CohortFilters
+from app.models import EdStay, EncounterRollup, LengthOfStayRollup, StayFeature, Triage
+from app.schemas import (
+    AcuityCount,
+    DispositionCount,
+    EncounterSummary,
+    LengthOfStaySummary,
+)
+
+# Width of the length-of-stay histogram bins percentiles are computed from
+LOS_BIN_HOURS = 0.25
+
+LOS_PERCENTILES = {"p25": 0.25, "p50": 0.5, "p75": 0.75, "p90": 0.9, "p95": 0.95}
+
+
+def los_bin(los_hours, dialect: str = "sqlite"):
+    """SQL expression for a length of stay's histogram bin (negative stays go in bin 0).
+
+    DuckDB rounds when casting to an integer and its two-argument max is an
+    aggregate, so it truncates explicitly and uses greatest.
+    """
+    if dialect == "duckdb":
+        return func.greatest(cast(func.trunc(los_hours / LOS_BIN_HOURS), Integer), 0)
+    return func.max(cast(los_hours / LOS_BIN_HOURS, Integer), 0)
+
+
+def build_encounter_rollup(conn: Connection) -> int:
+    """Pre-aggregate stays by gender, race, disposition and acuity."""
+    table = EncounterRollup.__table__
+    conn.execute(delete(table))
+    dimensions = (EdStay.gender, EdStay.race, EdStay.disposition, StayFeature.acuity)
+    rollup = (
+        select(*dimensions, func.count(), func.sum(StayFeature.los_hours))
+        .join(StayFeature, StayFeature.stay_id == EdStay.stay_id)
+        .group_by(*dimensions)
+    )
+    conn.execute(
+        insert(table).from_select(
+            ["gender", "race", "disposition", "acuity", "stays", "los_hours_sum"], rollup
+        )
+    )
+    return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def build_los_rollup(conn: Connection) -> int:
+    """Pre-aggregate stays by gender, race, disposition and length-of-stay bin."""
+    table = LengthOfStayRollup.__table__
+    conn.execute(delete(table))
+    dimensions = (
+        EdStay.gender,
+        EdStay.race,
+        EdStay.disposition,
+        los_bin(StayFeature.los_hours),
+    )
+    rollup = (
+        select(*dimensions, func.count())
+        .join(StayFeature, StayFeature.stay_id == EdStay.stay_id)
+        .group_by(*dimensions)
+    )
+    conn.execute(
+        insert(table).from_select(["gender", "race", "disposition", "los_bin", "stays"], rollup)
+    )
+    return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def rollup_conditions(filters: CohortFilters, rollup) -> Optional[list]:
+    """The filters as conditions on a rollup model, or None if it cannot answer them."""
+    if (
+        filters.date_from
+        or filters.date_to
+        or filters.chief_complaint
+        or filters.icd_code
+        or filters.icd_prefix
+        or filters.medication
+        or filters.feature_ranges
+    ):
+        return None
+    conditions = []
+    if filters.gender:
+        conditions.append(rollup.gender == filters.gender)
+    if filters.race:
+        conditions.append(rollup.race.in_(filters.race))
+    if filters.disposition:
+        conditions.append(rollup.disposition.in_(filters.disposition))
+    return conditions
+
+
+def _grouped_counts(db: Session, filters: CohortFilters) -> Tuple[list, list]:
+    """Group a cohort's stays two ways.
+
+    Returns (disposition, acuity, stays, los_hours_sum) rows and
+    (los_bin, stays) rows. Filters on stay columns only are answered from the
+    rollups; anything else groups the matching stays' features.
+    """
+    conditions = rollup_conditions(filters, EncounterRollup)
+    if conditions is not None:
+        outcomes = (
+            db.query(
+                EncounterRollup.disposition,
+                EncounterRollup.acuity,
+                func.sum(EncounterRollup.stays),
+                func.sum(EncounterRollup.los_hours_sum),
+            )
+            .filter(and_(*conditions))
+            .group_by(EncounterRollup.disposition, EncounterRollup.acuity)
+        )
+        bins = (
+            db.query(LengthOfStayRollup.los_bin, func.sum(LengthOfStayRollup.stays))
+            .filter(and_(*rollup_conditions(filters, LengthOfStayRollup)))
+            .group_by(LengthOfStayRollup.los_bin)
+        )
+        return outcomes.all(), bins.all()
+
+    def cohort_query(*columns):
+        query = (
+            db.query(*columns)
+            .select_from(EdStay)
+            .join(StayFeature, StayFeature.stay_id == EdStay.stay_id)
+        )
+        if filters.chief_complaint:
+            query = query.outerjoin(Triage, EdStay.stay_id == Triage.stay_id)
+        return filters.apply(query)
+
+    outcomes = cohort_query(
+        EdStay.disposition, StayFeature.acuity, func.count(), func.sum(StayFeature.los_hours)
+    ).group_by(EdStay.disposition, StayFeature.acuity)
+    bin_ = los_bin(StayFeature.los_hours, db.bind.dialect.name)
+    bins = cohort_query(bin_, func.count()).group_by(bin_)
+    return outcomes.all(), bins.all()
+
+
+def bin_percentiles(bins: Iterable[Tuple[int, int]], total: int) -> Dict[str, float]:
+    """Percentiles from (bin, count) pairs, interpolating linearly within a bin."""
+    percentiles = {}
+    targets = sorted(LOS_PERCENTILES.items(), key=lambda item: item[1])
+    seen = 0
+    for bin_, count in sorted(bins):
+        while targets and targets[0][1] * total <= seen + count:
+            name, q = targets.pop(0)
+            fraction = (q * total - seen) / count
+            percentiles[name] = round((bin_ + fraction) * LOS_BIN_HOURS, 2)
+        seen += count
+    return percentiles
+
+
+def cohort_summary(db: Session, filters: CohortFilters) -> Optional[EncounterSummary]:
+    """Disposition counts, acuity histogram and length of stay for a cohort.
+
+    Returns None if the summary tables have not been built.
+    """
+    try:
+        outcomes, bins = _grouped_counts(db, filters)
+    except OperationalError:
+        db.rollback()
+        return None
+
+    dispositions: Counter = Counter()
+    acuity: Counter = Counter()
+    total, los_sum = 0, 0.0
+    for disposition, acuity_level, stays, stays_los in outcomes:
+        dispositions[disposition] += stays
+        acuity[acuity_level] += stays
+        total += stays
+        los_sum += stays_los
+
+    return EncounterSummary(
+        total=total,
+        dispositions=[
+            DispositionCount(disposition=d, count=n) for d, n in dispositions.most_common()
+        ],
+        acuity=[
+            AcuityCount(acuity=a, count=n)
+            for a, n in sorted(acuity.items(), key=lambda item: (item[0] is None, item[0]))
+        ],
+        length_of_stay=LengthOfStaySummary(
+            mean=round(los_sum / total, 2) if total else None,
+            bin_hours=LOS_BIN_HOURS,
+            **bin_percentiles(bins, total),
+        ),
+    )
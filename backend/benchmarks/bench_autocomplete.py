@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Compare chief complaint completion from the prefix index with a linear scan
+over a synthetic set of --values distinct complaints.
+
+Complaints are random phrases of one to four words with Zipf-like
+frequencies. The scan filters every complaint by prefix and sorts the matches
+by frequency; both paths must return the same completions for every prefix,
+or the benchmark exits with status 1.
+
+Usage:
+    python benchmarks/bench_autocomplete.py --values 100000 --limit 10
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.autocomplete import PrefixIndex
+
+WORDS = [
+    "ABD", "PAIN", "CHEST", "DYSPNEA", "FEVER", "COUGH", "FALL", "S/P", "HEADACHE",
+    "N/V", "BACK", "LEG", "ARM", "SWELLING", "WEAKNESS", "DIZZINESS", "ETOH", "SI",
+    "LACERATION", "Wound eval", "Transfer", "Hypotension", "RASH", "SYNCOPE",
+]
+
+PREFIXES = ["", "a", "c", "ch", "CHEST", "chest pain", "s/p f", "w", "zz"]
+
+
+def build_entries(values: int):
+    """`values` distinct complaints with Zipf-like frequencies."""
+    rng = random.Random(0)
+    complaints = set()
+    while len(complaints) < values:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+        complaints.add(", ".join(words) if rng.random() < 0.3 else " ".join(words))
+    return [(value, max(1, int(5000 / rank))) for rank, value in enumerate(complaints, 1)]
+
+
+def scan(entries, prefix: str, limit: int):
+    """Completions by filtering and sorting every complaint."""
+    key = prefix.casefold()
+    matches = [entry for entry in entries if entry[0].casefold().startswith(key)]
+    matches.sort(key=lambda entry: (-entry[1], entry[0].casefold(), entry[0]))
+    return matches[:limit]
+
+
+def timed_us(fn, repeat: int):
+    """Median µs of fn(), and its last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--values", type=int, default=100000, help="distinct complaints")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = build_entries(args.values)
+    start = time.perf_counter()
+    index = PrefixIndex(entries)
+    print(f"index of {len(index)} complaints built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    mismatches = 0
+    print(f"{'prefix':<14} {'matches':>8} {'scan us':>10} {'index us':>9} {'speedup':>8}  equal")
+    for prefix in PREFIXES:
+        matches = len(scan(entries, prefix, len(entries)))
+        scan_us, expected = timed_us(lambda: scan(entries, prefix, args.limit), args.repeat)
+        index_us, actual = timed_us(lambda: index.complete(prefix, args.limit), args.repeat * 50)
+        equal = expected == actual
+        mismatches += not equal
+        print(
+            f"{prefix!r:<14} {matches:>8} {scan_us:>10.0f} {index_us:>9.1f} "
+            f"{scan_us / index_us:>7.0f}x  {'yes' if equal else 'NO'}"
+        )
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Compare the sweep-line census with counting occupancy in SQL per bucket on a
+synthetic table of --rows stays.
+
+Stays arrive at random over --days days and stay 1-24 hours. The SQL
+baseline issues one count query per bucket, each scanning every stay that
+arrived before the bucket; it is timed on --sql-buckets buckets spread over
+the range and extrapolated to the full series.
+
+Usage:
+    python benchmarks/bench_census.py --rows 1000000 --bucket 1h
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, create_engine, func, insert
+from sqlalchemy.orm import Session
+
+from app.census import bucket_edges, build_timeline, occupancy, parse_bucket
+from app.cohort import CohortFilters
+from app.database import Base
+from app.models import EdStay
+
+START = datetime(2110, 1, 1)
+
+
+def build_database(path: str, rows: int, days: int):
+    """Create a database of `rows` stays spread over `days` days."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        for first in range(0, rows, 50000):
+            batch = []
+            for i in range(first, min(first + 50000, rows)):
+                intime = START + timedelta(seconds=rng.randrange(days * 86400))
+                batch.append(
+                    {
+                        "stay_id": i,
+                        "subject_id": i,
+                        "intime": intime,
+                        "outtime": intime + timedelta(minutes=rng.randint(60, 1440)),
+                        "gender": "F" if i % 2 else "M",
+                        "disposition": "HOME",
+                    }
+                )
+            conn.execute(insert(EdStay.__table__), batch)
+    return engine
+
+
+def time_sweep(engine, bucket_seconds: int, repeat: int):
+    """Cold (load and sweep) ms, and median warm (sweep only) ms."""
+    with Session(engine) as db:
+        begin = time.perf_counter()
+        timeline = build_timeline(db, CohortFilters())
+        edges = bucket_edges(timeline, bucket_seconds)
+        series = occupancy(timeline, edges, bucket_seconds)
+        cold = (time.perf_counter() - begin) * 1000
+    warm = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        occupancy(timeline, edges, bucket_seconds)
+        warm.append((time.perf_counter() - begin) * 1000)
+    return cold, statistics.median(warm), series
+
+
+def time_sql(engine, series, bucket_seconds: int, n_buckets: int):
+    """Extrapolated ms to count every bucket in SQL, and whether the sampled
+    buckets matched the sweep."""
+    width = timedelta(seconds=bucket_seconds)
+    total = len(series.bucket_start)
+    sample = sorted(set(range(0, total, max(1, total // n_buckets))))
+    matched = True
+    with Session(engine) as db:
+        begin = time.perf_counter()
+        for i in sample:
+            start = series.bucket_start[i]
+            present = (
+                db.query(func.count())
+                .filter(and_(EdStay.intime <= start, EdStay.outtime > start))
+                .scalar()
+            )
+            arrivals = (
+                db.query(func.count())
+                .filter(and_(EdStay.intime >= start, EdStay.intime < start + width))
+                .scalar()
+            )
+            matched &= (present, arrivals) == (series.present[i], series.arrivals[i])
+        elapsed = (time.perf_counter() - begin) * 1000
+    return elapsed * total / len(sample), matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=4 * 365)
+    parser.add_argument("--bucket", default="1h")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sql-buckets", type=int, default=100)
+    args = parser.parse_args()
+    bucket_seconds = parse_bucket(args.bucket)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.rows:,} stays over {args.days} days...")
+        engine = build_database(os.path.join(tmp, "bench.db"), args.rows, args.days)
+
+        cold, warm, series = time_sweep(engine, bucket_seconds, args.repeat)
+        buckets = len(series.bucket_start)
+        sql_ms, matched = time_sql(engine, series, bucket_seconds, args.sql_buckets)
+
+        print(f"\n{buckets:,} buckets of {args.bucket}")
+        print(f"sweep line, cold (load + sweep): {cold:>10.1f} ms")
+        print(f"sweep line, warm (cached):       {warm:>10.1f} ms")
+        print(f"SQL per bucket (extrapolated):   {sql_ms:>10.1f} ms")
+        print(f"sampled buckets agree: {'yes' if matched else 'NO'}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Compare FTS5 and substring (ILIKE '%...%') chief complaint search on a
+scaled-up triage table.
+
+Chief complaints are sampled from the triage table at DATABASE_PATH and
+replicated into a temporary database of --rows stays, which is then indexed
+the same way load_data.py indexes the real data.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/bench_chief_complaint.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.cohort import CohortFilters
+from app.database import Base, engine as source_engine
+from app.models import EdStay, Triage
+from app.routers.encounters import encounter_query
+from app.search import create_triage_fts
+
+DEFAULT_QUERIES = ["chest pain", "abd", "dyspnea", "fall", "headache", "s/p fall"]
+
+
+def build_database(path: str, rows: int, complaints: list):
+    """Create a database of `rows` stays with sampled chief complaints."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    start = datetime(2110, 1, 1)
+    with engine.begin() as conn:
+        for first in range(0, rows, 50000):
+            ids = range(first, min(first + 50000, rows))
+            conn.execute(
+                insert(EdStay.__table__),
+                [
+                    {
+                        "stay_id": i,
+                        "subject_id": i,
+                        "intime": start + timedelta(minutes=i),
+                        "outtime": start + timedelta(minutes=i + 240),
+                        "gender": "F" if i % 2 else "M",
+                        "disposition": "HOME",
+                    }
+                    for i in ids
+                ],
+            )
+            conn.execute(
+                insert(Triage.__table__),
+                [
+                    {"stay_id": i, "subject_id": i, "chiefcomplaint": rng.choice(complaints)}
+                    for i in ids
+                ],
+            )
+        create_triage_fts(conn)
+    return engine
+
+
+def time_search(engine, filters: CohortFilters, repeat: int):
+    """Median ms to count the cohort and fetch its first page of 20."""
+    times = []
+    with Session(engine) as db:
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            query = filters.apply(encounter_query(db))
+            total = query.count()
+            query.order_by(EdStay.intime.desc()).limit(20).all()
+            times.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(times), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+    args = parser.parse_args()
+
+    with Session(source_engine) as db:
+        complaints = [
+            c for (c,) in db.execute(select(Triage.chiefcomplaint)) if c
+        ] or DEFAULT_QUERIES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.rows:,} stays...")
+        engine = build_database(os.path.join(tmp, "bench.db"), args.rows, complaints)
+
+        print(f"\n{'query':<14} {'substring ms':>12} {'fts ms':>8} {'speedup':>8}  matches (substring/fts)")
+        for text in args.queries:
+            substring_ms, substring_total = time_search(
+                engine, CohortFilters(chief_complaint=text), args.repeat
+            )
+            fts_ms, fts_total = time_search(
+                engine,
+                CohortFilters(chief_complaint=text, chief_complaint_mode="fts"),
+                args.repeat,
+            )
+            print(
+                f"{text:<14} {substring_ms:>12.1f} {fts_ms:>8.1f} "
+                f"{substring_ms / fts_ms:>7.1f}x  {substring_total}/{fts_total}"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Compare diagnosis and medication cohort filters before and after their
+indexes on a scaled-up database.
+
+ICD codes and medication names are sampled from DATABASE_PATH and spread over
+a temporary database of --rows stays, each with 1-4 diagnoses and 0-6 rows in
+each medication table. Every filter is timed first against the bare tables
+(a scan of diagnoses, and of pyxis and medrecon by name), then again after
+creating the (icd_code, stay_id) index and the medication_stays table the way
+load_data.py does. Both runs must find the same cohort; the benchmark exits
+with status 1 if they do not.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/bench_cohort_lookups.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.cohort import CohortFilters
+from app.database import Base, engine as source_engine
+from app.lookups import build_medication_stays
+from app.models import Diagnosis, EdStay, MedicationStay, MedRecon, Pyxis
+from app.routers.encounters import encounter_query
+
+DEFAULT_CODES = ["I10", "E119", "R0789", "J189", "N390", "I214", "F10129", "K5900"]
+DEFAULT_DRUGS = ["Acetaminophen", "Heparin", "Ondansetron", "Insulin", "Metoprolol"]
+
+CASES = [
+    ("icd_prefix I21", CohortFilters(icd_prefix=("I21",))),
+    ("icd_code I10", CohortFilters(icd_code=("I10",))),
+    ("medication heparin", CohortFilters(medication="heparin")),
+    ("heparin via pyxis", CohortFilters(medication="heparin", medication_source="pyxis")),
+    (
+        "F + E11 + insulin",
+        CohortFilters(gender="F", icd_prefix=("E11",), medication="insulin"),
+    ),
+]
+
+
+def build_database(path: str, rows: int, codes: list, drugs: list):
+    """Create a database of `rows` stays with sampled diagnoses and medications,
+    without the lookup index or table."""
+    engine = create_engine(f"sqlite:///{path}")
+    tables = [t for t in Base.metadata.sorted_tables if t is not MedicationStay.__table__]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_diagnoses_icd_code_stay_id")
+    rng = random.Random(0)
+    start = datetime(2110, 1, 1)
+    with engine.begin() as conn:
+        for first in range(0, rows, 50000):
+            ids = range(first, min(first + 50000, rows))
+            conn.execute(
+                insert(EdStay.__table__),
+                [
+                    {
+                        "stay_id": i,
+                        "subject_id": i,
+                        "intime": start + timedelta(minutes=i),
+                        "outtime": start + timedelta(minutes=i + 240),
+                        "gender": "F" if i % 2 else "M",
+                        "disposition": "HOME",
+                    }
+                    for i in ids
+                ],
+            )
+            conn.execute(
+                insert(Diagnosis.__table__),
+                [
+                    {
+                        "stay_id": i,
+                        "subject_id": i,
+                        "seq_num": seq,
+                        "icd_code": rng.choice(codes),
+                        "icd_version": 10,
+                    }
+                    for i in ids
+                    for seq in range(1, rng.randint(2, 5))
+                ],
+            )
+            for model in (Pyxis, MedRecon):
+                conn.execute(
+                    insert(model.__table__),
+                    [
+                        {"stay_id": i, "subject_id": i, "name": rng.choice(drugs)}
+                        for i in ids
+                        for _ in range(rng.randint(0, 6))
+                    ],
+                )
+    return engine
+
+
+def create_lookups(engine):
+    """Add the diagnosis index and medication_stays table as load_data.py does."""
+    with engine.begin() as conn:
+        for index in Diagnosis.__table__.indexes:
+            index.create(bind=conn, checkfirst=True)
+        MedicationStay.__table__.create(bind=conn)
+        build_medication_stays(conn)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def time_filter(engine, filters: CohortFilters, repeat: int):
+    """Median ms to count the cohort and fetch its first page of 20, and the
+    cohort's stay_ids."""
+    times = []
+    with Session(engine) as db:
+        query = filters.apply(encounter_query(db))
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            query.count()
+            query.order_by(EdStay.intime.desc()).limit(20).all()
+            times.append((time.perf_counter() - begin) * 1000)
+        stays = {stay_id for (stay_id,) in query.with_entities(EdStay.stay_id)}
+    return statistics.median(times), stays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with Session(source_engine) as db:
+        codes = [c for (c,) in db.execute(select(Diagnosis.icd_code))] or DEFAULT_CODES
+        drugs = [n for (n,) in db.execute(select(Pyxis.name)) if n] or DEFAULT_DRUGS
+    # Make sure every case has something to find
+    codes += ["I214", "I10", "E119"]
+    drugs += ["Heparin", "Insulin"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Building {args.rows:,} stays...")
+        engine = build_database(os.path.join(tmp, "bench.db"), args.rows, codes, drugs)
+        scans = {
+            name: time_filter(engine, replace(filters, medication_indexed=False), args.repeat)
+            for name, filters in CASES
+        }
+        create_lookups(engine)
+
+        mismatches = 0
+        print(f"\n{'filter':<20} {'scan ms':>9} {'indexed ms':>11} {'speedup':>8}  stays  equal")
+        for name, filters in CASES:
+            scan_ms, expected = scans[name]
+            indexed_ms, actual = time_filter(engine, filters, args.repeat)
+            equal = expected == actual
+            mismatches += not equal
+            print(
+                f"{name:<20} {scan_ms:>9.1f} {indexed_ms:>11.1f} "
+                f"{scan_ms / indexed_ms:>7.1f}x  {len(actual):>5}  {'yes' if equal else 'NO'}"
+            )
+        engine.dispose()
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
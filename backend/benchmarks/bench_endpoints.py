@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmark the main endpoints on synthetic datasets of several sizes and save
+the results as JSON.
+
+For each size, synthetic files are generated from the database at
+DATABASE_PATH (see generate_data.py) unless they already exist, loaded into
+a fresh database with load_data.py, and then every scenario is requested
+--requests times in a separate process running the app in-process. Latency
+percentiles and sequential throughput are recorded per scenario.
+
+Pass --compare with an earlier results file to print the change in p50 and
+p95 for each size and scenario.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/bench_endpoints.py \
+        --sizes 10000 100000 1000000 --work-dir /tmp/mimic-bench \
+        --output results.json [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def scenarios(client, rng: random.Random) -> list:
+    """(name, path, params factory) for each benchmarked request.
+
+    Filter values are taken from the filter options, so they exist at every
+    size.
+    """
+    options = client.get("/api/filters/options").json()
+    dates = options["date_range"]
+    start = datetime.fromisoformat(dates["min"])
+    end = datetime.fromisoformat(dates["max"])
+    middle = start + (end - start) / 2
+    total = client.get("/api/encounters/count").json()["total"]
+    last_page = max(1, (total + 19) // 20)
+    stay_ids = [
+        item["stay_id"]
+        for page in range(1, 6)
+        for item in client.get(
+            "/api/encounters", params={"page": page, "per_page": 100, "sort_by": "stay_id"}
+        ).json()["items"]
+    ]
+
+    def fixed(params):
+        return lambda: params
+
+    return [
+        ("list", "/api/encounters", fixed({})),
+        ("list gender", "/api/encounters", fixed({"gender": options["genders"][0]})),
+        (
+            "list disposition",
+            "/api/encounters",
+            fixed({"disposition": options["dispositions"][0]}),
+        ),
+        ("list race", "/api/encounters", fixed({"race": options["races"][0]})),
+        (
+            "list date range",
+            "/api/encounters",
+            fixed({"date_from": start.isoformat(), "date_to": middle.isoformat()}),
+        ),
+        ("list complaint fts", "/api/encounters", fixed({"chief_complaint": "pain"})),
+        (
+            "list complaint substring",
+            "/api/encounters",
+            fixed({"chief_complaint": "pain", "chief_complaint_mode": "substring"}),
+        ),
+        (
+            "list sort outtime asc",
+            "/api/encounters",
+            fixed({"sort_by": "outtime", "sort_order": "asc"}),
+        ),
+        ("list sort disposition", "/api/encounters", fixed({"sort_by": "disposition"})),
+        (
+            "list middle page",
+            "/api/encounters",
+            fixed({"page": max(1, last_page // 2)}),
+        ),
+        ("list last page", "/api/encounters", fixed({"page": last_page})),
+        (
+            "detail",
+            None,
+            lambda: {"path": f"/api/encounters/{rng.choice(stay_ids)}"},
+        ),
+        ("filter options", "/api/filters/options", fixed({})),
+    ]
+
+
+def measure(requests: int, seed: int) -> list:
+    """Run every scenario against DATABASE_PATH; return one result per scenario."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    rng = random.Random(seed)
+    results = []
+    for name, path, make_params in scenarios(client, rng):
+        latencies = []
+        begin = time.perf_counter()
+        for i in range(requests + 1):
+            params = dict(make_params())
+            url = params.pop("path", path)
+            start = time.perf_counter()
+            response = client.get(url, params=params)
+            elapsed = (time.perf_counter() - start) * 1000
+            response.raise_for_status()
+            if i == 0:
+                # The first request warms caches; it is reported separately
+                first_ms = elapsed
+                begin = time.perf_counter()
+            else:
+                latencies.append(elapsed)
+        wall = time.perf_counter() - begin
+        latencies.sort()
+        results.append(
+            {
+                "scenario": name,
+                "requests": requests,
+                "first_ms": round(first_ms, 3),
+                "mean_ms": round(sum(latencies) / len(latencies), 3),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p90_ms": round(percentile(latencies, 90), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "throughput_rps": round(requests / wall, 1),
+            }
+        )
+    return results
+
+
+def prepare(size: int, work_dir: str, seed: int) -> dict:
+    """Generate (if needed) and load one size; return its database path and load time."""
+    from app.database import engine as source_engine
+    from benchmarks.generate_data import generate
+
+    data_dir = os.path.join(work_dir, str(size))
+    if not os.path.exists(os.path.join(data_dir, "edstays.csv.gz")):
+        print(f"Generating {size:,} stays...")
+        generate(source_engine, size, data_dir, seed=seed)
+    database_path = os.path.join(work_dir, f"{size}.db")
+    if os.path.exists(database_path):
+        os.remove(database_path)
+    print(f"Loading {size:,} stays...")
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "load_data.py"],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, DATA_PATH=data_dir, DATABASE_PATH=database_path),
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return {"database_path": database_path, "load_seconds": time.perf_counter() - start}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline_path: str):
+    """Print p50/p95 changes against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {
+        (size["size"], r["scenario"]): r
+        for size in baseline["sizes"]
+        for r in size["scenarios"]
+    }
+    print(f"\nChange vs {baseline_path} ({baseline['meta']['commit']})")
+    print(f"{'size':>9} {'scenario':<26} {'p50':>8} {'p95':>8}")
+    for size in results["sizes"]:
+        for r in size["scenarios"]:
+            old = before.get((size["size"], r["scenario"]))
+            if old is None:
+                continue
+            p50 = r["p50_ms"] / old["p50_ms"] - 1 if old["p50_ms"] else 0.0
+            p95 = r["p95_ms"] / old["p95_ms"] - 1 if old["p95_ms"] else 0.0
+            print(f"{size['size']:>9,} {r['scenario']:<26} {p50:>+8.0%} {p95:>+8.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--work-dir", required=True, help="synthetic data and databases")
+    parser.add_argument("--requests", type=int, default=50, help="timed requests per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="results JSON file")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        # Child process: DATABASE_PATH points at one size's database
+        json.dump(measure(args.requests, args.seed), sys.stdout)
+        return
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "sizes": [],
+    }
+    for size in args.sizes:
+        prepared = prepare(size, args.work_dir, args.seed)
+        print(f"Benchmarking {size:,} stays...")
+        child = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--measure",
+                "--work-dir",
+                args.work_dir,
+                "--requests",
+                str(args.requests),
+                "--seed",
+                str(args.seed),
+            ],
+            cwd=BACKEND_DIR,
+            env=dict(os.environ, DATABASE_PATH=prepared["database_path"]),
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        scenario_results = json.loads(child.stdout)
+        results["sizes"].append(
+            {
+                "size": size,
+                "load_seconds": round(prepared["load_seconds"], 2),
+                "scenarios": scenario_results,
+            }
+        )
+        print(f"{'scenario':<26} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+        for r in scenario_results:
+            print(
+                f"{r['scenario']:<26} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                f"{r['p99_ms']:>8.1f} {r['throughput_rps']:>8.1f}"
+            )
+
+    output = args.output or os.path.join(
+        args.work_dir, f"endpoints-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
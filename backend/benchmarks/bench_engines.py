@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Run the list, count, summary and export queries on SQLite and on DuckDB over
+the Parquet snapshot, report their latency and check the results are equal.
+
+Write the snapshot first with `python load_data.py --parquet`. Chief
+complaint searches run in substring mode and in fts mode, which SQLite
+answers from its FTS5 index and DuckDB with a word prefix match. Filters are
+resolved per engine, as the routes do. Exits with status 1 if any query
+differs between the engines.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db PARQUET_PATH=/path/to/parquet \
+        python benchmarks/bench_engines.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+
+from app.cohort import CohortFilters
+from app.database import PARQUET_PATH, SessionLocal, create_parquet_engine
+from app.export import export_cohort
+from app.routers.encounters import (
+    ListParams,
+    count_cache,
+    encounter_query,
+    list_encounters,
+)
+from app.summary import cohort_summary
+
+COHORTS = {
+    "all": CohortFilters(),
+    "female": CohortFilters(gender="F"),
+    "admitted": CohortFilters(disposition=("ADMITTED",)),
+    "date range": CohortFilters(
+        date_from=datetime(2110, 1, 1), date_to=datetime(2160, 12, 31)
+    ),
+    "chest pain": CohortFilters(chief_complaint="chest pain"),
+    "fts ch pa": CohortFilters(chief_complaint="ch pa", chief_complaint_mode="fts"),
+    # No word starts with 'ain', so FTS finds nothing where substring matches 'pain'
+    "fts ain": CohortFilters(chief_complaint="ain", chief_complaint_mode="fts"),
+}
+
+
+def queries(filters: CohortFilters):
+    """(name, fn(session_factory)) pairs for one cohort."""
+
+    def count(factory):
+        with factory() as db:
+            return filters.resolve(db).apply(encounter_query(db)).count()
+
+    def page(factory, **params):
+        count_cache.clear()
+        with factory() as db:
+            return list_encounters(db, filters, ListParams(**params))
+
+    def summary(factory):
+        with factory() as db:
+            result = cohort_summary(db, filters.resolve(db))
+            return result.model_dump() if result else None
+
+    def export(factory):
+        return "".join(export_cohort(filters, "ndjson", True, session_factory=factory))
+
+    return [
+        ("count", count),
+        ("list", lambda f: page(f, sort_by="intime")),
+        ("list deep", lambda f: page(f, page=5, per_page=100, sort_by="disposition")),
+        ("summary", summary),
+        ("export", export),
+    ]
+
+
+def timed(fn, factory, repeat: int):
+    """Median ms of fn(factory), and its last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(factory)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parquet-path", default=PARQUET_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    duckdb_sessions = sessionmaker(bind=create_parquet_engine(args.parquet_path))
+    mismatches = 0
+    print(f"{'cohort':<12} {'query':<10} {'sqlite ms':>10} {'duckdb ms':>10}  equal")
+    for cohort, filters in COHORTS.items():
+        for name, fn in queries(filters):
+            sqlite_ms, expected = timed(fn, SessionLocal, args.repeat)
+            duckdb_ms, actual = timed(fn, duckdb_sessions, args.repeat)
+            equal = expected == actual
+            mismatches += not equal
+            print(
+                f"{cohort:<12} {name:<10} {sqlite_ms:>10.1f} {duckdb_ms:>10.1f}  "
+                f"{'yes' if equal else 'NO'}"
+            )
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Measure cohort export throughput and peak memory for each format, with and
+without child rows.
+
+Each run streams the whole database at DATABASE_PATH through export_cohort
+in its own process, so peak RSS is measured independently. With a flat
+memory profile, peak RSS stays near the baseline however large the export.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/bench_export.py --chunk-rows 1000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cohort import CohortFilters
+from app.export import export_cohort
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_export(export_format: str, include_children: bool, chunk_rows: int) -> dict:
+    """Stream one export, discarding the output, and return timing and memory."""
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    size = 0
+    for text in export_cohort(CohortFilters(), export_format, include_children, chunk_rows):
+        size += len(text)
+    return {
+        "seconds": time.perf_counter() - start,
+        "mb": size / 1024 / 1024,
+        "baseline_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    print("format  children  seconds   output MB   baseline MB   peak RSS MB")
+    for export_format in ("csv", "ndjson"):
+        for include_children in (False, True):
+            with ctx.Pool(1) as pool:
+                r = pool.apply(run_export, (export_format, include_children, args.chunk_rows))
+            print(
+                f"{export_format:<7} {'yes' if include_children else 'no':<9} "
+                f"{r['seconds']:>7.2f} {r['mb']:>11.1f} {r['baseline_mb']:>13.1f} "
+                f"{r['peak_rss_mb']:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
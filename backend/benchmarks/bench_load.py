@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Compare the ORM and bulk ingest paths of load_data.py.
+
+Each mode loads DATA_PATH into a fresh temporary SQLite file in its own
+process so that peak RSS is measured independently.
+
+Usage:
+    DATA_PATH=/path/to/ed python benchmarks/bench_load.py [--batch-size N]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+
+import load_data
+from app.database import Base
+
+
+def run_mode(mode: str, batch_size: int) -> dict:
+    """Load every table with the given mode and return timing and memory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        start = time.perf_counter()
+        if mode == "orm":
+            load_data.load_all_orm(engine)
+        else:
+            load_data.load_all_bulk(engine, batch_size)
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"mode": mode, "seconds": elapsed, "peak_rss_mb": peak_mb}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=load_data.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for mode in ("orm", "bulk"):
+        print(f"\n=== {mode} ===")
+        with ctx.Pool(1) as pool:
+            results.append(pool.apply(run_mode, (mode, args.batch_size)))
+
+    print("\nmode   seconds   peak RSS (MB)")
+    for r in results:
+        print(f"{r['mode']:<6} {r['seconds']:>8.2f}   {r['peak_rss_mb']:>10.1f}")
+    speedup = results[0]["seconds"] / results[1]["seconds"]
+    print(f"\nbulk speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare OFFSET and keyset (cursor) pagination latency on GET /api/encounters
+as pages get deeper.
+
+Runs the app in-process against DATABASE_PATH.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/bench_pagination.py --per-page 100
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def timed_get(client: TestClient, params: dict, repeat: int):
+    """Median latency in ms of GET /api/encounters, and the last response body."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get("/api/encounters", params=params)
+        times.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return statistics.median(times), response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--sort-by", default="intime")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=8, help="depths to report")
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    base = {"per_page": args.per_page, "sort_by": args.sort_by, "sort_order": "desc"}
+    total_pages = client.get("/api/encounters", params=base).json()["total_pages"]
+    step = max(1, total_pages // args.samples)
+    depths = set(range(1, total_pages + 1, step)) | {total_pages}
+
+    print(f"{total_pages} pages of {args.per_page}; median of {args.repeat} runs (ms)")
+    print("page      offset    cursor")
+    cursor = None
+    for page in range(1, total_pages + 1):
+        cursor_params = dict(base, pagination="cursor")
+        if cursor:
+            cursor_params["cursor"] = cursor
+        if page in depths:
+            offset_ms, _ = timed_get(client, dict(base, page=page), args.repeat)
+            cursor_ms, body = timed_get(client, cursor_params, args.repeat)
+            print(f"{page:<8} {offset_ms:>8.2f} {cursor_ms:>9.2f}")
+        else:
+            body = client.get("/api/encounters", params=cursor_params).json()
+        cursor = body["next_cursor"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare the serial bulk loader with the parallel loader at several worker
+counts, and check that every parallel build matches the serial database.
+
+Usage:
+    DATA_PATH=/path/to/ed python benchmarks/bench_parallel_load.py --workers 1 2 4 8
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+import load_data
+from app.database import Base
+
+
+def table_digests(engine) -> dict:
+    """SHA-256 of every loaded table's rows in primary-key order."""
+    digests = {}
+    with engine.connect() as conn:
+        for source in load_data.TABLE_SOURCES:
+            table = source.model.__table__
+            pk = ", ".join(c.name for c in table.primary_key.columns)
+            digest = hashlib.sha256()
+            for row in conn.execute(text(f"SELECT * FROM {table.name} ORDER BY {pk}")):
+                digest.update(repr(tuple(row)).encode())
+            digests[table.name] = digest.hexdigest()
+    return digests
+
+
+def build(tmp: str, name: str, load) -> tuple:
+    """Build a database with the given load function; return (seconds, digests)."""
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, name)}")
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    load(engine)
+    elapsed = time.perf_counter() - start
+    digests = table_digests(engine)
+    engine.dispose()
+    return elapsed, digests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=load_data.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        print("=== serial bulk ===")
+        serial_time, expected = build(
+            tmp, "serial.db", lambda e: load_data.load_all_bulk(e, args.batch_size)
+        )
+        results.append(("serial", serial_time, True))
+        for workers in args.workers:
+            print(f"\n=== parallel, {workers} worker(s) ===")
+            elapsed, digests = build(
+                tmp,
+                f"parallel_{workers}.db",
+                lambda e: load_data.load_all_parallel(e, workers, args.batch_size),
+            )
+            results.append((f"parallel x{workers}", elapsed, digests == expected))
+
+    print("\nloader          seconds  speedup  matches serial")
+    for name, elapsed, matches in results:
+        print(f"{name:<15} {elapsed:>7.2f}  {serial_time / elapsed:>6.2f}x  {matches}")
+    if not all(matches for _, _, matches in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
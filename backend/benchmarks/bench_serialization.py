@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Compare the old model-based response path with the tuple + orjson path for
+an encounter list page and for encounter details.
+
+The model path loads ORM entities, builds the response models, and then does
+what FastAPI does with a response_model: validate the response again and
+serialize it for JSONResponse. The fast path is the one the routes use:
+list_encounters and load_encounter_details fetch column tuples and encode
+plain dicts once. Both paths run on the same rows and must produce the same
+bytes; the benchmark exits with status 1 if they do not.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/bench_serialization.py \
+        --per-page 100 --details 20 --repeat 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+
+from app.cohort import CohortFilters
+from app.database import SessionLocal
+from app.main import app
+from app.models import Diagnosis, EdStay, MedRecon, Pyxis, Triage, VitalSign
+from app.routers.encounters import (
+    ListParams,
+    encounter_query,
+    list_encounters,
+    load_encounter_details,
+)
+from app.schemas import (
+    DiagnosisSchema,
+    EncounterDetail,
+    EncounterListItem,
+    EncounterListResponse,
+    MedicationSchema,
+    TriageSchema,
+    VitalSignSchema,
+)
+from app.serialization import dumps
+
+
+def response_field(path: str, method: str = "GET"):
+    for route in app.routes:
+        if getattr(route, "path", None) == path and method in route.methods:
+            return route.response_field
+    raise SystemExit(f"No route {method} {path}")
+
+
+def render(field, content) -> bytes:
+    """What FastAPI does with a route's return value and response_model."""
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors, errors
+    return JSONResponse(field.serialize(value, by_alias=True)).body
+
+
+def model_list_page(db, params: ListParams, total: int) -> EncounterListResponse:
+    """A list page built from ORM entities, one model per row."""
+    query = encounter_query(db).order_by(EdStay.intime.desc(), EdStay.stay_id.desc())
+    results = query.offset((params.page - 1) * params.per_page).limit(params.per_page).all()
+    items = [
+        EncounterListItem(
+            stay_id=edstay.stay_id,
+            subject_id=edstay.subject_id,
+            hadm_id=edstay.hadm_id,
+            intime=edstay.intime,
+            outtime=edstay.outtime,
+            gender=edstay.gender,
+            race=edstay.race,
+            arrival_transport=edstay.arrival_transport,
+            disposition=edstay.disposition,
+            chiefcomplaint=triage.chiefcomplaint if triage else None,
+            acuity=triage.acuity if triage else None,
+            duration_hours=round((edstay.outtime - edstay.intime).total_seconds() / 3600, 2),
+        )
+        for edstay, triage in results
+    ]
+    return EncounterListResponse(
+        items=items,
+        total=total,
+        page=params.page,
+        per_page=params.per_page,
+        total_pages=(total + params.per_page - 1) // params.per_page,
+    )
+
+
+def model_detail(db, stay_id: int) -> EncounterDetail:
+    """A detail built from ORM entities, with medications sorted in Python."""
+    edstay = db.query(EdStay).filter(EdStay.stay_id == stay_id).one()
+    triage = (
+        db.query(Triage).filter(Triage.stay_id == stay_id).order_by(Triage.id).first()
+    )
+    vitals = (
+        db.query(VitalSign)
+        .filter(VitalSign.stay_id == stay_id)
+        .order_by(VitalSign.charttime, VitalSign.id)
+    )
+    diagnoses = (
+        db.query(Diagnosis)
+        .filter(Diagnosis.stay_id == stay_id)
+        .order_by(Diagnosis.seq_num, Diagnosis.id)
+    )
+    medications = [
+        MedicationSchema(
+            charttime=m.charttime,
+            name=m.name,
+            source="medrecon",
+            gsn=m.gsn,
+            description=m.etcdescription,
+        )
+        for m in db.query(MedRecon).filter(MedRecon.stay_id == stay_id).order_by(MedRecon.id)
+    ]
+    medications += [
+        MedicationSchema(
+            charttime=p.charttime, name=p.name, source="pyxis", gsn=p.gsn, description=None
+        )
+        for p in db.query(Pyxis).filter(Pyxis.stay_id == stay_id).order_by(Pyxis.id)
+    ]
+    medications.sort(key=lambda x: x.charttime or datetime.min)
+    return EncounterDetail(
+        stay_id=edstay.stay_id,
+        subject_id=edstay.subject_id,
+        hadm_id=edstay.hadm_id,
+        intime=edstay.intime,
+        outtime=edstay.outtime,
+        gender=edstay.gender,
+        race=edstay.race,
+        arrival_transport=edstay.arrival_transport,
+        disposition=edstay.disposition,
+        duration_hours=round((edstay.outtime - edstay.intime).total_seconds() / 3600, 2),
+        triage=TriageSchema.model_validate(triage) if triage else None,
+        vitalsigns=[VitalSignSchema.model_validate(v) for v in vitals],
+        diagnoses=[DiagnosisSchema.model_validate(d) for d in diagnoses],
+        medications=medications,
+    )
+
+
+def timed(fn, repeat: int):
+    """Median ms of fn(), and its last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--details", type=int, default=20, help="stays per detail run")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    list_field = response_field("/api/encounters")
+    detail_field = response_field("/api/encounters/{stay_id}")
+    params = ListParams(per_page=args.per_page)
+    filters = CohortFilters()
+
+    with SessionLocal() as db:
+        stay_ids = [
+            stay_id
+            for (stay_id,) in db.query(EdStay.stay_id)
+            .order_by(EdStay.stay_id)
+            .limit(args.details)
+        ]
+        # Warm the count cache and the page cache; both paths reuse the total
+        list_encounters(db, filters, params)
+        total = encounter_query(db).count()
+
+        cases = [
+            (
+                f"list page ({args.per_page} items)",
+                lambda: render(list_field, model_list_page(db, params, total)),
+                lambda: list_encounters(db, filters, params),
+            ),
+            (
+                f"detail x{len(stay_ids)}",
+                lambda: [render(detail_field, model_detail(db, i)) for i in stay_ids],
+                lambda: [
+                    dumps(load_encounter_details(db, [i])[i]) for i in stay_ids
+                ],
+            ),
+        ]
+
+        mismatches = 0
+        print(f"{'case':<24} {'models ms':>10} {'orjson ms':>10} {'speedup':>8}  equal")
+        for name, model_path, fast_path in cases:
+            model_ms, expected = timed(model_path, args.repeat)
+            fast_ms, actual = timed(fast_path, args.repeat)
+            equal = expected == actual
+            mismatches += not equal
+            print(
+                f"{name:<24} {model_ms:>10.2f} {fast_ms:>10.2f} "
+                f"{model_ms / fast_ms:>7.1f}x  {'yes' if equal else 'NO'}"
+            )
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
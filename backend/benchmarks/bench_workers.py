@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Measure startup time, throughput and memory of the multi-process serving mode
+at several worker counts.
+
+For each count, gunicorn is started with gunicorn.conf.py (preloaded app,
+SQLITE_SERVING=immutable unless set) on DATABASE_PATH. Startup time runs
+until every worker has logged that its application started. Then the
+load_test.py request mix is sent by --concurrency clients for --duration
+seconds. Memory is the summed RSS and PSS (proportional set size, which
+splits shared pages between the processes mapping them) of the master and its
+workers after the run; PSS needs Linux.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/bench_workers.py \
+        --workers 1 2 4 8 --concurrency 64 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from load_test import BACKEND_DIR, run_clients, sample_stay_ids
+
+STARTED = "Application startup complete."
+
+
+def start_gunicorn(workers: int, port: int, timeout: float = 120):
+    """Start gunicorn; return the process and seconds until all workers started."""
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}")
+    begin = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    ready = threading.Event()
+
+    def watch_log():
+        started = 0
+        for line in process.stderr:
+            if STARTED in line:
+                started += 1
+                if started == workers:
+                    ready.set()
+        ready.set()
+
+    threading.Thread(target=watch_log, daemon=True).start()
+    if not ready.wait(timeout) or process.poll() is not None:
+        process.terminate()
+        raise RuntimeError(f"gunicorn with {workers} workers did not start")
+    return process, time.perf_counter() - begin
+
+
+def process_tree_memory(pid: int):
+    """Summed RSS and PSS in MB of a process and its children (PSS None off Linux)."""
+    pids = [pid]
+    children = f"/proc/{pid}/task/{pid}/children"
+    if os.path.exists(children):
+        with open(children) as f:
+            pids += [int(child) for child in f.read().split()]
+    rss = pss = 0
+    for member in pids:
+        try:
+            with open(f"/proc/{member}/smaps_rollup") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            return None, None
+        rss += int(fields["Rss"].split()[0])
+        pss += int(fields["Pss"].split()[0])
+    return rss / 1024, pss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    database_path = os.environ.get("DATABASE_PATH", os.path.join(BACKEND_DIR, "mimic_ed.db"))
+    stay_ids = sample_stay_ids(database_path)
+    print(f"{os.cpu_count()} CPUs")
+    print(
+        f"{'workers':>7} {'startup s':>9} {'req/s':>8} {'p50 ms':>7} {'p95 ms':>7} "
+        f"{'errors':>6} {'RSS MB':>7} {'PSS MB':>7}"
+    )
+    results = []
+    for workers in args.workers:
+        server, startup = start_gunicorn(workers, args.port)
+        try:
+            result = asyncio.run(
+                run_clients(
+                    f"http://127.0.0.1:{args.port}", args.concurrency, args.duration, stay_ids
+                )
+            )
+            rss, pss = process_tree_memory(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+        result.update(workers=workers, startup_s=startup, rss_mb=rss, pss_mb=pss)
+        results.append(result)
+        print(
+            f"{workers:>7} {startup:>9.2f} {result['rps']:>8.1f} {result['p50_ms']:>7.1f} "
+            f"{result['p95_ms']:>7.1f} {result['errors']:>6} "
+            f"{rss or float('nan'):>7.0f} {pss or float('nan'):>7.0f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic MIMIC IV ED files at larger scales from the real data.
+
+Each synthetic stay copies a stay drawn at random from the database at
+DATABASE_PATH, together with its triage, vital sign, diagnosis, medrecon and
+pyxis rows, shifted by a random whole number of days. Demographics,
+dispositions, length of stay, hour of arrival, vitals and per-stay child row
+counts therefore follow the real joint distributions. Stays are spread over
+subjects in the real stays-per-subject ratio.
+
+Files are written as <output-dir>/<size>/<table>.csv.gz with the columns
+load_data.py reads, one stay at a time, so memory does not grow with size.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/generate_data.py \
+        --sizes 10000 100000 1000000 --output-dir /tmp/mimic-synthetic
+"""
+import argparse
+import csv
+import gzip
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from app.database import engine as source_engine
+from app.models import EdStay
+from load_data import TABLE_SOURCES
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+# Synthetic id ranges, in the shape of MIMIC's
+FIRST_STAY_ID = 30_000_000
+FIRST_SUBJECT_ID = 10_000_000
+FIRST_HADM_ID = 20_000_000
+
+
+def csv_columns(model) -> list:
+    """CSV columns for a table: every model column except the surrogate id."""
+    return [c.name for c in model.__table__.columns if c.name != "id"]
+
+
+def format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def read_templates(engine: Engine):
+    """Real stays, and every child table's rows grouped by stay_id."""
+    with engine.connect() as conn:
+        stays = [dict(row) for row in conn.execute(select(EdStay.__table__)).mappings()]
+        subjects = conn.execute(select(func.count(func.distinct(EdStay.subject_id)))).scalar()
+        children = {}
+        for source in TABLE_SOURCES:
+            if source.model is EdStay:
+                continue
+            grouped = defaultdict(list)
+            table = source.model.__table__
+            for row in conn.execute(select(table).order_by(table.c.id)).mappings():
+                grouped[row["stay_id"]].append(dict(row))
+            children[source.label] = grouped
+    return stays, subjects, children
+
+
+def shifted(row: dict, shift: timedelta, **values) -> dict:
+    """A copy of row with its datetimes moved by shift and values overridden."""
+    out = {
+        key: value + shift if isinstance(value, datetime) else value
+        for key, value in row.items()
+    }
+    out.update(values)
+    return out
+
+
+def generate(
+    engine: Engine, size: int, output_dir: str, spread_days: int = 365, seed: int = 0
+) -> dict:
+    """Write `size` synthetic stays and their child rows; return rows per table."""
+    stays, subjects, children = read_templates(engine)
+    if not stays:
+        raise SystemExit("The source database has no stays to sample from")
+    n_subjects = max(1, round(size * subjects / len(stays)))
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {source.label: 0 for source in TABLE_SOURCES}
+
+    with ExitStack() as stack:
+        writers = {}
+        for source in TABLE_SOURCES:
+            path = os.path.join(output_dir, source.filename)
+            f = stack.enter_context(gzip.open(path, "wt", newline="", compresslevel=1))
+            writer = csv.writer(f)
+            columns = csv_columns(source.model)
+            writer.writerow(columns)
+            writers[source.label] = (writer, columns)
+
+        def write(label: str, row: dict):
+            writer, columns = writers[label]
+            writer.writerow([format_value(row[c]) for c in columns])
+            counts[label] += 1
+
+        for k in range(size):
+            template = rng.choice(stays)
+            shift = timedelta(days=rng.randint(-spread_days, spread_days))
+            ids = {
+                "stay_id": FIRST_STAY_ID + k,
+                "subject_id": FIRST_SUBJECT_ID + rng.randrange(n_subjects),
+            }
+            hadm_id = FIRST_HADM_ID + k if template["hadm_id"] is not None else None
+            write("edstays", shifted(template, shift, hadm_id=hadm_id, **ids))
+            for label, grouped in children.items():
+                for row in grouped.get(template["stay_id"], ()):
+                    write(label, shifted(row, shift, **ids))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument(
+        "--spread-days",
+        type=int,
+        default=365,
+        help="stays are shifted by up to this many days either way (default: 365)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        output_dir = os.path.join(args.output_dir, str(size))
+        print(f"Generating {size:,} stays in {output_dir}...")
+        start = time.perf_counter()
+        counts = generate(source_engine, size, output_dir, args.spread_days, args.seed)
+        rows = ", ".join(f"{label} {count:,}" for label, count in counts.items())
+        print(f"  {rows} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Load-test the API in sync and async DATABASE_MODE, and under SQLITE_SERVING
+profiles, at several concurrency levels.
+
+For each mode and profile a uvicorn server is started on DATABASE_PATH, then
+N concurrent clients issue a mix of list, detail and filter-option requests
+for a fixed duration. Throughput and latency percentiles are reported. The
+'wal' profile switches the file to WAL; it is switched back afterwards so
+later runs measure the default rollback journal.
+
+Usage:
+    DATABASE_PATH=/path/to/mimic_ed.db python benchmarks/load_test.py \
+        --modes sync async --serving off wal immutable \
+        --concurrency 50 100 200 500 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def sample_stay_ids(database_path: str, n: int = 1000) -> list:
+    conn = sqlite3.connect(database_path)
+    try:
+        rows = conn.execute(
+            "SELECT stay_id FROM edstays ORDER BY random() LIMIT ?", (n,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [r[0] for r in rows]
+
+
+def request_mix(stay_ids: list):
+    """Yield (path, params) pairs approximating dashboard traffic."""
+    rng = random.Random()
+    while True:
+        roll = rng.random()
+        if roll < 0.5:
+            yield "/api/encounters", {"page": rng.randint(1, 20), "per_page": 20}
+        elif roll < 0.85:
+            yield f"/api/encounters/{rng.choice(stay_ids)}", {}
+        else:
+            yield "/api/filters/options", {}
+
+
+async def run_clients(base_url: str, concurrency: int, duration: float, stay_ids: list):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def worker():
+            nonlocal errors
+            for path, params in request_mix(stay_ids):
+                if time.perf_counter() >= deadline:
+                    return
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path, params=params)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def start_server(mode: str, serving: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_MODE=mode, SQLITE_SERVING=serving)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"server in {mode} mode ({serving}) did not start")
+
+
+def reset_journal_mode(database_path: str):
+    conn = sqlite3.connect(database_path)
+    try:
+        conn.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    parser.add_argument(
+        "--serving",
+        nargs="+",
+        default=["off"],
+        choices=["off", "wal", "immutable"],
+        help="SQLITE_SERVING profiles to compare (default: off)",
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 200, 500])
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    database_path = os.environ.get("DATABASE_PATH", os.path.join(BACKEND_DIR, "mimic_ed.db"))
+    stay_ids = sample_stay_ids(database_path)
+    results = []
+    for mode in args.modes:
+        for serving in args.serving:
+            server = start_server(mode, serving, args.port)
+            try:
+                for concurrency in args.concurrency:
+                    result = asyncio.run(
+                        run_clients(
+                            f"http://127.0.0.1:{args.port}", concurrency, args.duration, stay_ids
+                        )
+                    )
+                    result["mode"] = mode
+                    result["serving"] = serving
+                    results.append(result)
+                    print(
+                        f"{mode:<6} {serving:<9} c={concurrency:<4} {result['rps']:>8.1f} req/s  "
+                        f"p50 {result['p50_ms']:>7.1f}  p95 {result['p95_ms']:>7.1f}  "
+                        f"p99 {result['p99_ms']:>7.1f} ms  errors {result['errors']}"
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+                if serving == "wal":
+                    reset_journal_mode(database_path)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,39 @@
 #!/bin/bash
 set -e
 
-# Check if database exists
 DB_PATH="${DATABASE_PATH:-/app/db/mimic_ed.db}"
 DATA_DIR="${DATA_PATH:-/app/data}"
+# Parquet snapshot served by QUERY_ENGINE=duckdb, kept beside the database
+export PARQUET_PATH="${PARQUET_PATH:-$(dirname "$DB_PATH")/parquet}"
+
+LOAD_ARGS=()
+if [ "${QUERY_ENGINE:-sqlite}" = "duckdb" ]; then
+    # Rewritten only when its data generation is out of date
+    LOAD_ARGS=(--parquet --parquet-path "$PARQUET_PATH")
+fi
 
 # Create db directory if it doesn't exist
 mkdir -p "$(dirname "$DB_PATH")"
 
-# Initialize database if it doesn't exist and data files are present
-if [ ! -f "$DB_PATH" ]; then
-    if [ -d "$DATA_DIR" ] && [ -f "$DATA_DIR/edstays.csv.gz" ]; then
-        echo "Database not found. Initializing from data files..."
-        python load_data.py
-        echo "Database initialized successfully!"
-    else
-        echo "Warning: No data files found in $DATA_DIR"
-        echo "Please mount the MIMIC IV ED data files to /app/data"
-        echo "Starting server anyway (API will return empty results)..."
-        # Create empty database with tables
-        python -c "from app.database import engine, Base; Base.metadata.create_all(bind=engine)"
-    fi
+# Build or update the database whenever data files are present. load_data.py
+# only reloads tables whose source file changed or whose load never finished.
+if [ -d "$DATA_DIR" ] && [ -f "$DATA_DIR/edstays.csv.gz" ]; then
+    echo "Synchronizing database with data files..."
+    python load_data.py "${LOAD_ARGS[@]}"
+    echo "Database ready!"
+elif [ ! -f "$DB_PATH" ]; then
+    echo "Warning: No data files found in $DATA_DIR"
+    echo "Please mount the MIMIC IV ED data files to /app/data"
+    echo "Starting server anyway (API will return empty results)..."
+    # Create empty database with tables
+    python -c "from app.database import Base, create_sqlite_engine; import app.models; Base.metadata.create_all(bind=create_sqlite_engine())"
 else
-    echo "Database found at $DB_PATH"
+    echo "Database found at $DB_PATH (no data files to sync)"
 fi
 
-# Start the server
+# Start the server: one uvicorn process, or WEB_CONCURRENCY gunicorn workers
+# forked from a preloaded app and sharing a read-only, memory-mapped database
+if [ "${WEB_CONCURRENCY:-1}" -gt 1 ]; then
+    exec gunicorn -c gunicorn.conf.py app.main:app
+fi
 exec uvicorn app.main:app --host 0.0.0.0 --port 8000
@@ -0,0 +1,31 @@
+"""Gunicorn settings for serving the API from several worker processes.
+
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master and forked into WEB_CONCURRENCY
+uvicorn workers, which share the imported modules' memory copy-on-write.
+Workers open the database read-only with SQLITE_SERVING=immutable (unless it
+is set otherwise) and memory-map it, so they all read the same page-cache
+copy of the file. Database connections, caches and metrics are per worker and
+start empty: each worker connects on its first request and fills its caches
+as it serves, and DETAIL_CACHE_WARM, if set, runs in every worker.
+"""
+import os
+
+# Before the app is imported: app.config reads it at import time
+os.environ.setdefault("SQLITE_SERVING", "immutable")
+
+from app.config import WEB_CONCURRENCY  # noqa: E402
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Worker startup includes DETAIL_CACHE_WARM, which can take a while
+timeout = 120
+
+
+def post_fork(server, worker):
+    from app.database import dispose_engines_after_fork
+
+    dispose_engines_after_fork()
@@ -2,24 +2,62 @@
 """
 Load MIMIC IV ED Demo data from CSV.gz files into SQLite database.
 """
+import argparse
 import gzip
 import csv
+import hashlib
+import multiprocessing
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from queue import Empty
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 # Add app directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import engine, Base
-from app.models import EdStay, Triage, VitalSign, Diagnosis, MedRecon, Pyxis
+from app.database import Base, PARQUET_PATH, create_sqlite_engine
+from app.models import (
+    EdStay,
+    Triage,
+    VitalSign,
+    Diagnosis,
+    MedRecon,
+    Pyxis,
+    FilterOptionValue,
+    LoadManifest,
+    StayFeature,
+    EncounterRollup,
+    LengthOfStayRollup,
+    MedicationStay,
+)
+from app.features import build_stay_features
+from app.lookups import build_medication_stays
+from app.options import build_filter_options
+from app.search import TRIAGE_FTS_TABLE, create_triage_fts
+from app.summary import build_encounter_rollup, build_los_rollup
+from sqlalchemy import delete, func, insert, inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 
 # Path to MIMIC IV ED data files - use environment variable or default
 DATA_PATH = Path(os.environ.get("DATA_PATH", "/Users/kasra/Documents/Mimic Demo/mimic-iv-ed-demo-2.2/ed"))
 
+# Rows per executemany call in bulk mode
+DEFAULT_BATCH_SIZE = 5000
+
+# Compressed bytes per parse task in parallel mode
+PARALLEL_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Manifest source_file for tables built from other tables
+DERIVED_SOURCE = "(derived)"
+
+# The loader writes, so it never uses the API's read-only SQLITE_SERVING profile
+engine = create_sqlite_engine()
+
 
 def parse_datetime(value: str) -> Optional[datetime]:
     """Parse datetime string to datetime object."""
@@ -61,144 +99,617 @@ def load_csv_gz(filename: str):
             yield row
 
 
-def load_edstays(session: Session):
-    """Load edstays table."""
-    count = 0
-    for row in load_csv_gz("edstays.csv.gz"):
-        edstay = EdStay(
-            stay_id=int(row["stay_id"]),
-            subject_id=int(row["subject_id"]),
-            hadm_id=parse_int(row.get("hadm_id", "")),
-            intime=parse_datetime(row["intime"]),
-            outtime=parse_datetime(row["outtime"]),
-            gender=row["gender"],
-            race=row.get("race", None) or None,
-            arrival_transport=row.get("arrival_transport", None) or None,
-            disposition=row["disposition"],
-        )
-        session.add(edstay)
-        count += 1
-    session.commit()
-    print(f"  Loaded {count} edstays records")
+def edstay_row(row: dict) -> dict:
+    """Convert an edstays CSV row to column values."""
+    return {
+        "stay_id": int(row["stay_id"]),
+        "subject_id": int(row["subject_id"]),
+        "hadm_id": parse_int(row.get("hadm_id", "")),
+        "intime": parse_datetime(row["intime"]),
+        "outtime": parse_datetime(row["outtime"]),
+        "gender": row["gender"],
+        "race": row.get("race", None) or None,
+        "arrival_transport": row.get("arrival_transport", None) or None,
+        "disposition": row["disposition"],
+    }
 
 
-def load_triage(session: Session):
-    """Load triage table."""
-    count = 0
-    for row in load_csv_gz("triage.csv.gz"):
-        triage = Triage(
-            subject_id=int(row["subject_id"]),
-            stay_id=int(row["stay_id"]),
-            temperature=parse_float(row.get("temperature", "")),
-            heartrate=parse_float(row.get("heartrate", "")),
-            resprate=parse_float(row.get("resprate", "")),
-            o2sat=parse_float(row.get("o2sat", "")),
-            sbp=parse_float(row.get("sbp", "")),
-            dbp=parse_float(row.get("dbp", "")),
-            pain=row.get("pain", None) or None,
-            acuity=parse_int(row.get("acuity", "")),
-            chiefcomplaint=row.get("chiefcomplaint", None) or None,
-        )
-        session.add(triage)
-        count += 1
-    session.commit()
-    print(f"  Loaded {count} triage records")
+def triage_row(row: dict) -> dict:
+    """Convert a triage CSV row to column values."""
+    return {
+        "subject_id": int(row["subject_id"]),
+        "stay_id": int(row["stay_id"]),
+        "temperature": parse_float(row.get("temperature", "")),
+        "heartrate": parse_float(row.get("heartrate", "")),
+        "resprate": parse_float(row.get("resprate", "")),
+        "o2sat": parse_float(row.get("o2sat", "")),
+        "sbp": parse_float(row.get("sbp", "")),
+        "dbp": parse_float(row.get("dbp", "")),
+        "pain": row.get("pain", None) or None,
+        "acuity": parse_int(row.get("acuity", "")),
+        "chiefcomplaint": row.get("chiefcomplaint", None) or None,
+    }
 
 
-def load_vitalsigns(session: Session):
-    """Load vitalsigns table."""
-    count = 0
-    for row in load_csv_gz("vitalsign.csv.gz"):
-        vital = VitalSign(
-            subject_id=int(row["subject_id"]),
-            stay_id=int(row["stay_id"]),
-            charttime=parse_datetime(row["charttime"]),
-            temperature=parse_float(row.get("temperature", "")),
-            heartrate=parse_float(row.get("heartrate", "")),
-            resprate=parse_float(row.get("resprate", "")),
-            o2sat=parse_float(row.get("o2sat", "")),
-            sbp=parse_float(row.get("sbp", "")),
-            dbp=parse_float(row.get("dbp", "")),
-            rhythm=row.get("rhythm", None) or None,
-            pain=row.get("pain", None) or None,
-        )
-        session.add(vital)
-        count += 1
-    session.commit()
-    print(f"  Loaded {count} vitalsign records")
+def vitalsign_row(row: dict) -> dict:
+    """Convert a vitalsign CSV row to column values."""
+    return {
+        "subject_id": int(row["subject_id"]),
+        "stay_id": int(row["stay_id"]),
+        "charttime": parse_datetime(row["charttime"]),
+        "temperature": parse_float(row.get("temperature", "")),
+        "heartrate": parse_float(row.get("heartrate", "")),
+        "resprate": parse_float(row.get("resprate", "")),
+        "o2sat": parse_float(row.get("o2sat", "")),
+        "sbp": parse_float(row.get("sbp", "")),
+        "dbp": parse_float(row.get("dbp", "")),
+        "rhythm": row.get("rhythm", None) or None,
+        "pain": row.get("pain", None) or None,
+    }
 
 
-def load_diagnoses(session: Session):
-    """Load diagnoses table."""
-    count = 0
-    for row in load_csv_gz("diagnosis.csv.gz"):
-        diagnosis = Diagnosis(
-            subject_id=int(row["subject_id"]),
-            stay_id=int(row["stay_id"]),
-            seq_num=int(row["seq_num"]),
-            icd_code=row["icd_code"],
-            icd_version=int(row["icd_version"]),
-            icd_title=row.get("icd_title", None) or None,
-        )
-        session.add(diagnosis)
-        count += 1
-    session.commit()
-    print(f"  Loaded {count} diagnosis records")
+def diagnosis_row(row: dict) -> dict:
+    """Convert a diagnosis CSV row to column values."""
+    return {
+        "subject_id": int(row["subject_id"]),
+        "stay_id": int(row["stay_id"]),
+        "seq_num": int(row["seq_num"]),
+        "icd_code": row["icd_code"],
+        "icd_version": int(row["icd_version"]),
+        "icd_title": row.get("icd_title", None) or None,
+    }
+
+
+def medrecon_row(row: dict) -> dict:
+    """Convert a medrecon CSV row to column values."""
+    return {
+        "subject_id": int(row["subject_id"]),
+        "stay_id": int(row["stay_id"]),
+        "charttime": parse_datetime(row.get("charttime", "")),
+        "name": row.get("name", None) or None,
+        "gsn": row.get("gsn", None) or None,
+        "ndc": row.get("ndc", None) or None,
+        "etc_rn": parse_int(row.get("etc_rn", "")),
+        "etccode": row.get("etccode", None) or None,
+        "etcdescription": row.get("etcdescription", None) or None,
+    }
+
+
+def pyxis_row(row: dict) -> dict:
+    """Convert a pyxis CSV row to column values."""
+    return {
+        "subject_id": int(row["subject_id"]),
+        "stay_id": int(row["stay_id"]),
+        "charttime": parse_datetime(row.get("charttime", "")),
+        "med_rn": parse_int(row.get("med_rn", "")),
+        "name": row.get("name", None) or None,
+        "gsn_rn": parse_int(row.get("gsn_rn", "")),
+        "gsn": row.get("gsn", None) or None,
+    }
+
+
+class TableSource(NamedTuple):
+    """A source CSV file and the table it is loaded into."""
+
+    label: str
+    filename: str
+    model: type
+    convert: Callable[[dict], dict]
+
 
+# Load order matters: child tables reference edstays.
+TABLE_SOURCES = [
+    TableSource("edstays", "edstays.csv.gz", EdStay, edstay_row),
+    TableSource("triage", "triage.csv.gz", Triage, triage_row),
+    TableSource("vitalsign", "vitalsign.csv.gz", VitalSign, vitalsign_row),
+    TableSource("diagnosis", "diagnosis.csv.gz", Diagnosis, diagnosis_row),
+    TableSource("medrecon", "medrecon.csv.gz", MedRecon, medrecon_row),
+    TableSource("pyxis", "pyxis.csv.gz", Pyxis, pyxis_row),
+]
+SOURCES_BY_LABEL = {source.label: source for source in TABLE_SOURCES}
 
-def load_medrecon(session: Session):
-    """Load medrecon table."""
+
+def report_loaded(label: str, count: int, elapsed: float):
+    """Print the row count and throughput for a loaded table."""
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"  Loaded {count} {label} records in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+
+# Called inside a table's load transaction once all of its rows are inserted
+OnLoaded = Callable[[Connection, TableSource, int], None]
+
+
+def load_table_orm(session: Session, source: TableSource) -> int:
+    """Load one table by adding an ORM object per row.
+
+    Rows are flushed but not committed; the caller owns the transaction.
+    """
+    start = time.perf_counter()
     count = 0
-    for row in load_csv_gz("medrecon.csv.gz"):
-        med = MedRecon(
-            subject_id=int(row["subject_id"]),
-            stay_id=int(row["stay_id"]),
-            charttime=parse_datetime(row.get("charttime", "")),
-            name=row.get("name", None) or None,
-            gsn=row.get("gsn", None) or None,
-            ndc=row.get("ndc", None) or None,
-            etc_rn=parse_int(row.get("etc_rn", "")),
-            etccode=row.get("etccode", None) or None,
-            etcdescription=row.get("etcdescription", None) or None,
-        )
-        session.add(med)
+    for row in load_csv_gz(source.filename):
+        session.add(source.model(**source.convert(row)))
         count += 1
-    session.commit()
-    print(f"  Loaded {count} medrecon records")
+    session.flush()
+    report_loaded(source.label, count, time.perf_counter() - start)
+    return count
+
+
+def iter_batches(rows: Iterable[dict], batch_size: int) -> Iterator[List[dict]]:
+    """Group an iterable of rows into lists of at most batch_size rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
-def load_pyxis(session: Session):
-    """Load pyxis table."""
+def load_table_bulk(
+    conn: Connection, source: TableSource, batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """Load one table with Core executemany inserts in fixed-size batches.
+
+    Rows are streamed from the CSV and never enter a Session identity map, so
+    memory stays bounded by batch_size no matter how large the file is. The
+    caller owns the transaction.
+    """
+    start = time.perf_counter()
+    stmt = insert(source.model.__table__)
     count = 0
-    for row in load_csv_gz("pyxis.csv.gz"):
-        med = Pyxis(
-            subject_id=int(row["subject_id"]),
-            stay_id=int(row["stay_id"]),
-            charttime=parse_datetime(row.get("charttime", "")),
-            med_rn=parse_int(row.get("med_rn", "")),
-            name=row.get("name", None) or None,
-            gsn_rn=parse_int(row.get("gsn_rn", "")),
-            gsn=row.get("gsn", None) or None,
-        )
-        session.add(med)
-        count += 1
-    session.commit()
-    print(f"  Loaded {count} pyxis records")
+    rows = (source.convert(row) for row in load_csv_gz(source.filename))
+    for batch in iter_batches(rows, batch_size):
+        conn.execute(stmt, batch)
+        count += len(batch)
+    report_loaded(source.label, count, time.perf_counter() - start)
+    return count
+
+
+def clear_table(conn: Connection, source: TableSource):
+    """Delete any rows left in a table by an earlier or interrupted load."""
+    conn.execute(delete(source.model.__table__))
+
+
+def load_all_orm(
+    engine: Engine,
+    sources: Sequence[TableSource] = TABLE_SOURCES,
+    on_loaded: Optional[OnLoaded] = None,
+):
+    """Load tables through the ORM, one object per row and one commit per table."""
+    with Session(engine) as session:
+        for source in sources:
+            clear_table(session.connection(), source)
+            count = load_table_orm(session, source)
+            if on_loaded:
+                on_loaded(session.connection(), source, count)
+            session.commit()
+
+
+def load_all_bulk(
+    engine: Engine,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sources: Sequence[TableSource] = TABLE_SOURCES,
+    on_loaded: Optional[OnLoaded] = None,
+):
+    """Load tables with batched Core inserts, one transaction per table."""
+    for source in sources:
+        with engine.begin() as conn:
+            clear_table(conn, source)
+            count = load_table_bulk(conn, source, batch_size)
+            if on_loaded:
+                on_loaded(conn, source, count)
+
+
+def plan_chunks(source: TableSource, workers: int) -> int:
+    """Number of parse tasks to split a source file into."""
+    size = (DATA_PATH / source.filename).stat().st_size
+    return max(1, min(workers, size // PARALLEL_CHUNK_BYTES))
+
+
+def _init_parse_worker(queue):
+    global _batch_queue
+    _batch_queue = queue
 
 
-def main():
-    """Main function to create database and load all data."""
+def parse_chunk(label: str, chunk: int, n_chunks: int, batch_size: int):
+    """Parse one chunk of a source file in a worker process.
+
+    A chunk owns every n_chunks-th block of batch_size rows. Workers sharing a
+    file each decompress and split it, but only convert their own blocks, so
+    the expensive per-cell parsing is divided between them. Typed batches are
+    put on the shared queue followed by a None sentinel.
+
+    Surrogate ids are assigned from the row's position in the file, which is
+    what the serial loader's autoincrement produces, so the resulting tables
+    are identical however the chunks interleave.
+    """
+    source = SOURCES_BY_LABEL[label]
+    assign_id = "id" in source.model.__table__.c
+    filepath = DATA_PATH / source.filename
+    with gzip.open(filepath, "rt", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        blocks = iter_batches(reader, batch_size)
+        for block_no, block in enumerate(blocks):
+            if block_no % n_chunks != chunk:
+                continue
+            first_id = block_no * batch_size + 1
+            batch = []
+            for offset, raw in enumerate(block):
+                values = source.convert(dict(zip(header, raw)))
+                if assign_id:
+                    values["id"] = first_id + offset
+                batch.append(values)
+            _batch_queue.put((label, batch))
+    _batch_queue.put((label, None))
+
+
+def load_all_parallel(
+    engine: Engine,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sources: Sequence[TableSource] = TABLE_SOURCES,
+    on_loaded: Optional[OnLoaded] = None,
+):
+    """Load tables with worker processes parsing and one writer inserting.
+
+    Workers decompress and convert the source files (large files are split
+    into several chunks) and hand typed batches to this process over a
+    bounded queue, which keeps memory flat when parsing outruns SQLite. This
+    process is the only writer and inserts everything in one transaction.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for source in sources:
+        n_chunks = plan_chunks(source, workers)
+        tasks.extend((source.label, chunk, n_chunks) for chunk in range(n_chunks))
+    print(f"  {len(tasks)} parse tasks on {workers} worker process(es)")
+
+    ctx = multiprocessing.get_context()
+    queue = ctx.Queue(maxsize=workers * 4)
+    statements = {s.label: insert(s.model.__table__) for s in sources}
+    counts = {s.label: 0 for s in sources}
+    pending = {s.label: 0 for s in sources}
+    for label, _, _ in tasks:
+        pending[label] += 1
+
+    start = time.perf_counter()
+    with ctx.Pool(workers, initializer=_init_parse_worker, initargs=(queue,)) as pool:
+        results = [
+            pool.apply_async(parse_chunk, (label, chunk, n_chunks, batch_size))
+            for label, chunk, n_chunks in tasks
+        ]
+        remaining = len(tasks)
+        with engine.begin() as conn:
+            for source in sources:
+                clear_table(conn, source)
+            while remaining:
+                try:
+                    label, batch = queue.get(timeout=1)
+                except Empty:
+                    # Surface worker exceptions instead of waiting forever
+                    for result in results:
+                        if result.ready():
+                            result.get()
+                    continue
+                if batch is None:
+                    remaining -= 1
+                    pending[label] -= 1
+                    if not pending[label]:
+                        report_loaded(label, counts[label], time.perf_counter() - start)
+                        if on_loaded:
+                            on_loaded(conn, SOURCES_BY_LABEL[label], counts[label])
+                    continue
+                conn.execute(statements[label], batch)
+                counts[label] += len(batch)
+        for result in results:
+            result.get()
+
+
+def file_sha256(path: Path) -> str:
+    """Hex SHA-256 digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(engine: Engine) -> Dict[str, dict]:
+    """Load manifest entries keyed by table name."""
+    manifest = LoadManifest.__table__
+    with engine.connect() as conn:
+        return {
+            row.table_name: row._asdict() for row in conn.execute(select(manifest))
+        }
+
+
+def write_manifest(conn: Connection, **values):
+    """Insert or replace the manifest entry for values['table_name']."""
+    stmt = sqlite_insert(LoadManifest.__table__).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={k: v for k, v in values.items() if k != "table_name"},
+    )
+    conn.execute(stmt)
+
+
+def plan_load(
+    engine: Engine, force: bool = False
+) -> Tuple[List[TableSource], Dict[str, str]]:
+    """Sources that need (re)loading, and every source table's file hash.
+
+    A table is reloaded when its file hash differs from the manifest, or when
+    its last load never reached the 'complete' state.
+    """
+    manifest = read_manifest(engine)
+    stale = []
+    hashes = {}
+    for source in TABLE_SOURCES:
+        table_name = source.model.__tablename__
+        sha = hashes[table_name] = file_sha256(DATA_PATH / source.filename)
+        entry = manifest.get(table_name)
+        if (
+            force
+            or entry is None
+            or entry["status"] != "complete"
+            or entry["source_sha256"] != sha
+        ):
+            stale.append(source)
+    return stale, hashes
+
+
+class DerivedTable(NamedTuple):
+    """A table computed from loaded tables, rebuilt when any of them change.
+
+    depends_on may also name derived tables listed earlier in DERIVED_TABLES.
+    Bump version when build changes so existing databases are rebuilt.
+    """
+
+    name: str
+    depends_on: Tuple[str, ...]
+    build: Callable[[Connection], int]
+    version: int = 1
+
+
+DERIVED_TABLES = [
+    DerivedTable(TRIAGE_FTS_TABLE, (Triage.__tablename__,), create_triage_fts),
+    DerivedTable(
+        FilterOptionValue.__tablename__,
+        (EdStay.__tablename__, Triage.__tablename__),
+        build_filter_options,
+    ),
+    DerivedTable(
+        StayFeature.__tablename__,
+        (
+            EdStay.__tablename__,
+            Triage.__tablename__,
+            VitalSign.__tablename__,
+            Diagnosis.__tablename__,
+            MedRecon.__tablename__,
+            Pyxis.__tablename__,
+        ),
+        build_stay_features,
+        version=2,
+    ),
+    DerivedTable(
+        EncounterRollup.__tablename__,
+        (EdStay.__tablename__, StayFeature.__tablename__),
+        build_encounter_rollup,
+    ),
+    DerivedTable(
+        LengthOfStayRollup.__tablename__,
+        (EdStay.__tablename__, StayFeature.__tablename__),
+        build_los_rollup,
+    ),
+    DerivedTable(
+        MedicationStay.__tablename__,
+        (MedRecon.__tablename__, Pyxis.__tablename__),
+        build_medication_stays,
+        version=2,
+    ),
+]
+DERIVED_BY_NAME = {derived.name: derived for derived in DERIVED_TABLES}
+
+
+def derived_signature(derived: DerivedTable, hashes: Dict[str, str]) -> str:
+    """Hash identifying a derived table's definition and inputs."""
+    digest = hashlib.sha256(f"{derived.name}:{derived.version}".encode())
+    for table_name in derived.depends_on:
+        upstream = DERIVED_BY_NAME.get(table_name)
+        if upstream is not None:
+            digest.update(derived_signature(upstream, hashes).encode())
+        else:
+            digest.update(hashes[table_name].encode())
+    return digest.hexdigest()
+
+
+def plan_derived(
+    engine: Engine, hashes: Dict[str, str], force: bool = False
+) -> List[DerivedTable]:
+    """Derived tables whose inputs or definition changed since they were built."""
+    manifest = read_manifest(engine)
+    stale = []
+    for derived in DERIVED_TABLES:
+        entry = manifest.get(derived.name)
+        if (
+            force
+            or entry is None
+            or entry["status"] != "complete"
+            or entry["source_sha256"] != derived_signature(derived, hashes)
+        ):
+            stale.append(derived)
+    return stale
+
+
+def build_derived(
+    engine: Engine,
+    derived_tables: Sequence[DerivedTable],
+    hashes: Dict[str, str],
+    generation: int,
+):
+    """Build derived tables, each in its own transaction with its manifest entry."""
+    for derived in derived_tables:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            count = derived.build(conn)
+            write_manifest(
+                conn,
+                table_name=derived.name,
+                source_file=DERIVED_SOURCE,
+                source_sha256=derived_signature(derived, hashes),
+                row_count=count,
+                status="complete",
+                generation=generation,
+                loaded_at=datetime.now(),
+            )
+        print(f"  Built {derived.name} ({count} rows) in {time.perf_counter() - start:.2f}s")
+
+
+def ensure_indexes(engine: Engine):
+    """Create model indexes that are missing from an existing database.
+
+    create_all() only creates indexes together with new tables, so indexes
+    added to the models later would otherwise never reach an existing DB.
+    Indexes on columns a table does not have yet are skipped: those are
+    derived tables, which get them when their build recreates the table.
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            if all(column.name in existing for column in index.columns):
+                index.create(bind=engine, checkfirst=True)
+
+
+def update_parquet_snapshot(engine: Engine, directory: str, generation: int):
+    """Write a Parquet snapshot of every table unless directory already holds
+    this generation's."""
+    from app.columnar import snapshot_generation, write_parquet_snapshot
+
+    if snapshot_generation(directory) == generation:
+        print(f"\nParquet snapshot in {directory} is up to date.")
+        return
+    print(f"\nWriting Parquet snapshot to {directory}...")
+    start = time.perf_counter()
+    counts = write_parquet_snapshot(engine, directory)
+    print(
+        f"  Wrote {len(counts)} tables ({sum(counts.values())} rows) "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--mode",
+        choices=["bulk", "parallel", "orm"],
+        default="bulk",
+        help=(
+            "bulk: batched Core inserts (default); parallel: parse in worker "
+            "processes, insert from one writer; orm: one ORM object per row"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes for parallel mode (default: CPU count)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=(
+            "rows per executemany batch in bulk and parallel modes; parallel "
+            f"workers also parse in blocks of this size (default: {DEFAULT_BATCH_SIZE})"
+        ),
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="reload every table even if its source file is unchanged",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="also write a Parquet snapshot of every table for QUERY_ENGINE=duckdb",
+    )
+    parser.add_argument(
+        "--parquet-path",
+        default=PARQUET_PATH,
+        help=f"directory for the Parquet snapshot (default: {PARQUET_PATH})",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Create the database and (re)load tables whose source data changed."""
+    args = parse_args(argv)
+
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
 
-    print("\nLoading data from CSV files...")
-    with Session(engine) as session:
-        load_edstays(session)
-        load_triage(session)
-        load_vitalsigns(session)
-        load_diagnoses(session)
-        load_medrecon(session)
-        load_pyxis(session)
+    stale, hashes = plan_load(engine, args.force)
+    stale_derived = plan_derived(engine, hashes, args.force)
+    with engine.connect() as conn:
+        generation = conn.execute(select(func.max(LoadManifest.generation))).scalar() or 0
+    if not stale and not stale_derived:
+        print(f"\nDatabase is up to date (generation {generation}).")
+        if args.parquet:
+            update_parquet_snapshot(engine, args.parquet_path, generation)
+        return
+
+    generation += 1
+    changed = [s.label for s in stale] + [d.name for d in stale_derived]
+    print(f"\nLoading generation {generation}: {', '.join(changed)}")
+
+    # Record the attempt first so an interrupted load is never taken as complete
+    with engine.begin() as conn:
+        pending = [(s.model.__tablename__, s.filename) for s in stale]
+        pending += [(d.name, DERIVED_SOURCE) for d in stale_derived]
+        for table_name, source_file in pending:
+            write_manifest(
+                conn,
+                table_name=table_name,
+                source_file=source_file,
+                source_sha256=None,
+                row_count=None,
+                status="loading",
+                generation=generation,
+                loaded_at=None,
+            )
+
+    def mark_complete(conn: Connection, source: TableSource, count: int):
+        write_manifest(
+            conn,
+            table_name=source.model.__tablename__,
+            source_file=source.filename,
+            source_sha256=hashes[source.model.__tablename__],
+            row_count=count,
+            status="complete",
+            generation=generation,
+            loaded_at=datetime.now(),
+        )
+
+    start = time.perf_counter()
+    if stale:
+        print(f"\nLoading data from CSV files ({args.mode} mode)...")
+        if args.mode == "orm":
+            load_all_orm(engine, stale, mark_complete)
+        elif args.mode == "parallel":
+            load_all_parallel(engine, args.workers, args.batch_size, stale, mark_complete)
+        else:
+            load_all_bulk(engine, args.batch_size, stale, mark_complete)
+    if stale_derived:
+        print("\nBuilding derived tables...")
+        build_derived(engine, stale_derived, hashes, generation)
+    if args.parquet:
+        update_parquet_snapshot(engine, args.parquet_path, generation)
+    print(f"\nTotal load time: {time.perf_counter() - start:.2f}s")
 
     print("\nDatabase loaded successfully!")
 
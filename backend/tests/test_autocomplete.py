@@ -0,0 +1,88 @@
+"""Prefix ranges: the autocomplete index and the SQL prefix_range agree with
+str.startswith, up to prefixes at the last code point U+10FFFF."""
+import unittest
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+
+from app.autocomplete import PrefixIndex, prefix_end
+from app.lookups import prefix_range
+
+TOP = "\U0010ffff"
+
+VALUES = [
+    "ab",
+    "abc",
+    "ab" + TOP,
+    "ab" + TOP + "a",
+    "ab" + TOP + TOP,
+    "ac",
+    "b",
+    TOP,
+    TOP + "a",
+    TOP + TOP,
+    "\ud7ff",
+    "\ue000",
+]
+
+PREFIXES = ["", "a", "ab", "ab" + TOP, "ab" + TOP + TOP, "abd", TOP, TOP + TOP, "\ud7ff"]
+
+
+class PrefixEndTest(unittest.TestCase):
+    def test_next_string(self):
+        self.assertEqual(prefix_end("ab"), "ac")
+        self.assertEqual(prefix_end("ab" + TOP), "ac")
+        self.assertEqual(prefix_end("a" + TOP + TOP), "b")
+        # U+D800 to U+DFFF are surrogates, not characters
+        self.assertEqual(prefix_end("\ud7ff"), "\ue000")
+
+    def test_no_end(self):
+        self.assertIsNone(prefix_end(""))
+        self.assertIsNone(prefix_end(TOP))
+        self.assertIsNone(prefix_end(TOP + TOP))
+
+
+class PrefixIndexTest(unittest.TestCase):
+    def test_matches_startswith(self):
+        index = PrefixIndex((value, i) for i, value in enumerate(VALUES))
+        for prefix in PREFIXES:
+            with self.subTest(prefix=prefix):
+                got = {value for value, _ in index.complete(prefix, len(VALUES))}
+                self.assertEqual(got, {v for v in VALUES if v.startswith(prefix)})
+
+    def test_most_frequent_first(self):
+        index = PrefixIndex([("ab", 1), ("ab" + TOP, 3), ("ab" + TOP + "a", 2), ("ac", 9)])
+        self.assertEqual(
+            index.complete("AB", 10), [("ab" + TOP, 3), ("ab" + TOP + "a", 2), ("ab", 1)]
+        )
+
+
+class PrefixRangeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.table = Table(
+            "codes",
+            MetaData(),
+            Column("id", Integer, primary_key=True),
+            Column("code", String, index=True),
+        )
+        cls.engine = create_engine("sqlite://")
+        cls.table.metadata.create_all(cls.engine)
+        with cls.engine.begin() as conn:
+            conn.execute(insert(cls.table), [{"code": v} for v in VALUES])
+
+    def test_matches_startswith(self):
+        for prefix in PREFIXES:
+            with self.subTest(prefix=prefix):
+                with self.engine.connect() as conn:
+                    got = set(
+                        conn.scalars(
+                            select(self.table.c.code).where(
+                                prefix_range(self.table.c.code, prefix)
+                            )
+                        )
+                    )
+                self.assertEqual(got, {v for v in VALUES if v.startswith(prefix)})
+
+
+if __name__ == "__main__":
+    unittest.main()
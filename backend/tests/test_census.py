@@ -0,0 +1,107 @@
+"""Sweep-line census: bucket edges, per-bucket counts and the bucket limit."""
+import time
+import tracemalloc
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from app.census import bucket_edges, epoch_seconds, occupancy, sweep_timeline
+
+HOUR = 3600
+
+
+def timeline(*stays):
+    """Timeline of (intime, outtime) pairs in epoch seconds."""
+    return sweep_timeline(np.array(stays, dtype=np.int64).ravel())
+
+
+# A in ED 0:00-1:30, B 0:30-1:00, C 1:00-2:00 (arrives as B leaves)
+STAYS = timeline((0, 5400), (1800, 3600), (3600, 7200))
+
+
+class SweepTest(unittest.TestCase):
+    def test_events_at_one_time_collapse(self):
+        self.assertEqual(STAYS.times.tolist(), [0, 1800, 3600, 5400, 7200])
+        self.assertEqual(STAYS.present.tolist(), [1, 2, 2, 1, 0])
+        self.assertEqual(STAYS.stays, 3)
+
+
+class BucketEdgesTest(unittest.TestCase):
+    def test_default_window(self):
+        # From the first arrival, rounded down, to the last departure
+        edges = bucket_edges(timeline((1800, 7200)), HOUR)
+        self.assertEqual(edges.tolist(), [0, HOUR, 2 * HOUR])
+
+    def test_partial_last_bucket(self):
+        date_from = datetime(1970, 1, 1, 0, 30)
+        edges = bucket_edges(STAYS, HOUR, date_from, datetime(1970, 1, 1, 1, 45))
+        # 75 minutes need two hour buckets; the last runs past date_to
+        self.assertEqual(edges.tolist(), [1800, 1800 + HOUR, 1800 + 2 * HOUR])
+
+    def test_window_shorter_than_a_bucket(self):
+        edges = bucket_edges(STAYS, HOUR, datetime(1970, 1, 1), datetime(1970, 1, 1, 0, 1))
+        self.assertEqual(edges.tolist(), [0, HOUR])
+
+    def test_empty_timeline(self):
+        self.assertEqual(len(bucket_edges(timeline(), HOUR)), 0)
+        edges = bucket_edges(timeline(), HOUR, datetime(1970, 1, 1), datetime(1970, 1, 2))
+        self.assertEqual(len(edges), 25)
+
+    def test_limit_is_exact(self):
+        window = datetime(1970, 1, 1), datetime(1970, 1, 2)
+        self.assertEqual(len(bucket_edges(STAYS, HOUR, *window, max_buckets=24)), 25)
+        with self.assertRaises(ValueError):
+            bucket_edges(STAYS, HOUR, *window, max_buckets=23)
+
+    def test_oversized_window_rejected_before_allocating(self):
+        # 600 million one-minute buckets: ~4.8 GB of edges if they were built
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with self.assertRaises(ValueError):
+                bucket_edges(
+                    timeline(),
+                    60,
+                    datetime(1000, 1, 1),
+                    datetime(2150, 1, 1),
+                    max_buckets=10000,
+                )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 1024 * 1024)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+
+class OccupancyTest(unittest.TestCase):
+    def test_counts_per_bucket(self):
+        edges = np.array([0, HOUR, 2 * HOUR], dtype=np.int64)
+        series = occupancy(STAYS, edges, HOUR)
+        self.assertEqual(series.stays, 3)
+        self.assertEqual(series.present, [1, 2])
+        self.assertEqual(series.peak, [2, 2])
+        # B leaves at 1:00, which is in the second bucket
+        self.assertEqual(series.arrivals, [2, 1])
+        self.assertEqual(series.departures, [0, 2])
+        self.assertEqual(series.bucket_start, [datetime(1970, 1, 1, h) for h in (0, 1)])
+
+    def test_partial_buckets_and_empty_buckets(self):
+        date_from, date_to = datetime(1970, 1, 1, 0, 30), datetime(1970, 1, 1, 3)
+        edges = bucket_edges(STAYS, HOUR, date_from, date_to)
+        self.assertEqual(edges[0], epoch_seconds(date_from))
+        series = occupancy(STAYS, edges, HOUR)
+        # Present at 0:30 counts B arriving at that moment
+        self.assertEqual(series.present, [2, 1, 0])
+        self.assertEqual(series.peak, [2, 1, 0])
+        self.assertEqual(series.arrivals, [2, 0, 0])
+        # A leaving at 1:30 falls on the second bucket's start edge
+        self.assertEqual(series.departures, [1, 2, 0])
+
+    def test_single_edge(self):
+        series = occupancy(STAYS, np.array([0], dtype=np.int64), HOUR)
+        self.assertEqual(series.present, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
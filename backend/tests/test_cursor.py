@@ -0,0 +1,82 @@
+"""Keyset cursors: round trips, and tampered cursors rejected as ValueError
+(which GET /api/encounters turns into a 400 "Invalid cursor").
+
+    cd backend && python -m unittest discover tests
+"""
+import base64
+import json
+import unittest
+from datetime import datetime
+
+from app.routers.encounters import decode_cursor, encode_cursor
+
+
+def tampered(*payload) -> str:
+    """A cursor carrying an arbitrary JSON payload."""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+class CursorRoundTripTest(unittest.TestCase):
+    def test_timestamp(self):
+        intime = datetime(2150, 1, 1, 12, 30)
+        cursor = encode_cursor("intime", "desc", intime, 42)
+        self.assertEqual(decode_cursor(cursor, "intime", "desc"), (intime, 42))
+
+    def test_stay_id_and_disposition(self):
+        cursor = encode_cursor("stay_id", "asc", 42, 42)
+        self.assertEqual(decode_cursor(cursor, "stay_id", "asc"), (42, 42))
+        cursor = encode_cursor("disposition", "asc", "HOME", 7)
+        self.assertEqual(decode_cursor(cursor, "disposition", "asc"), ("HOME", 7))
+
+    def test_features(self):
+        cursor = encode_cursor("duration_hours", "desc", 4.5, 7)
+        self.assertEqual(decode_cursor(cursor, "duration_hours", "desc"), (4.5, 7))
+        # Stays without a vital sign sort as NULL
+        cursor = encode_cursor("max_heartrate", "asc", None, 7)
+        self.assertEqual(decode_cursor(cursor, "max_heartrate", "asc"), (None, 7))
+
+
+class TamperedCursorTest(unittest.TestCase):
+    def assertInvalid(self, cursor, sort_by="intime", sort_order="desc"):
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor, sort_by, sort_order)
+
+    def test_not_a_cursor(self):
+        self.assertInvalid("not base64!")
+        self.assertInvalid(base64.urlsafe_b64encode(b"\xff\xfe").decode())
+        self.assertInvalid(tampered("intime", "desc", "2150-01-01"))
+        self.assertInvalid(base64.urlsafe_b64encode(b"5").decode())
+
+    def test_other_sort(self):
+        self.assertInvalid(encode_cursor("outtime", "desc", datetime(2150, 1, 1), 5))
+        self.assertInvalid(encode_cursor("intime", "asc", datetime(2150, 1, 1), 5))
+
+    def test_timestamp_value(self):
+        self.assertInvalid(tampered("intime", "desc", None, 5))
+        self.assertInvalid(tampered("intime", "desc", 5, 5))
+        self.assertInvalid(tampered("intime", "desc", "yesterday", 5))
+
+    def test_stay_id(self):
+        self.assertInvalid(tampered("intime", "desc", "2150-01-01", [1]))
+        self.assertInvalid(tampered("intime", "desc", "2150-01-01", "5"))
+        self.assertInvalid(tampered("intime", "desc", "2150-01-01", 1.5))
+        self.assertInvalid(tampered("intime", "desc", "2150-01-01", True))
+
+    def test_numeric_value(self):
+        self.assertInvalid(tampered("stay_id", "desc", "x", 5), "stay_id")
+        self.assertInvalid(tampered("stay_id", "desc", 1.5, 5), "stay_id")
+        self.assertInvalid(tampered("stay_id", "desc", None, 5), "stay_id")
+        self.assertInvalid(tampered("acuity", "asc", "x", 5), "acuity", "asc")
+        self.assertInvalid(tampered("acuity", "asc", [2], 5), "acuity", "asc")
+        # Length of stay is never NULL, so a NULL cursor value was not issued
+        self.assertInvalid(tampered("duration_hours", "asc", None, 5), "duration_hours", "asc")
+        self.assertInvalid(
+            base64.urlsafe_b64encode(b'["acuity","asc",NaN,5]').decode(), "acuity", "asc"
+        )
+
+    def test_disposition_value(self):
+        self.assertInvalid(tampered("disposition", "asc", 5, 5), "disposition", "asc")
+
+
+if __name__ == "__main__":
+    unittest.main()
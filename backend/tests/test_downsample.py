@@ -0,0 +1,52 @@
+"""Min/max downsampling of vital sign series: the first, last and extreme
+points survive, within the point budget."""
+import unittest
+
+import numpy as np
+
+from app.downsample import minmax_indices
+
+
+def series(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(80, 5, n)
+
+
+class MinMaxIndicesTest(unittest.TestCase):
+    def test_short_series_kept_whole(self):
+        values = series(50)
+        self.assertEqual(minmax_indices([values], 50).tolist(), list(range(50)))
+        self.assertEqual(minmax_indices([values], 0).tolist(), list(range(50)))
+        self.assertEqual(len(minmax_indices([], 10)), 0)
+
+    def test_first_last_and_extremes_kept(self):
+        heartrate, sbp = series(1000, 1), series(1000, 2)
+        heartrate[437] = 190
+        sbp[612] = 40
+        keep = minmax_indices([heartrate, sbp], 100)
+        self.assertLessEqual(len(keep), 100)
+        self.assertEqual(keep.tolist(), sorted(set(keep.tolist())))
+        for i in (0, 999, 437, 612):
+            self.assertIn(i, keep)
+        # Every series keeps its overall extremes among the inner rows
+        for values in (heartrate, sbp):
+            inner = values[1:-1]
+            self.assertIn(int(np.argmin(inner)) + 1, keep)
+            self.assertIn(int(np.argmax(inner)) + 1, keep)
+
+    def test_missing_readings_do_not_win(self):
+        values = series(1000)
+        values[::2] = np.nan
+        keep = minmax_indices([values], 50)
+        inner = keep[(keep > 0) & (keep < 999)]
+        self.assertFalse(np.isnan(values[inner]).any())
+        self.assertIn(int(np.nanargmax(values)), keep)
+
+    def test_even_spacing_when_too_few_points(self):
+        keep = minmax_indices([series(1000)] * 6, 10)
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], 999)
+        self.assertEqual(len(keep), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Chief complaint search: the DuckDB word prefix match finds what FTS5 finds."""
+import unittest
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select
+
+from app.database import Base
+from app.models import EdStay, Triage
+from app.search import create_triage_fts, fts_query, fts_rowids, word_prefix_conditions
+
+COMPLAINTS = [
+    "CHEST PAIN",
+    "Abd pain",
+    "S/P FALL",
+    "N/V/D",
+    "painful urination",
+    "Pain, chest",
+    "SOB",
+    "Café au lait spots",
+    "R ankle pain",
+    "ETOH",
+]
+
+ARRIVAL = datetime(2150, 1, 1)
+
+SEARCHES = ["ain", "pain", "chest pain", "ch pa", "CHEST", "s/p fall", "n/v", "v d", "cafe", "CAFÉ"]
+
+
+def matches(engine, conditions) -> set:
+    with engine.connect() as conn:
+        return {row.id for row in conn.execute(select(Triage.id).where(*conditions))}
+
+
+class WordPrefixTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        stays = [
+            {
+                "stay_id": i,
+                "subject_id": i,
+                "intime": ARRIVAL,
+                "outtime": ARRIVAL,
+                "gender": "F",
+                "disposition": "HOME",
+            }
+            for i in range(1, len(COMPLAINTS) + 1)
+        ]
+        rows = [
+            {"id": i, "stay_id": i, "subject_id": i, "chiefcomplaint": text}
+            for i, text in enumerate(COMPLAINTS, 1)
+        ]
+        cls.sqlite = create_engine("sqlite://")
+        Base.metadata.create_all(cls.sqlite, tables=[EdStay.__table__, Triage.__table__])
+        with cls.sqlite.begin() as conn:
+            conn.execute(insert(EdStay.__table__), stays)
+            conn.execute(insert(Triage.__table__), rows)
+        # DuckDB serves Parquet views; a plain table of the columns searched will do
+        cls.duckdb = create_engine("duckdb:///:memory:")
+        with cls.duckdb.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE triage (id INTEGER, chiefcomplaint VARCHAR)")
+            conn.execute(
+                insert(Triage.__table__),
+                [{"id": row["id"], "chiefcomplaint": row["chiefcomplaint"]} for row in rows],
+            )
+        with cls.sqlite.begin() as conn:
+            create_triage_fts(conn)
+
+    def test_same_rows_as_fts5(self):
+        for search in SEARCHES:
+            with self.subTest(search=search):
+                fts = matches(self.sqlite, [Triage.id.in_(fts_rowids(fts_query(search)))])
+                words = matches(
+                    self.duckdb, word_prefix_conditions(Triage.chiefcomplaint, search)
+                )
+                self.assertEqual(words, fts)
+
+    def test_word_starts_only(self):
+        conditions = word_prefix_conditions(Triage.chiefcomplaint, "ain")
+        self.assertEqual(matches(self.duckdb, conditions), set())
+
+    def test_no_words(self):
+        self.assertEqual(word_prefix_conditions(Triage.chiefcomplaint, "!!!"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,13 @@
 import axios from 'axios';
 import type {
+  ChiefComplaintSuggestions,
   EncounterListResponse,
+  EncounterCount,
   EncounterDetail,
   FilterOptions,
   EncounterFilters,
+  TotalMode,
+  VitalsSeries,
 } from '../types';
 
 // Use relative URL in production (Docker), absolute URL in development
@@ -13,9 +17,7 @@ const api = axios.create({
   baseURL: API_BASE_URL,
 });
 
-export async function fetchEncounters(
-  filters: EncounterFilters
-): Promise<EncounterListResponse> {
+function cohortParams(filters: EncounterFilters): URLSearchParams {
   const params = new URLSearchParams();
 
   if (filters.gender) params.append('gender', filters.gender);
@@ -25,10 +27,21 @@ export async function fetchEncounters(
   if (filters.dateTo) params.append('date_to', filters.dateTo);
   if (filters.chiefComplaint)
     params.append('chief_complaint', filters.chiefComplaint);
+  if (filters.icdPrefix) params.append('icd_prefix', filters.icdPrefix);
+  if (filters.medication) params.append('medication', filters.medication);
+  return params;
+}
+
+export async function fetchEncounters(
+  filters: EncounterFilters,
+  totalMode: TotalMode = 'exact'
+): Promise<EncounterListResponse> {
+  const params = cohortParams(filters);
   params.append('page', String(filters.page));
   params.append('per_page', String(filters.perPage));
   params.append('sort_by', filters.sortBy);
   params.append('sort_order', filters.sortOrder);
+  params.append('total_mode', totalMode);
 
   const response = await api.get<EncounterListResponse>(
     `/encounters?${params.toString()}`
@@ -36,6 +49,15 @@ export async function fetchEncounters(
   return response.data;
 }
 
+export async function fetchEncounterCount(
+  filters: EncounterFilters
+): Promise<EncounterCount> {
+  const response = await api.get<EncounterCount>(
+    `/encounters/count?${cohortParams(filters).toString()}`
+  );
+  return response.data;
+}
+
 export async function fetchEncounterDetail(
   stayId: number
 ): Promise<EncounterDetail> {
@@ -43,7 +65,27 @@ export async function fetchEncounterDetail(
   return response.data;
 }
 
+export async function fetchVitalsSeries(
+  stayId: number,
+  maxPoints?: number
+): Promise<VitalsSeries> {
+  const response = await api.get<VitalsSeries>(`/encounters/${stayId}/vitals`, {
+    params: maxPoints ? { max_points: maxPoints } : undefined,
+  });
+  return response.data;
+}
+
 export async function fetchFilterOptions(): Promise<FilterOptions> {
   const response = await api.get<FilterOptions>('/filters/options');
   return response.data;
 }
+
+export async function fetchChiefComplaints(
+  prefix: string,
+  limit = 10
+): Promise<ChiefComplaintSuggestions> {
+  const response = await api.get<ChiefComplaintSuggestions>('/filters/chief_complaints', {
+    params: { prefix, limit },
+  });
+  return response.data;
+}
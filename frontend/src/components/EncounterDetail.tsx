@@ -79,7 +79,7 @@ function VitalCard({
 }
 
 export function EncounterDetailComponent({ encounter }: EncounterDetailProps) {
-  const { triage, vitalsigns, diagnoses, medications } = encounter;
+  const { triage, diagnoses, medications } = encounter;
 
   return (
     <div className="space-y-6">
@@ -180,7 +180,7 @@ export function EncounterDetailComponent({ encounter }: EncounterDetailProps) {
         <h2 className="text-lg font-semibold text-gray-900 mb-4">
           Vital Signs Timeline
         </h2>
-        <VitalsChart vitalsigns={vitalsigns} />
+        <VitalsChart stayId={encounter.stay_id} />
       </div>
 
       {/* Diagnoses */}
@@ -5,6 +5,7 @@ import type { EncounterListItem, EncounterFilters } from '../types';
 interface EncounterListProps {
   encounters: EncounterListItem[];
   total: number;
+  totalIsEstimate?: boolean;
   page: number;
   totalPages: number;
   filters: EncounterFilters;
@@ -60,6 +61,7 @@ function AcuityBadge({ acuity }: { acuity: number | null }) {
 export function EncounterList({
   encounters,
   total,
+  totalIsEstimate,
   page,
   totalPages,
   filters,
@@ -132,14 +134,22 @@ export function EncounterList({
                 Arrival
                 <SortIcon column="intime" />
               </th>
-              <th className="px-4 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+              <th
+                className="px-4 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider cursor-pointer hover:bg-gray-100"
+                onClick={() => handleSort('duration_hours')}
+              >
                 Duration
+                <SortIcon column="duration_hours" />
               </th>
               <th className="px-4 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                 Chief Complaint
               </th>
-              <th className="px-4 py-3 text-center text-xs font-medium text-gray-500 uppercase tracking-wider">
+              <th
+                className="px-4 py-3 text-center text-xs font-medium text-gray-500 uppercase tracking-wider cursor-pointer hover:bg-gray-100"
+                onClick={() => handleSort('acuity')}
+              >
                 Acuity
+                <SortIcon column="acuity" />
               </th>
               <th
                 className="px-4 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider cursor-pointer hover:bg-gray-100"
@@ -198,7 +208,12 @@ export function EncounterList({
           <span className="font-medium">
             {Math.min(page * filters.perPage, total)}
           </span>{' '}
-          of <span className="font-medium">{total}</span> encounters
+          of{' '}
+          <span className="font-medium">
+            {totalIsEstimate ? '~' : ''}
+            {total}
+          </span>{' '}
+          encounters
         </div>
         <div className="flex space-x-2">
           <button
@@ -1,3 +1,5 @@
+import { keepPreviousData, useQuery } from '@tanstack/react-query';
+import { fetchChiefComplaints } from '../api/client';
 import type { FilterOptions, EncounterFilters } from '../types';
 
 interface FilterPanelProps {
@@ -13,13 +15,23 @@ export function FilterPanel({
   onChange,
   isLoading,
 }: FilterPanelProps) {
+  const complaintPrefix = filters.chiefComplaint || '';
+  const { data: complaintSuggestions } = useQuery({
+    queryKey: ['chiefComplaints', complaintPrefix],
+    queryFn: () => fetchChiefComplaints(complaintPrefix),
+    placeholderData: keepPreviousData,
+    staleTime: Infinity,
+  });
+
   const hasActiveFilters =
     filters.gender ||
     filters.races.length > 0 ||
     filters.dispositions.length > 0 ||
     filters.dateFrom ||
     filters.dateTo ||
-    filters.chiefComplaint;
+    filters.chiefComplaint ||
+    filters.icdPrefix ||
+    filters.medication;
 
   const clearFilters = () => {
     onChange({
@@ -30,6 +42,8 @@ export function FilterPanel({
       dateFrom: null,
       dateTo: null,
       chiefComplaint: null,
+      icdPrefix: null,
+      medication: null,
       page: 1,
     });
   };
@@ -191,6 +205,52 @@ export function FilterPanel({
               })
             }
             placeholder="Search..."
+            list="chief-complaint-suggestions"
+            className="block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm"
+          />
+          <datalist id="chief-complaint-suggestions">
+            {complaintSuggestions?.items.map((item) => (
+              <option key={item.value} value={item.value} />
+            ))}
+          </datalist>
+        </div>
+
+        {/* Diagnosis Code Prefix */}
+        <div>
+          <label className="block text-sm font-medium text-gray-700 mb-1">
+            ICD Code
+          </label>
+          <input
+            type="text"
+            value={filters.icdPrefix || ''}
+            onChange={(e) =>
+              onChange({
+                ...filters,
+                icdPrefix: e.target.value || null,
+                page: 1,
+              })
+            }
+            placeholder="e.g. I21"
+            className="block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm"
+          />
+        </div>
+
+        {/* Medication */}
+        <div>
+          <label className="block text-sm font-medium text-gray-700 mb-1">
+            Medication
+          </label>
+          <input
+            type="text"
+            value={filters.medication || ''}
+            onChange={(e) =>
+              onChange({
+                ...filters,
+                medication: e.target.value || null,
+                page: 1,
+              })
+            }
+            placeholder="e.g. heparin"
             className="block w-full rounded-md border-gray-300 shadow-sm focus:border-blue-500 focus:ring-blue-500 sm:text-sm"
           />
         </div>
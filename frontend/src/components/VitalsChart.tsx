@@ -1,4 +1,5 @@
 import { useState } from 'react';
+import { useQuery } from '@tanstack/react-query';
 import {
   LineChart,
   Line,
@@ -9,12 +10,15 @@ import {
   ResponsiveContainer,
 } from 'recharts';
 import { format } from 'date-fns';
-import type { VitalSign } from '../types';
+import { fetchVitalsSeries } from '../api/client';
 
 interface VitalsChartProps {
-  vitalsigns: VitalSign[];
+  stayId: number;
 }
 
+// Upper bound on plotted points; longer stays are downsampled server-side
+const MAX_CHART_POINTS = 400;
+
 const VITAL_COLORS: Record<string, string> = {
   heartrate: '#ef4444',
   sbp: '#3b82f6',
@@ -33,7 +37,7 @@ const VITAL_LABELS: Record<string, string> = {
   temperature: 'Temperature',
 };
 
-export function VitalsChart({ vitalsigns }: VitalsChartProps) {
+export function VitalsChart({ stayId }: VitalsChartProps) {
   const [visibleSeries, setVisibleSeries] = useState<string[]>([
     'heartrate',
     'sbp',
@@ -41,7 +45,16 @@ export function VitalsChart({ vitalsigns }: VitalsChartProps) {
     'o2sat',
   ]);
 
-  if (vitalsigns.length === 0) {
+  const { data: series, isLoading } = useQuery({
+    queryKey: ['vitals', stayId, MAX_CHART_POINTS],
+    queryFn: () => fetchVitalsSeries(stayId, MAX_CHART_POINTS),
+  });
+
+  if (isLoading) {
+    return <div className="h-[400px] bg-gray-100 rounded-lg animate-pulse"></div>;
+  }
+
+  if (!series || series.charttime.length === 0) {
     return (
       <div className="bg-gray-50 rounded-lg p-8 text-center text-gray-500">
         No vital signs recorded for this encounter
@@ -49,17 +62,17 @@ export function VitalsChart({ vitalsigns }: VitalsChartProps) {
     );
   }
 
-  // Sort by charttime and format for the chart
-  const chartData = [...vitalsigns]
-    .sort(
-      (a, b) =>
-        new Date(a.charttime).getTime() - new Date(b.charttime).getTime()
-    )
-    .map((v) => ({
-      ...v,
-      time: format(new Date(v.charttime), 'HH:mm'),
-      fullTime: v.charttime,
-    }));
+  // Columns arrive sorted by charttime; zip them into rows for the chart
+  const chartData = series.charttime.map((charttime, i) => ({
+    heartrate: series.heartrate[i],
+    sbp: series.sbp[i],
+    dbp: series.dbp[i],
+    o2sat: series.o2sat[i],
+    resprate: series.resprate[i],
+    temperature: series.temperature[i],
+    time: format(new Date(charttime), 'HH:mm'),
+    fullTime: charttime,
+  }));
 
   const toggleSeries = (key: string) => {
     setVisibleSeries((prev) =>
@@ -2,7 +2,11 @@ import { useState } from 'react';
 import { useQuery } from '@tanstack/react-query';
 import { FilterPanel } from '../components/FilterPanel';
 import { EncounterList } from '../components/EncounterList';
-import { fetchEncounters, fetchFilterOptions } from '../api/client';
+import {
+  fetchEncounterCount,
+  fetchEncounters,
+  fetchFilterOptions,
+} from '../api/client';
 import type { EncounterFilters } from '../types';
 
 const defaultFilters: EncounterFilters = {
@@ -12,6 +16,8 @@ const defaultFilters: EncounterFilters = {
   dateFrom: null,
   dateTo: null,
   chiefComplaint: null,
+  icdPrefix: null,
+  medication: null,
   page: 1,
   perPage: 20,
   sortBy: 'intime',
@@ -26,11 +32,35 @@ export function ListPage() {
     queryFn: fetchFilterOptions,
   });
 
+  // Show the page with an estimated total first; the exact count follows
   const { data: encountersData, isLoading: isLoadingEncounters } = useQuery({
     queryKey: ['encounters', filters],
-    queryFn: () => fetchEncounters(filters),
+    queryFn: () => fetchEncounters(filters, 'estimate'),
   });
 
+  const { page, perPage } = filters;
+  const { data: countData } = useQuery({
+    queryKey: [
+      'encounterCount',
+      filters.gender,
+      filters.races,
+      filters.dispositions,
+      filters.dateFrom,
+      filters.dateTo,
+      filters.chiefComplaint,
+      filters.icdPrefix,
+      filters.medication,
+    ],
+    queryFn: () => fetchEncounterCount(filters),
+  });
+
+  const total = countData?.total ?? encountersData?.total ?? 0;
+  const totalPages = countData
+    ? Math.max(1, Math.ceil(countData.total / perPage))
+    : encountersData?.total_pages || 1;
+  const totalIsEstimate =
+    !countData && (encountersData?.total_is_estimate ?? false);
+
   return (
     <div className="min-h-screen bg-gray-50">
       {/* Header */}
@@ -56,9 +86,10 @@ export function ListPage() {
 
         <EncounterList
           encounters={encountersData?.items || []}
-          total={encountersData?.total || 0}
-          page={encountersData?.page || 1}
-          totalPages={encountersData?.total_pages || 1}
+          total={total}
+          totalIsEstimate={totalIsEstimate}
+          page={encountersData?.page || page}
+          totalPages={totalPages}
           filters={filters}
           onFiltersChange={setFilters}
           isLoading={isLoadingEncounters}
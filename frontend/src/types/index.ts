@@ -15,10 +15,18 @@ export interface EncounterListItem {
 
 export interface EncounterListResponse {
   items: EncounterListItem[];
-  total: number;
+  total: number | null;
   page: number;
   per_page: number;
-  total_pages: number;
+  total_pages: number | null;
+  total_is_estimate: boolean;
+  next_cursor: string | null;
+}
+
+export type TotalMode = 'exact' | 'estimate' | 'none';
+
+export interface EncounterCount {
+  total: number;
 }
 
 export interface VitalSign {
@@ -33,6 +41,20 @@ export interface VitalSign {
   pain: string | null;
 }
 
+export interface VitalsSeries {
+  stay_id: number;
+  total_points: number;
+  charttime: string[];
+  temperature: (number | null)[];
+  heartrate: (number | null)[];
+  resprate: (number | null)[];
+  o2sat: (number | null)[];
+  sbp: (number | null)[];
+  dbp: (number | null)[];
+  rhythm: (string | null)[];
+  pain: (string | null)[];
+}
+
 export interface Diagnosis {
   seq_num: number;
   icd_code: string;
@@ -81,13 +103,20 @@ export interface FilterOptions {
   genders: string[];
   races: string[];
   dispositions: string[];
-  chief_complaints: string[];
   date_range: {
     min: string | null;
     max: string | null;
   };
 }
 
+export interface ChiefComplaintSuggestions {
+  prefix: string;
+  items: {
+    value: string;
+    frequency: number;
+  }[];
+}
+
 export interface EncounterFilters {
   gender: string | null;
   races: string[];
@@ -95,6 +124,8 @@ export interface EncounterFilters {
   dateFrom: string | null;
   dateTo: string | null;
   chiefComplaint: string | null;
+  icdPrefix: string | null;
+  medication: string | null;
   page: number;
   perPage: number;
   sortBy: string;